@@ -0,0 +1,712 @@
+"""cc_plugin_ncei/batch.py.
+
+Validate many files in parallel, writing one JSON line per file as soon as
+it has been checked::
+
+    ncei-batch -t ncei-auto -j 16 /data/campaign/ > results.jsonl
+"""
+
+import argparse
+import functools
+import gc
+import glob
+import inspect
+import json
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+from compliance_checker.suite import CheckSuite
+
+from cc_plugin_ncei import cache, messages, rules, units, util
+from cc_plugin_ncei.ncei_auto import NCEIAuto
+from cc_plugin_ncei.ncei_base import BaseNCEICheck
+
+DEFAULT_SUITES = ("ncei-auto",)
+DEFAULT_PATTERN = "*.nc"
+# Files handed to a worker process at a time, small enough to keep the
+# processes balanced when file sizes vary.
+CHUNKSIZE = 4
+# Header fingerprints whose results a process keeps for the dedup option,
+# the oldest is dropped first.
+MAX_REPRESENTATIVES = 64
+# Fields of /proc/<pid>/smaps_rollup reported by check_memory_footprint.
+_FOOTPRINT_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Private_Clean": "uss",
+    "Private_Dirty": "uss",
+}
+
+
+def iter_paths(sources, manifests=(), pattern=DEFAULT_PATTERN):
+    """Yield the paths of the files to validate.
+
+    :param sources: file paths, glob patterns, or directories searched
+                    recursively for files matching ``pattern``
+    :param manifests: text files listing one path per line, blank lines and
+                      lines starting with # are ignored
+    :param str pattern: file name pattern for directories
+    """
+    for manifest in manifests:
+        with Path(manifest).open(encoding="utf-8") as f:
+            for line in f:
+                path = line.strip()
+                if path and not path.startswith("#"):
+                    yield path
+    for source in sources:
+        if Path(source).is_dir():
+            yield from (
+                str(path) for path in sorted(Path(source).rglob(pattern))
+            )
+        elif any(char in source for char in "*?["):
+            yield from sorted(glob.iglob(source, recursive=True))  # noqa: PTH207
+        else:
+            yield source
+
+
+def parse_options(opts):
+    """Return the checker options given as ``checker:option[:value]`` strings.
+
+    Same syntax as the -O option of compliance-checker.
+    """
+    options = {}
+    for opt in opts:
+        checker_type, _, option = opt.partition(":")
+        if not option:
+            msg = f"Checker options must be given as checker:option[:value], not {opt!r}"
+            raise ValueError(msg)
+        option, _, value = option.partition(":")
+        options.setdefault(checker_type, {})[option] = value or None
+    return options
+
+
+def _reusable(check):
+    """Return true if the results of ``check`` only depend on the header fingerprint."""
+    dynamic = getattr(getattr(check, "__self__", None), "dynamic_checks", None)
+    return dynamic is not None and check.__func__.__name__ not in dynamic
+
+
+def _outcomes(checks):
+    """Return the results and error names of the checks of a checker."""
+    return [
+        (name, results, error and error[0])
+        for name, (results, error) in checks
+    ]
+
+
+class BatchSuite(CheckSuite):
+    """CheckSuite running the same checker instances on every dataset.
+
+    compliance-checker creates new checkers for every dataset it checks. In a
+    batch each process creates the checkers of this plugin once, with the
+    shared tables they load, and sets them up again for every file. Other
+    checkers, such as cf, keep state for every dataset they check and are
+    still created for every file.
+    """
+
+    def __init__(self, options=None):
+        """Load the available checkers, see CheckSuite."""
+        super().__init__(options=options)
+        self.load_all_available_checkers()
+        self._instances = {}
+        self._valid = {}
+        self._representatives = {}
+
+    def _get_valid_checkers(self, ds, checker_names):
+        key = (type(ds), tuple(checker_names))
+        if key not in self._valid:
+            self._valid[key] = [
+                (name, functools.partial(self._instance, name, checker_class))
+                for name, checker_class in super()._get_valid_checkers(
+                    ds,
+                    checker_names,
+                )
+            ]
+        return self._valid[key]
+
+    def _instance(self, name, checker_class, options=None):
+        if not issubclass(checker_class, (BaseNCEICheck, NCEIAuto)):
+            return checker_class(options=options)
+        if name not in self._instances:
+            self._instances[name] = checker_class(options=options)
+        return self._instances[name]
+
+    def preload(self, checker_names):
+        """Load everything the checkers read on their first file.
+
+        That is the CF standard name table, the NODC sea names, the unitless
+        standard names, the UDUNITS database, the compiled rule tables and
+        the checker instances. Called before forking the worker processes,
+        which then share them with this process.
+
+        :param list checker_names: checker names, as given to compliance-checker
+        """
+        util.get_standard_name_table()
+        util.get_sea_name_index()
+        util.get_unitless_standard_names()
+        units.is_valid_unit("1")
+        for checker_class in self.checkers.values():
+            for table in ("qaqc_rules", "geophysical_rules"):
+                if getattr(checker_class, table, None):
+                    rules.compile_rules(getattr(checker_class, table))
+        for name in checker_names:
+            if name in self.checkers:
+                self._instance(
+                    name,
+                    self.checkers[name],
+                    self.options.get(name.split(":")[0], {}),
+                )
+
+    def validate(self, path, checker_names, *, failures=False, dedup=False):
+        """Return the summary of the checkers run on a file.
+
+        The checkers share one metadata scan of the file, see
+        :class:`util.Session`.
+
+        :param str path: path of the file
+        :param list checker_names: checker names, as given to compliance-checker
+        :param bool failures: include the name, weight and messages of the
+                              failed results, the messages as stored by
+                              :func:`messages.pack`
+        :param bool dedup: reuse the results of a previous file with the same
+                           header fingerprint, see :meth:`_run_dedup`
+
+        With the cache option of the checkers the summaries are kept in the
+        cache, keyed by the path, size and modification time of the file and
+        by its whole header. A file that has not changed since is not opened
+        again, and one that was only touched or copied is not checked again:
+        their records are marked ``cached``. Summaries with errors are not
+        kept.
+        """
+        record = {"path": path}
+        result_cache = self._summary_cache(checker_names)
+        keys = self._file_keys(result_cache, path, checker_names, failures)
+        if keys and self._from_cache(result_cache, keys, record):
+            return record
+
+        try:
+            ds = self.load_dataset(path)
+        except Exception as e:  # noqa: BLE001
+            record["error"] = f"{type(e).__name__}: {e}"
+            return record
+        try:
+            with util.Session():
+                if result_cache is not None:
+                    fingerprint = util.header_fingerprint(
+                        util.get_context(ds).dataset,
+                        dynamic=(),
+                    )
+                    keys.append(
+                        self._summary_key(
+                            fingerprint,
+                            checker_names,
+                            failures,
+                        ),
+                    )
+                    if self._from_cache(result_cache, keys, record):
+                        return record
+                score_groups = (
+                    self._run_dedup(ds, checker_names, path, record)
+                    if dedup
+                    else self.run_all(ds, checker_names, [])
+                )
+        finally:
+            if hasattr(ds, "close"):
+                ds.close()
+
+        record["checkers"] = {
+            name: self._summary(name, groups, errors, path, failures=failures)
+            for name, (groups, errors) in score_groups.items()
+        }
+        if result_cache is not None and not any(
+            summary["errors"] for summary in record["checkers"].values()
+        ):
+            for key in keys:
+                result_cache.put(key, record["checkers"])
+        return record
+
+    def _summary(self, name, groups, errors, path, *, failures):
+        """Return the scores of a checker on a file, and its failures."""
+        report = self.build_structure(name, groups, path)
+        summary = {
+            key: report[key]
+            for key in (
+                "scored_points",
+                "possible_points",
+                "high_count",
+                "medium_count",
+                "low_count",
+            )
+        }
+        summary["errors"] = sorted(errors)
+        if failures:
+            summary["failures"] = [
+                {
+                    "name": result.name,
+                    "weight": result.weight,
+                    "msgs": [messages.pack(msg) for msg in result.msgs],
+                }
+                for result in groups
+                if result.value[0] < result.value[1]
+            ]
+        return summary
+
+    def _summary_cache(self, checker_names):
+        """Return the cache given by the checker options, or None."""
+        for name in checker_names:
+            result_cache = cache.from_options(
+                self.options.get(name.split(":")[0]),
+            )
+            if result_cache is not None:
+                return result_cache
+        return None
+
+    def _summary_key(self, source, checker_names, failures):
+        """Return the cache key of the summaries of a file, see cache.summary_key."""
+        return cache.summary_key(
+            source,
+            [(name, self.checkers.get(name)) for name in checker_names],
+            self.options,
+            failures,
+        )
+
+    def _file_keys(self, result_cache, path, checker_names, failures):
+        """Return the summary key of a file from its cache.file_key, in a list.
+
+        The list is empty without a cache or if the file cannot be read.
+        """
+        if result_cache is None:
+            return []
+        try:
+            source = cache.file_key(path)
+        except OSError:
+            return []
+        return [self._summary_key(source, checker_names, failures)]
+
+    @staticmethod
+    def _from_cache(result_cache, keys, record):
+        """Take the summaries of the last of ``keys`` from the cache.
+
+        On a hit they are added to ``record``, stored under the other keys
+        and true is returned.
+        """
+        summaries = result_cache.get(keys[-1])
+        if summaries is None:
+            return False
+        for key in keys[:-1]:
+            result_cache.put(key, summaries)
+        record["checkers"] = summaries
+        record["cached"] = True
+        return True
+
+    def _run_dedup(self, ds, checker_names, path, record):
+        """Run the checkers like run_all, reusing the results of similar files.
+
+        The first dataset checked with a :func:`util.header_fingerprint` is
+        fully evaluated and becomes the representative of its group. For the
+        next ones only the ``dynamic_checks`` of the NCEI checkers are run,
+        the results of the other checks are those of the representative.
+        Checks of other checkers are always run. The results of the last
+        ``MAX_REPRESENTATIVES`` fingerprints are kept.
+
+        The fingerprint is added to ``record``, and the path of the
+        representative when its results are reused.
+        """
+        fingerprint = util.header_fingerprint(util.get_context(ds).dataset)
+        record["fingerprint"] = fingerprint
+        key = (fingerprint, tuple(checker_names))
+        if key not in self._representatives:
+            runs = self._run_checks(ds, checker_names, {})
+            score_groups = {
+                name: self._score(checks) for name, checks in runs.items()
+            }
+            if len(self._representatives) >= MAX_REPRESENTATIVES:
+                del self._representatives[next(iter(self._representatives))]
+            self._representatives[key] = (path, runs, score_groups)
+            return score_groups
+        record["representative"], previous, groups = self._representatives[key]
+        runs = self._run_checks(ds, checker_names, previous)
+
+        # When the dynamic checks give the same results as for the
+        # representative, so do the grouped scores.
+        return {
+            name: (
+                groups[name]
+                if _outcomes(checks) == _outcomes(previous.get(name, ()))
+                else self._score(checks)
+            )
+            for name, checks in runs.items()
+        }
+
+    def _score(self, checks):
+        """Return the grouped scores and errors of a checker, like run_all."""
+        return (
+            self.scores(
+                [result for _, (results, _) in checks for result in results],
+            ),
+            {error[0]: error[1:] for _, (_, error) in checks if error},
+        )
+
+    def _run_checks(self, ds, checker_names, previous):
+        """Return the results and errors of each check method of each checker.
+
+        The results of the checks that do not depend on the dynamic attributes
+        are taken from ``previous``, the return value for another dataset. The
+        suite only reads them to build the summaries, so they are not copied.
+        """
+        runs = {}
+        for name, checker_class in self._get_valid_checkers(ds, checker_names):
+            checker = checker_class(
+                options=self.options.get(name.split(":")[0], {}),
+            )
+            checker.setup(ds)
+            reused = dict(previous.get(name, ()))
+            checks = []
+            for check_name, check in inspect.getmembers(
+                checker,
+                inspect.isroutine,
+            ):
+                if not check_name.startswith("check_"):
+                    continue
+                if check_name in reused and _reusable(check):
+                    checks.append((check_name, reused[check_name]))
+                else:
+                    checks.append((check_name, self._run_one(check, ds)))
+            runs[name] = checks
+        return runs
+
+    def _run_one(self, check, ds):
+        """Return the results of a check method and its error, like run_all."""
+        try:
+            return self._run_check(check, ds, None), None
+        except Exception as e:  # noqa: BLE001
+            return [], (check.__func__.__name__, e, sys.exc_info()[2])
+
+
+_suite = None
+
+
+def _init_worker(options, checker_names):
+    global _suite  # noqa: PLW0603
+    _suite = BatchSuite(options)
+    _suite.preload(checker_names)
+
+
+def _validate(checker_names, failures, dedup, path):
+    return _suite.validate(path, checker_names, failures=failures, dedup=dedup)
+
+
+def memory_footprint(pid):
+    """Return the resident memory of a process in bytes.
+
+    ``rss`` counts all its resident pages, ``pss`` divides the pages shared
+    with other processes between them and ``uss`` only counts the pages no
+    other process shares. The values are None where the kernel does not
+    report them, they are read from /proc on Linux.
+
+    :param int pid: process ID
+    """
+    footprint = {"pid": pid, "rss": None, "pss": None, "uss": None}
+    try:
+        with Path(f"/proc/{pid}/smaps_rollup").open(encoding="ascii") as f:
+            lines = f.readlines()
+    except OSError:
+        return footprint
+    for line in lines:
+        field, _, value = line.partition(":")
+        if field in _FOOTPRINT_FIELDS:
+            key = _FOOTPRINT_FIELDS[field]
+            footprint[key] = (footprint[key] or 0) + int(
+                value.split()[0],
+            ) * 1024
+    return footprint
+
+
+class WorkerPool:
+    """Processes validating files with the same checkers.
+
+    Where processes can be forked the checkers and the tables they read are
+    loaded once, in this process, see :meth:`BatchSuite.preload`. The worker
+    processes are then forked with them already loaded: starting one costs
+    the same whatever the number of workers, and the tables are shared
+    between all of them instead of being copied into each. Elsewhere every
+    worker process loads its own.
+
+    Use it as a context manager, the worker processes are stopped on exit::
+
+        with WorkerPool(["ncei-auto"], jobs=8) as pool:
+            for summary in pool.validate(paths):
+                ...
+            print(pool.check_memory_footprint())
+    """
+
+    def __init__(
+        self,
+        checker_names=DEFAULT_SUITES,
+        options=None,
+        *,
+        jobs=None,
+        failures=False,
+        dedup=False,
+    ):
+        """Set up the pool, the processes are started on entering it.
+
+        :param checker_names: checkers to run, ``ncei-auto`` by default
+        :param dict options: checker options, see :func:`parse_options`
+        :param int jobs: number of processes, the number of CPUs by default.
+                         With 1 the files are checked in this process.
+        :param bool failures: include the failed results in the summaries
+        :param bool dedup: only run the dynamic checks on files whose header
+                           fingerprint has already been seen by the process,
+                           see :meth:`BatchSuite.validate`. Summaries then
+                           have the ``fingerprint`` of their file, and the
+                           path of the ``representative`` whose results were
+                           reused.
+        """
+        self.checker_names = list(checker_names)
+        self.options = options
+        self.jobs = jobs or os.cpu_count()
+        self.failures = failures
+        self.dedup = dedup
+        self._pool = None
+        self._workers = []
+        self._done = True
+
+    def __enter__(self):
+        """Load the checkers and start the worker processes."""
+        global _suite  # noqa: PLW0603
+        forking = "fork" in multiprocessing.get_all_start_methods()
+        if self.jobs == 1 or forking:
+            _suite = BatchSuite(self.options)
+            _suite.preload(self.checker_names)
+        if self.jobs == 1:
+            return self
+        # The pool starts its processes when it is created, they are the
+        # children this process did not have before.
+        children = set(multiprocessing.active_children())
+        if forking:
+            # Keep the collector from writing to the pages of the preloaded
+            # objects, which would copy them into every worker process.
+            gc.freeze()
+            self._pool = multiprocessing.get_context("fork").Pool(self.jobs)
+        else:
+            self._pool = multiprocessing.Pool(
+                self.jobs,
+                initializer=_init_worker,
+                initargs=(self.options, self.checker_names),
+            )
+        self._workers = [
+            process
+            for process in multiprocessing.active_children()
+            if process not in children
+        ]
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop the worker processes.
+
+        Once every file given to them is done they exit normally, writing
+        the reads they keep pending in their caches, see ResultCache.flush.
+        """
+        global _suite  # noqa: PLW0603
+        if self._pool is not None:
+            if self._done and exc_info[0] is None:
+                self._pool.close()
+            else:
+                self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            self._workers = []
+            gc.unfreeze()
+        _suite = None
+
+    def validate(self, paths):
+        """Validate files, yielding their summaries as they complete.
+
+        :param paths: iterable of file paths, see :func:`iter_paths`
+        """
+        validate = functools.partial(
+            _validate,
+            self.checker_names,
+            self.failures,
+            self.dedup,
+        )
+        if self._pool is None:
+            yield from map(validate, paths)
+        else:
+            self._done = False
+            yield from self._pool.imap_unordered(validate, paths, CHUNKSIZE)
+            self._done = True
+
+    def check_memory_footprint(self):
+        """Return the resident memory of this process and of each worker.
+
+        A dictionary with the :func:`memory_footprint` of this process as
+        ``parent`` and a list of those of the worker processes as
+        ``workers``, empty when the files are checked in this process. Other
+        child processes of this process are not counted.
+        """
+        workers = [
+            memory_footprint(process.pid)
+            for process in self._workers
+            if process.is_alive()
+        ]
+        return {"parent": memory_footprint(os.getpid()), "workers": workers}
+
+
+def validate_files(
+    paths,
+    checker_names=DEFAULT_SUITES,
+    options=None,
+    **kwargs,
+):
+    """Validate files in a pool of processes, yielding summaries as they complete.
+
+    Summaries are yielded in the order the files are done, each has the
+    ``path`` of its file. The checkers are loaded once and reused for all the
+    files.
+
+    :param paths: iterable of file paths, see :func:`iter_paths`
+    :param checker_names: checkers to run, ``ncei-auto`` by default
+    :param dict options: checker options, see :func:`parse_options`
+    :param kwargs: ``jobs``, ``failures`` and ``dedup``, see :class:`WorkerPool`
+    """
+    with WorkerPool(checker_names, options, **kwargs) as pool:
+        yield from pool.validate(paths)
+
+
+def main(argv=None):
+    """Run the ncei-batch command."""
+    parser = argparse.ArgumentParser(
+        prog="ncei-batch",
+        description="Validate netCDF files against the NCEI templates in parallel, "
+        "writing a JSON line with the scores of each file as it is checked.",
+    )
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        help="files, directories or glob patterns to validate",
+    )
+    parser.add_argument(
+        "-t",
+        "--test",
+        action="append",
+        help="checker to run, may be repeated (default: ncei-auto)",
+    )
+    parser.add_argument(
+        "-O",
+        "--option",
+        action="append",
+        default=[],
+        help="checker option as checker:option[:value], may be repeated",
+    )
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        action="append",
+        default=[],
+        help="file listing the paths to validate, one per line",
+    )
+    parser.add_argument(
+        "--pattern",
+        default=DEFAULT_PATTERN,
+        help=f"file name pattern searched in directories (default: {DEFAULT_PATTERN})",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--failures",
+        action="store_true",
+        help="include the name, weight and messages of failed results",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="fully check one file per header fingerprint and only the dates, "
+        "identifiers and bounds of the others",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="write a last JSON line with the resident memory of each process",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="SQLite file keeping the results of the files checked, reused "
+        "while their metadata, the checkers and their options are unchanged",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=cache.DEFAULT_CACHE_SIZE,
+        help="size of the cache in bytes, the least recently used results are "
+        "evicted beyond it (default: 256 MiB)",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="write a last JSON line with the entries, size, hits and misses of the cache",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="JSON lines output file (default: standard output)",
+    )
+    args = parser.parse_args(argv)
+    if args.cache_stats and not args.cache:
+        parser.error("--cache-stats needs --cache")
+    if not args.sources and not args.manifest and not args.cache_stats:
+        parser.error("no files, directories, glob patterns or manifests given")
+
+    checker_names = args.test or DEFAULT_SUITES
+    options = parse_options(args.option)
+    if args.cache:
+        for name in checker_names:
+            options.setdefault(name.split(":")[0], {}).update(
+                cache=args.cache,
+                cache_size=args.cache_size,
+            )
+    paths = iter_paths(args.sources, args.manifest, args.pattern)
+    pool = WorkerPool(
+        checker_names,
+        options,
+        jobs=args.jobs,
+        failures=args.failures,
+        dedup=args.dedup,
+    )
+    output = (
+        sys.stdout
+        if args.output == "-"
+        else Path(args.output).open("w", encoding="utf-8")  # noqa: SIM115
+    )
+    status = 0
+    try:
+        with pool:
+            for summary in pool.validate(paths):
+                if "error" in summary:
+                    status = 1
+                output.write(json.dumps(summary, ensure_ascii=False) + "\n")
+                output.flush()
+            if args.memory:
+                footprint = pool.check_memory_footprint()
+                output.write(json.dumps({"memory": footprint}) + "\n")
+        if args.cache_stats:
+            stats = cache.get_cache(args.cache, args.cache_size).stats()
+            output.write(json.dumps({"cache": stats}) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
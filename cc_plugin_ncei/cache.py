@@ -0,0 +1,374 @@
+"""cc_plugin_ncei/cache.py.
+
+On-disk cache of check results, kept in a local SQLite file.
+
+The checks only read the metadata of a dataset, so their results are
+determined by its :func:`util.header_fingerprint`, the checker and its
+version, the plugin and compliance-checker versions and the checker options.
+With the cache option a checker looks its results up in the cache when it is
+set up, and stores them once all of its checks have run::
+
+    compliance-checker -t ncei-auto -O ncei-auto:cache:~/.cache/ncei.sqlite data.nc
+
+ncei-batch also keeps the summary of each file in the cache, keyed by its
+path, size and modification time, so unchanged files are not even opened,
+and by its whole header, so touched or copied files are not checked again.
+
+The least recently used entries are evicted when the cache grows past its
+size, see :class:`ResultCache`.
+"""
+
+import multiprocessing.util
+import os
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+
+import compliance_checker
+from compliance_checker.base import Result
+
+import cc_plugin_ncei
+from cc_plugin_ncei import messages, util
+
+# Size of the pickled entries a cache keeps, in bytes, unless given the
+# cache_size option.
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+# Checker options naming the cache, they do not change the results.
+CACHE_OPTIONS = ("cache", "cache_size")
+# Seconds a process waits for another one writing to the cache.
+TIMEOUT = 30
+# Least recently used entries looked up at a time when evicting.
+EVICTION_BATCH = 64
+# Seconds after which reading an entry marks it as used again. Reads do not
+# write to the cache, their counters and marks are written with the next
+# entry stored, or once READ_BATCH reads are pending.
+TOUCH_INTERVAL = 60
+READ_BATCH = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+_COUNTERS = ("hits", "misses", "stores", "evictions")
+
+_caches = {}
+
+
+def _options_key(options):
+    return repr(
+        sorted(
+            (name, value)
+            for name, value in (options or {}).items()
+            if name not in CACHE_OPTIONS
+        ),
+    )
+
+
+def cache_key(checker, ds, options=None):
+    """Return the key of the results of ``checker`` on ``ds``.
+
+    :param checker: a checker instance
+    :param ds: an open netCDF dataset or a DatasetSnapshot
+    :param dict options: the checker options
+    """
+    return "|".join(
+        (
+            util.header_fingerprint(ds, dynamic=()),
+            f"{type(checker).__module__}.{type(checker).__qualname__}",
+            str(getattr(checker, "_cc_spec", "")),
+            str(getattr(checker, "_cc_spec_version", "")),
+            str(getattr(checker, "_cc_checker_version", "")),
+            cc_plugin_ncei.__version__,
+            compliance_checker.__version__,
+            _options_key(options),
+        ),
+    )
+
+
+def file_key(path):
+    """Return a key of a file from its resolved path, size and modification time.
+
+    Like make, a file rewritten with the same size within the resolution of
+    its modification time is taken to be unchanged.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def summary_key(source, checkers, options=None, *parts):
+    """Return the key of the ncei-batch summary of a file.
+
+    :param str source: the :func:`file_key` of the file, or the
+                       :func:`util.header_fingerprint` of its whole header
+    :param checkers: (name, checker class) pairs of the checkers run on it
+    :param dict options: options of each checker type
+    :param parts: anything else changing the summary
+    """
+    options = options or {}
+    return "|".join(
+        (
+            "summary",
+            source,
+            cc_plugin_ncei.__version__,
+            compliance_checker.__version__,
+            *(
+                "{}={}/{}/{}".format(
+                    name,
+                    getattr(checker_class, "_cc_spec_version", ""),
+                    getattr(checker_class, "_cc_checker_version", ""),
+                    _options_key(options.get(name.split(":")[0])),
+                )
+                for name, checker_class in checkers
+            ),
+            *map(repr, parts),
+        ),
+    )
+
+
+def _pack(result):
+    if isinstance(result, Result):
+        return (
+            "result",
+            result.weight,
+            result.value,
+            result.name,
+            [messages.pack(message) for message in result.msgs],
+            result.variable_name,
+        )
+    # checks may return a bare value, turned into a Result by the suite
+    return ("value", result)
+
+
+def _unpack(entry):
+    if entry[0] == "value":
+        return entry[1]
+    weight, value, name, msgs, variable_name = entry[1:]
+    msgs = [messages.unpack(message) for message in msgs]
+    return Result(weight, value, name, msgs, variable_name=variable_name)
+
+
+def pack_results(results):
+    """Return the check results as plain tuples that can be cached.
+
+    Messages are kept as their records, see :func:`messages.pack`.
+
+    :param dict results: check method name to the list of its results
+    """
+    return {
+        name: [_pack(result) for result in check_results]
+        for name, check_results in results.items()
+    }
+
+
+def unpack_results(packed):
+    """Return the check results packed by :func:`pack_results`."""
+    return {
+        name: [_unpack(entry) for entry in entries]
+        for name, entries in packed.items()
+    }
+
+
+class ResultCache:
+    """Entries kept in a SQLite file, evicted least recently used first.
+
+    Several processes can share a cache file. Entries are pickled, only open
+    caches you have written yourself. Reads take no lock, the hits, misses
+    and last uses they record are written in batches, see :meth:`flush`.
+
+    :param path: path of the SQLite file, created if needed
+    :param int max_size: size of the stored results in bytes, the least
+                         recently used are evicted beyond it
+    """
+
+    def __init__(self, path, max_size=DEFAULT_CACHE_SIZE):
+        self.path = Path(path).expanduser()
+        self.max_size = max_size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # transactions are opened explicitly, see put
+        self._db = sqlite3.connect(
+            self.path,
+            timeout=TIMEOUT,
+            isolation_level=None,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    self._db.execute(statement)
+        self.touch_interval = TOUCH_INTERVAL
+        self._reads = dict.fromkeys(("hits", "misses"), 0)
+        self._touched = {}
+        # write the pending reads when the process exits, pool workers too
+        multiprocessing.util.Finalize(self, self.close, exitpriority=0)
+
+    def get(self, key):
+        """Return the entry stored for ``key``, or None."""
+        row = self._db.execute(
+            "SELECT data, last_used FROM results WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            self._reads["misses"] += 1
+        else:
+            self._reads["hits"] += 1
+            now = time.time()
+            if now - row[1] >= self.touch_interval:
+                self._touched[key] = now
+        if sum(self._reads.values()) >= READ_BATCH:
+            self.flush()
+        return None if row is None else pickle.loads(row[0])  # noqa: S301
+
+    def flush(self):
+        """Write the counters and last uses of the pending reads."""
+        if not any(self._reads.values()):
+            return
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._write_reads()
+
+    def _write_reads(self):
+        self._db.executemany(
+            "UPDATE results SET last_used = ? WHERE key = ?",
+            [(now, key) for key, now in self._touched.items()],
+        )
+        for name, value in self._reads.items():
+            if value:
+                self._count(name, value)
+        self._reads = dict.fromkeys(self._reads, 0)
+        self._touched.clear()
+
+    def put(self, key, value):
+        """Store the entry of ``key``, evicting the least recently used.
+
+        The total size of the entries is kept with the counters, so storing
+        does not scan the cache unless it has grown past ``max_size``.
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._write_reads()
+            row = self._db.execute(
+                "SELECT size FROM results WHERE key = ?",
+                (key,),
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._count("size", len(data) - (row[0] if row else 0))
+            self._count("stores")
+            self._evict()
+
+    def _evict(self):
+        size = self._counter("size")
+        evicted = 0
+        while size > self.max_size:
+            candidates = self._db.execute(
+                "SELECT key, size FROM results ORDER BY last_used LIMIT ?",
+                (EVICTION_BATCH,),
+            ).fetchall()
+            if not candidates:
+                break
+            for key, entry_size in candidates:
+                if size <= self.max_size:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                size -= entry_size
+                self._count("size", -entry_size)
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _count(self, name, increment=1):
+        self._db.execute(
+            "INSERT INTO stats VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            (name, increment),
+        )
+
+    def _counter(self, name):
+        row = self._db.execute(
+            "SELECT value FROM stats WHERE name = ?",
+            (name,),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def stats(self):
+        """Return the number and size of the stored entries and the counters.
+
+        ``hits``, ``misses``, ``stores`` and ``evictions`` count since the
+        cache file was created or :meth:`clear` was last called.
+        """
+        self.flush()
+        (entries,) = self._db.execute(
+            "SELECT COUNT(*) FROM results",
+        ).fetchone()
+        stats = dict.fromkeys(("size", *_COUNTERS), 0)
+        stats.update(
+            self._db.execute("SELECT name, value FROM stats").fetchall(),
+        )
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "size": stats.pop("size"),
+            "max_size": self.max_size,
+            **stats,
+        }
+
+    def clear(self):
+        """Remove every stored entry and reset the counters."""
+        self._reads = dict.fromkeys(self._reads, 0)
+        self._touched.clear()
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM results")
+            self._db.execute("DELETE FROM stats")
+
+    def close(self):
+        """Write the pending reads and close the SQLite file."""
+        self.flush()
+        self._db.close()
+
+
+def get_cache(path, max_size=DEFAULT_CACHE_SIZE):
+    """Return the ResultCache of ``path`` opened by this process.
+
+    Connections are not shared with forked processes, each opens its own.
+    """
+    key = (str(Path(path).expanduser()), os.getpid())
+    cache = _caches.get(key)
+    if cache is None:
+        cache = _caches[key] = ResultCache(path, max_size)
+    cache.max_size = max_size
+    return cache
+
+
+def from_options(options):
+    """Return the ResultCache given by the cache and cache_size options, or None.
+
+    :param dict options: checker options
+    """
+    if not options or "cache" not in options:
+        return None
+    if not options["cache"]:
+        msg = "cache must be the path of the cache file, e.g. cache:results.sqlite"
+        raise ValueError(msg)
+    size = options.get("cache_size")
+    if size is None:
+        size = DEFAULT_CACHE_SIZE
+    elif not str(size).isdigit():
+        msg = f"cache_size must be a number of bytes, not {size!r}"
+        raise ValueError(msg)
+    return get_cache(options["cache"], int(size))
@@ -0,0 +1,261 @@
+"""cc_plugin_ncei/messages.py."""
+
+import ast
+import contextlib
+import contextvars
+import json
+import sys
+import zlib
+from pathlib import Path
+from pkgutil import get_data
+
+# Message templates by ID, loaded from data/messages.json on import. The ID
+# of a template is the CRC-32 of its text, so it is the same in every process
+# and release for as long as the wording of the message is unchanged.
+CATALOG = {}
+_IDS = {}
+
+# Cleared while checks run in scoring-only mode, see :func:`scores_only`.
+_collecting = contextvars.ContextVar("collecting", default=True)
+
+
+def collecting():
+    """Return false if failure messages should not be built."""
+    return _collecting.get()
+
+
+@contextlib.contextmanager
+def scores_only():
+    """Context in which checks only keep their scores and build no messages."""
+    token = _collecting.set(False)
+    try:
+        yield
+    finally:
+        _collecting.reset(token)
+
+
+def message_id(template):
+    """Return the stable ID of a message template.
+
+    Templates missing from the catalog get an ID too but are not added to
+    it, see :func:`pack`.
+
+    :param str template: str.format template of the message
+    """
+    try:
+        return _IDS[template]
+    except KeyError:
+        return _crc32(template)
+
+
+def render(msg_id, *args, **params):
+    """Return the text of the message with ID ``msg_id`` and the given parameters.
+
+    :param int msg_id: message ID, see :func:`message_id`
+    """
+    return str(Message(CATALOG[msg_id], *args, **params))
+
+
+def pack(message):
+    """Return ``message`` as it is stored, rendered again by :func:`unpack`.
+
+    This is the :attr:`Message.record` of messages whose template is in the
+    catalog, and the text of the others.
+    """
+    if isinstance(message, Message) and message.template is None:
+        return message.record
+    return str(message)
+
+
+def unpack(stored):
+    """Return the message stored by :func:`pack`, rendering its template."""
+    if isinstance(stored, str):
+        return stored
+    msg_id, args, params = stored
+    return Message(CATALOG[msg_id], *args, **params)
+
+
+class Message(str):  # noqa: SLOT000
+    """A result message rendered from a catalog template.
+
+    It is the text of the message, which is what compliance-checker reports,
+    and keeps the ``id`` of its template with the ``args`` and ``params`` it
+    was rendered with. Results can then be stored and grouped by integer ID
+    and parameters instead of by text, and rendered again with
+    :func:`render`. Templates are only formatted if parameters are given.
+    """
+
+    # template of the messages missing from the catalog, None for the others
+    template = None
+
+    def __new__(cls, template, /, *args, **params):
+        """Render ``template`` with ``args`` and ``params``."""
+        text = template.format(*args, **params) if args or params else template
+        message = super().__new__(cls, text)
+        message.id = _IDS.get(template)
+        if message.id is None:
+            message.id = _crc32(template)
+            message.template = template
+        message.args = args
+        message.params = params
+        return message
+
+    def __reduce__(self):
+        """Pickle the ID and parameters, the message is rendered again on load.
+
+        Messages missing from the catalog keep their template instead.
+        """
+        if self.template is None:
+            return _unpickle, self.record
+        return _unpickle_template, (self.template, self.args, self.params)
+
+    @property
+    def record(self):
+        """Tuple of the ID, positional and keyword parameters of the message."""
+        return self.id, self.args, self.params
+
+
+def _unpickle(msg_id, args, params):
+    return Message(CATALOG[msg_id], *args, **params)
+
+
+def _unpickle_template(template, args, params):
+    return Message(template, *args, **params)
+
+
+def catalog():
+    """Return a copy of the catalog of the message templates, by ID."""
+    return dict(CATALOG)
+
+
+def _local_strings(function):
+    """Return the local variables of ``function`` built from string literals.
+
+    They are assigned a string literal and only extended with ``+=``.
+    """
+    assignments = sorted(
+        (
+            node
+            for node in ast.walk(function)
+            if isinstance(node, (ast.Assign, ast.AugAssign))
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        ),
+        key=lambda node: (node.lineno, node.col_offset),
+    )
+    strings = {}
+    for node in assignments:
+        if isinstance(node, ast.Assign):
+            target = node.targets[0]
+            if isinstance(target, ast.Name):
+                strings[target.id] = node.value.value
+        elif getattr(node.target, "id", None) in strings:
+            strings[node.target.id] += node.value.value
+    return strings
+
+
+def _template_args(call):
+    """Return the template arguments of a TestCtx.assert_true or Message call."""
+    name = getattr(call.func, "attr", getattr(call.func, "id", None))
+    if name == "assert_true":
+        keywords = [
+            keyword.value
+            for keyword in call.keywords
+            if keyword.arg == "message"
+        ]
+        return call.args[1:2] + keywords
+    if name == "Message":
+        return call.args[:1]
+    return []
+
+
+def _literal_templates(tree):
+    """Yield the templates given to TestCtx.assert_true and Message in ``tree``.
+
+    Templates are string literals, or local variables assigned and extended
+    with string literals in the same function.
+    """
+    for function in ast.walk(tree):
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        strings = _local_strings(function)
+        for call in ast.walk(function):
+            if not isinstance(call, ast.Call):
+                continue
+            for arg in _template_args(call):
+                template = strings.get(getattr(arg, "id", None))
+                if isinstance(arg, ast.Constant) and isinstance(
+                    arg.value,
+                    str,
+                ):
+                    template = arg.value
+                if template:
+                    yield template
+
+
+def compile_catalog(json_path=Path(__file__).parent / "data/messages.json"):
+    """Regenerate data/messages.json from the templates of the checkers.
+
+    The templates are those of the attribute rule tables and those given to
+    TestCtx.assert_true and Message in the checker modules, so that stored
+    message IDs can be rendered in any process. Call this after changing
+    the wording of a message.
+    """
+    import importlib  # noqa: PLC0415
+    import inspect  # noqa: PLC0415
+    import pkgutil  # noqa: PLC0415
+
+    import cc_plugin_ncei  # noqa: PLC0415
+    from cc_plugin_ncei.rules import Rule  # noqa: PLC0415
+
+    templates = set()
+    for module_info in pkgutil.iter_modules(cc_plugin_ncei.__path__):
+        if not module_info.name.startswith("ncei_"):
+            continue
+        module = importlib.import_module(f"cc_plugin_ncei.{module_info.name}")
+        templates.update(
+            _literal_templates(ast.parse(inspect.getsource(module))),
+        )
+        namespaces = [vars(module)]
+        namespaces.extend(
+            vars(value)
+            for value in vars(module).values()
+            if inspect.isclass(value)
+        )
+        templates.update(
+            rule.message
+            for namespace in namespaces
+            for value in namespace.values()
+            if isinstance(value, tuple)
+            for rule in value
+            if isinstance(rule, Rule)
+        )
+    ids = {}
+    for template in sorted(templates):
+        other = ids.setdefault(_crc32(template), template)
+        if other != template:
+            msg = f"Message templates {other!r} and {template!r} have the same ID"
+            raise ValueError(msg)
+    index = {"templates": sorted(templates)}
+    Path(json_path).write_text(
+        json.dumps(index, indent=4, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    return index
+
+
+def _crc32(template):
+    return zlib.crc32(template.encode("utf-8"))
+
+
+def _load_catalog():
+    """Add the templates of data/messages.json to the catalog."""
+    resource_text = get_data("cc_plugin_ncei", "data/messages.json")
+    for text in json.loads(resource_text)["templates"]:
+        template = sys.intern(text)
+        msg_id = _crc32(template)
+        CATALOG[msg_id] = template
+        _IDS[template] = msg_id
+
+
+_load_catalog()
@@ -0,0 +1,274 @@
+"""cc_plugin_ncei/ncei_auto.py."""
+
+import inspect
+import typing
+
+from compliance_checker.base import BaseCheck, BaseNCCheck
+
+from cc_plugin_ncei import util
+from cc_plugin_ncei.messages import Message
+from cc_plugin_ncei.ncei_base import NCEI2_0Check, TestCtx, score_only_check
+from cc_plugin_ncei.ncei_grid import NCEIGrid1_1, NCEIGrid2_0
+from cc_plugin_ncei.ncei_point import NCEIPoint1_1, NCEIPoint2_0
+from cc_plugin_ncei.ncei_profile import (
+    NCEIProfileIncomplete1_1,
+    NCEIProfileIncomplete2_0,
+    NCEIProfileOrthogonal1_1,
+    NCEIProfileOrthogonal2_0,
+)
+from cc_plugin_ncei.ncei_timeseries import (
+    NCEITimeSeriesIncomplete1_1,
+    NCEITimeSeriesIncomplete2_0,
+    NCEITimeSeriesOrthogonal1_1,
+    NCEITimeSeriesOrthogonal2_0,
+)
+from cc_plugin_ncei.ncei_timeseries_profile import (
+    NCEITimeSeriesProfileIncomplete1_1,
+    NCEITimeSeriesProfileIncomplete2_0,
+    NCEITimeSeriesProfileIncompleteTimeOrthDepth1_1,
+    NCEITimeSeriesProfileIncompleteTimeOrthDepth2_0,
+    NCEITimeSeriesProfileOrthogonal1_1,
+    NCEITimeSeriesProfileOrthogonal2_0,
+    NCEITimeSeriesProfileOrthTimeIncompleteDepth1_1,
+    NCEITimeSeriesProfileOrthTimeIncompleteDepth2_0,
+)
+from cc_plugin_ncei.ncei_trajectory import NCEITrajectory1_1, NCEITrajectory2_0
+from cc_plugin_ncei.ncei_trajectory_profile import (
+    NCEITrajectoryProfileIncomplete1_1,
+    NCEITrajectoryProfileIncomplete2_0,
+    NCEITrajectoryProfileOrthogonal1_1,
+    NCEITrajectoryProfileOrthogonal2_0,
+)
+
+# (version 1.1 checker, version 2.0 checker, representations from
+# util.FEATURE_TYPES the templates accept), in order of preference.
+TEMPLATES = (
+    (NCEIPoint1_1, NCEIPoint2_0, ("point",)),
+    (
+        NCEITimeSeriesOrthogonal1_1,
+        NCEITimeSeriesOrthogonal2_0,
+        ("timeseries", "multi-timeseries-orthogonal"),
+    ),
+    (
+        NCEITimeSeriesIncomplete1_1,
+        NCEITimeSeriesIncomplete2_0,
+        ("multi-timeseries-incomplete",),
+    ),
+    (
+        NCEITrajectory1_1,
+        NCEITrajectory2_0,
+        ("trajectory", "trajectory-single"),
+    ),
+    (
+        NCEIProfileOrthogonal1_1,
+        NCEIProfileOrthogonal2_0,
+        ("profile-orthogonal",),
+    ),
+    (
+        NCEIProfileIncomplete1_1,
+        NCEIProfileIncomplete2_0,
+        ("profile-incomplete",),
+    ),
+    (
+        NCEITimeSeriesProfileOrthogonal1_1,
+        NCEITimeSeriesProfileOrthogonal2_0,
+        (
+            "timeseries-profile-single-station",
+            "timeseries-profile-multi-station",
+        ),
+    ),
+    (
+        NCEITimeSeriesProfileOrthTimeIncompleteDepth1_1,
+        NCEITimeSeriesProfileOrthTimeIncompleteDepth2_0,
+        (
+            "timeseries-profile-single-ortho-time",
+            "timeseries-profile-multi-ortho-time",
+        ),
+    ),
+    (
+        NCEITimeSeriesProfileIncomplete1_1,
+        NCEITimeSeriesProfileIncomplete2_0,
+        ("timeseries-profile-incomplete",),
+    ),
+    (
+        NCEITimeSeriesProfileIncompleteTimeOrthDepth1_1,
+        NCEITimeSeriesProfileIncompleteTimeOrthDepth2_0,
+        ("timeseries-profile-ortho-depth",),
+    ),
+    (
+        NCEITrajectoryProfileOrthogonal1_1,
+        NCEITrajectoryProfileOrthogonal2_0,
+        ("trajectory-profile-orthogonal",),
+    ),
+    (
+        NCEITrajectoryProfileIncomplete1_1,
+        NCEITrajectoryProfileIncomplete2_0,
+        ("trajectory-profile-incomplete",),
+    ),
+    (NCEIGrid1_1, NCEIGrid2_0, ("2d-regular-grid", "3d-regular-grid")),
+)
+
+
+def detect_templates(ds, context=None):
+    """Return the NCEI template checker classes matching a dataset.
+
+    A template version attribute naming a known template selects that checker
+    directly. Otherwise the template is the one accepting the dimensions of
+    the most geophysical variables, with the featureType attribute breaking
+    ties, and the version is taken from whichever of ncei_template_version or
+    nodc_template_version is present. Without either both versions are
+    returned.
+
+    :param netCDF4.Dataset ds: An open netCDF dataset
+    :param util.DatasetContext context: context of the dataset, if it was
+                                        already built
+    """
+    if context is None:
+        context = util.get_context(ds, refresh=False)
+    ds = context.dataset
+    template = getattr(
+        ds,
+        "ncei_template_version",
+        getattr(ds, "nodc_template_version", ""),
+    )
+    if isinstance(template, str) and template:
+        for checkers in TEMPLATES:
+            for checker in checkers[:2]:
+                valid_templates = [t.lower() for t in checker.valid_templates]
+                if template.lower() in valid_templates:
+                    return [checker]
+
+    if "ncei_template_version" in ds.attrs:
+        versions = (1,)
+    elif "nodc_template_version" in ds.attrs:
+        versions = (0,)
+    else:
+        versions = (0, 1)
+
+    feature_types = context.feature_types.values()
+    scores = [
+        sum(1 for found in feature_types if found.intersection(accepted))
+        for _, _, accepted in TEMPLATES
+    ]
+    best = max(scores)
+    candidates = [
+        checkers for checkers, score in zip(TEMPLATES, scores) if score == best
+    ]
+
+    feature_type = str(getattr(ds, "featureType", "")).lower()
+    declared = [
+        checkers
+        for checkers in candidates
+        if feature_type in (t.lower() for t in checkers[0].valid_feature_types)
+    ]
+    if declared:
+        candidates = declared
+    elif not best:
+        return []
+    return [candidates[0][version] for version in versions]
+
+
+class NCEIAuto(BaseNCCheck, BaseCheck):
+    """NCEIAuto."""
+
+    register_checker = True
+    _cc_spec = "ncei-auto"
+    _cc_spec_version = "1.0"
+    _cc_description = (
+        "This test detects which NCEI netCDF template, version 1.1 or 2.0, the selected file follows "
+        "from its featureType, its nodc_template_version or ncei_template_version attribute and the "
+        "dimensions of its geophysical variables, and then runs the checks for that template only."
+    )
+    _cc_url = "https://www.ncei.noaa.gov/netcdf-templates"
+    _cc_authors = "Luke Campbell, Dan Maher"
+    _cc_checker_version = "1.0.0"
+    _cc_display_headers: typing.ClassVar[dict] = {
+        3: "Required",
+        2: "Recommended",
+        1: "Suggested",
+    }
+    # check_detected_template only depends on the header fingerprint, the
+    # checks of the detected checkers declare their own.
+    dynamic_checks: typing.ClassVar[tuple] = ()
+
+    def __init__(self, options=None):
+        """Initialize the checker, see :meth:`setup`."""
+        super().__init__(options=options)
+        self._instances = {}
+
+    def setup(self, ds):
+        """Detect the template of the dataset and take over its checks.
+
+        The check methods of the detected checkers are bound to this instance
+        so that the suite runs them as its own. When two checkers are detected
+        their methods are suffixed with the template version, and they are
+        run with the combined option so the checks common to both versions
+        are only evaluated once. Options given to this checker, such as
+        min_severity, are passed on to them.
+
+        The variables of the dataset are discovered once, the template is
+        detected from them and the detected checkers run on the same
+        context. With the session option, or inside a :class:`util.Session`,
+        it is the context of the session, so later runs on the same dataset
+        do not discover them again. The checker instances are kept for the
+        next dataset this checker is set up for.
+        """
+        for name in [name for name in vars(self) if name.startswith("check_")]:
+            delattr(self, name)
+
+        session = None
+        if self.options and "session" in self.options:
+            session = util.DEFAULT_SESSION
+        context = util.get_context(ds, session=session)
+        checker_classes = detect_templates(ds, context)
+        options = dict(self.options or {})
+        if len(checker_classes) > 1:
+            options["combined"] = None
+
+        self.checkers = []
+        for checker_class in checker_classes:
+            checker = self._instance(checker_class, options)
+            checker.setup(ds, context)
+            self.checkers.append(checker)
+
+        for checker in self.checkers:
+            suffix = ""
+            if len(self.checkers) > 1:
+                suffix = (
+                    "_v2_0" if isinstance(checker, NCEI2_0Check) else "_v1_1"
+                )
+            for name, method in inspect.getmembers(checker, inspect.ismethod):
+                if name.startswith("check_"):
+                    setattr(self, name + suffix, method)
+
+        if "score_only" in options:
+            self.check_detected_template = score_only_check(
+                self.check_detected_template,
+            )
+
+    def _instance(self, checker_class, options):
+        """Return the kept instance of ``checker_class`` for ``options``."""
+        key = (checker_class, "combined" in options)
+        if key not in self._instances:
+            self._instances[key] = checker_class(options=options)
+        return self._instances[key]
+
+    def check_detected_template(self, dataset):  # noqa: ARG002
+        """Report the NCEI template the dataset was detected as.
+
+        :param netCDF4.Dataset dataset: An open netCDF dataset
+        """
+        required_ctx = TestCtx(BaseCheck.HIGH, "Detected NCEI template")
+        if required_ctx.messages is not None:
+            required_ctx.messages.extend(
+                Message(
+                    "detected {template}",
+                    template=checker.valid_templates[0],
+                )
+                for checker in self.checkers
+            )
+        required_ctx.assert_true(
+            bool(self.checkers),
+            "the NCEI template could not be detected from featureType, the template version attribute or the dimensions of the geophysical variables",
+        )
+        return required_ctx.to_result()
@@ -1,19 +1,127 @@
 """cc_plugin_ncei/ncei_base.py."""
 
+import copy
+import functools
+import inspect
 import re
+import threading
+import types
 import typing
 
 from compliance_checker.base import BaseCheck, BaseNCCheck, Result
-from compliance_checker.cf.util import StandardNameTable, units_convertible
-from compliance_checker.cfunits import Unit
-from isodate import ISO8601Error, parse_datetime
 
-from cc_plugin_ncei import util
+from cc_plugin_ncei import cache, rules, util
+from cc_plugin_ncei.messages import Message, collecting, scores_only
+from cc_plugin_ncei.units import is_convertible, is_valid_unit
+
+# Values accepted by the min_severity checker option, e.g.
+# ``-O ncei-point:min_severity:high``.
+SEVERITIES = {
+    "high": BaseCheck.HIGH,
+    "medium": BaseCheck.MEDIUM,
+    "low": BaseCheck.LOW,
+}
+
+
+def max_severity(weight):
+    """Declare the highest weight of the results a check method returns.
+
+    Checks that are not decorated are taken to return BaseCheck.HIGH results.
+    They are skipped when the min_severity option is above ``weight``.
+    """
+
+    def decorator(method):
+        method.max_severity = weight
+        return method
+
+    return decorator
+
+
+# Results of the checks declared with depends_on, kept for the memoize option
+# and shared by every checker of the process. At most MEMO_SIZE are kept, the
+# least recently used are dropped first. Only read or changed while holding
+# _memo_lock, the checks themselves run without it.
+MEMO_SIZE = 4096
+_memo = {}
+_memo_lock = threading.Lock()
+_MISSING = object()
+
+# Attributes read by BaseNCEICheck._check_min_max_range.
+RANGE_ATTRIBUTES = ("valid_range", "valid_min", "valid_max")
+
+
+class CheckInputs(typing.NamedTuple):
+    """The metadata a check method reads, see :func:`depends_on`."""
+
+    target: typing.Any
+    attrs: tuple
+    global_attributes: typing.Any
+
+
+def depends_on(target=None, attrs=(), global_attributes=()):
+    """Declare the metadata a check method reads, for the memoize option.
+
+    With the memoize option the results of the check are reused for every
+    dataset giving the same values to all of it, see
+    :meth:`BaseNCEICheck._memoized_check`, so the declaration must cover
+    everything the check reads besides the checker options.
+
+    :param target: field of util.DatasetContext naming the variable, or the
+                   variables, the check reads, or a callable taking the
+                   context and returning their names
+    :param tuple attrs: attributes of those variables the check reads, their
+                        name and dtype are always read
+    :param global_attributes: global attributes the check reads, or the name
+                              of a checker attribute listing them
+    """
+
+    def decorator(method):
+        method.inputs = CheckInputs(target, tuple(attrs), global_attributes)
+        return method
+
+    return decorator
+
+
+def cf_role(role):
+    """Return a depends_on target selecting the variables of a cf_role."""
+
+    def select(context):
+        return context.dataset.attribute_index.find("cf_role", role)
+
+    return select
+
+
+def _copy_results(results):
+    """Return copies of check results, the suite sets the checker on each."""
+    if isinstance(results, list):
+        return [copy.copy(result) for result in results]
+    return copy.copy(results)
+
+
+def score_only_check(method):
+    """Return the bound check ``method`` wrapped for the score_only option.
+
+    The check runs in :func:`messages.scores_only` so that no failure
+    message is built, and the results it returns are left without any.
+    """
+
+    @functools.wraps(method)
+    def check(self, dataset):  # noqa: ARG001
+        with scores_only():
+            results = method(dataset)
+        for result in results if isinstance(results, list) else [results]:
+            if result is not None:
+                result.msgs = []
+        return results
+
+    return types.MethodType(check, method.__self__)
 
 
 class TestCtx:
     """Simple struct object that holds score values and messages to compile into a result."""
 
+    __slots__ = ("category", "description", "messages", "out_of", "score")
+
     def __init__(
         self,
         category=None,
@@ -25,7 +133,7 @@ class TestCtx:
         self.category = category or BaseCheck.LOW
         self.out_of = out_of
         self.score = score
-        self.messages = messages or []
+        self.messages = (messages or []) if collecting() else None
         self.description = description or ""
 
     def to_result(self):
@@ -37,14 +145,25 @@ class TestCtx:
             self.messages,
         )
 
-    def assert_true(self, test, message):
-        """Increments score if test is true otherwise appends a message."""
+    def assert_true(self, test, message, *args, **kwargs):
+        """Increments score if test is true otherwise appends a message.
+
+        The message is only built when the test fails. It is a
+        :class:`Message` of the template ``message`` and the positional or
+        keyword arguments, giving it a stable ID. If ``message`` is callable
+        it is called to get the message instead. In scoring-only mode, see
+        :func:`messages.scores_only`, only the score is kept.
+        """
         self.out_of += 1
 
         if test:
             self.score += 1
+        elif self.messages is None:
+            return
+        elif callable(message):
+            self.messages.append(message())
         else:
-            self.messages.append(message)
+            self.messages.append(Message(message, *args, **kwargs))
 
 
 class BaseNCEICheck(BaseNCCheck):
@@ -57,47 +176,460 @@ class BaseNCEICheck(BaseNCCheck):
         1: "Suggested",
     }
 
-    @classmethod
-    def __init__(cls):
-        cls._std_names = StandardNameTable()
-        cls.high_rec_atts = []
-        cls.rec_atts = [
-            "title",
-            "summary",
-            "source",
-            "uuid",
-            "id",
-            "naming_authority",
-            "geospatial_lat_min",
-            "geospatial_lat_max",
-            "geospatial_lat_resolution",
-            "geospatial_lon_min",
-            "geospatial_lon_max",
-            "geospatial_lon_resolution",
-            "geospatial_vertical_max",
-            "geospatial_vertical_min",
-            "geospatial_vertical_units",
-            "geospatial_vertical_resolution",
-            "institution",
-            "creator_name",
-            "creator_url",
-            "creator_email",
-            "project",
-            "processing_level",
-            "references",
-            "keywords_vocabulary",
-            "keywords",
-            "publisher_name",
-            "publisher_email",
-            "publisher_url",
-            "history",
-            "license",
-            "metadata_link",
+    context = None
+    min_severity = BaseCheck.LOW
+    required_failure = None
+    vectorized = None
+    aggregate = False
+    score_only = False
+
+    high_rec_atts: typing.ClassVar[tuple] = ()
+    rec_atts: typing.ClassVar[tuple] = (
+        "title",
+        "summary",
+        "source",
+        "uuid",
+        "id",
+        "naming_authority",
+        "geospatial_lat_min",
+        "geospatial_lat_max",
+        "geospatial_lat_resolution",
+        "geospatial_lon_min",
+        "geospatial_lon_max",
+        "geospatial_lon_resolution",
+        "geospatial_vertical_max",
+        "geospatial_vertical_min",
+        "geospatial_vertical_units",
+        "geospatial_vertical_resolution",
+        "institution",
+        "creator_name",
+        "creator_url",
+        "creator_email",
+        "project",
+        "processing_level",
+        "references",
+        "keywords_vocabulary",
+        "keywords",
+        "publisher_name",
+        "publisher_email",
+        "publisher_url",
+        "history",
+        "license",
+        "metadata_link",
+    )
+    sug_atts: typing.ClassVar[tuple] = ()
+
+    qaqc_rules: typing.ClassVar[tuple] = (
+        rules.Rule(
+            "flag",
+            "flag_values",
+            rules.defines_flags,
+            BaseCheck.HIGH,
+            "flag variable must define either flag_values or flag_masks",
+        ),
+        rules.Rule(
+            "flag",
+            "standard_name",
+            rules.ends_with(" status_flag"),
+            BaseCheck.MEDIUM,
+            "The standard_name attribute should end with status_flag",
+        ),
+        rules.Rule(
+            "flag",
+            "long_name",
+            rules.not_empty,
+            BaseCheck.MEDIUM,
+            "The long_name attribute should exist and not be empty",
+        ),
+        rules.Rule(
+            "flag",
+            "comment",
+            rules.not_empty,
+            BaseCheck.MEDIUM,
+            "comment attribute should not be empty if specified",
+            rules.defined("comment"),
+        ),
+    )
+
+    # Checks giving the same results for the 1.1 and 2.0 templates. With the
+    # combined option they are evaluated once per dataset and their results
+    # shared by every checker run on it.
+    shared_checks: typing.ClassVar[tuple] = (
+        "check_lat",
+        "check_lon",
+        "check_time",
+        "check_height",
+        "check_qaqc",
+        "check_instrument",
+        "check_crs",
+        "check_dimensions",
+        "check_bounds_variables",
+        "check_profile_id",
+        "check_timeseries_id",
+        "check_trajectory_id",
+    )
+
+    # Checks the fail_fast option runs first, in this order.
+    triage_checks: typing.ClassVar[tuple] = (
+        "check_dimensions",
+        "check_required_attributes",
+        "check_base_required_attributes",
+    )
+
+    # Checks reading the global attributes in util.DYNAMIC_ATTRIBUTES. They are
+    # the only checks whose results can differ between two datasets with the
+    # same util.header_fingerprint.
+    dynamic_checks: typing.ClassVar[tuple] = (
+        "check_recommended",
+        "check_recommended_attributes",
+        "check_recommended_global_attributes",
+        "check_base_suggested_attributes",
+    )
+
+    @property
+    def _std_names(self):
+        """The CF standard name table, shared by every checker in the process."""
+        return util.get_standard_name_table()
+
+    def setup(self, ds, context=None):
+        """Take a fresh metadata snapshot of the dataset before the checks run.
+
+        Every check reads the dataset through :func:`util.get_snapshot`, so the
+        variable attributes are read from the netCDF library only once per run.
+        The variables the checks look up are discovered once into
+        ``self.context``, a :class:`util.DatasetContext`, unless the
+        ``context`` of the dataset is given, as NCEIAuto does with the one it
+        detected the template from.
+
+        With the min_severity option, check methods whose results all fall
+        below it are removed from this instance so the suite never calls them.
+        With the fail_fast option the triage checks are run here, see
+        :meth:`_setup_fail_fast`. With the combined option the context of the
+        previous checker set up on the dataset is kept, so that the 1.1 and
+        2.0 checkers of a template run together share the results of the
+        ``shared_checks``; a checker set up again on it starts a new run
+        from a fresh snapshot. Inside a :class:`util.Session`, or with the
+        session option, the context of the dataset is reused from the
+        previous checkers run on it. With the aggregate option the checks of
+        geophysical, flag, platform and instrument variables report one
+        result per distinct outcome instead of one per variable, and with the
+        score_only option the checks only keep their scores, see
+        :func:`score_only_check`. With the cache option the results are taken
+        from the cache when it has them, see :meth:`_setup_cache`. With the
+        memoize option the checks declaring their inputs with
+        :func:`depends_on` reuse the results of any previous dataset giving
+        them the same inputs, see :meth:`_memoized_check`.
+
+        A checker can be set up again for another dataset, the checks skipped
+        or wrapped for the previous one are restored first.
+        """
+        for name in [name for name in vars(self) if name.startswith("check_")]:
+            delattr(self, name)
+
+        combined = bool(self.options) and "combined" in self.options
+        self.context = context or self._get_context(ds, combined)
+        self.context.checkers.add(type(self))
+
+        self.min_severity = self._parse_min_severity()
+        self.vectorized = self._parse_vectorized()
+        self.aggregate = bool(self.options) and "aggregate" in self.options
+        self.score_only = bool(self.options) and "score_only" in self.options
+        self._skip_below_min_severity()
+
+        if self.options and "memoize" in self.options:
+            self._wrap_checks(self._memoized_check)
+        if combined:
+            self._wrap_checks(self._shared_check, self.shared_checks)
+        if self.score_only:
+            self._wrap_checks(score_only_check)
+        if self._setup_cache():
+            return
+
+        if self.options and "fail_fast" in self.options:
+            self._setup_fail_fast(ds)
+        if self.result_cache is not None:
+            self._wrap_checks(self._storing_check)
+
+    def _get_context(self, ds, combined):
+        """Return the util.DatasetContext of ``ds`` for this run.
+
+        With the combined option the context of the previous checker set up
+        on the dataset is reused, unless this checker was set up on it too:
+        that is a new run, on a dataset that may have changed since.
+        """
+        session = None
+        if self.options and "session" in self.options:
+            session = util.DEFAULT_SESSION
+        context = util.get_context(ds, refresh=not combined, session=session)
+        if type(self) in context.checkers:
+            context = util.get_context(ds, session=session)
+        return context
+
+    def _skip_below_min_severity(self):
+        """Remove the check methods whose results are all below min_severity."""
+        for name, method in inspect.getmembers(self, inspect.ismethod):
+            if (
+                name.startswith("check_")
+                and getattr(method, "max_severity", BaseCheck.HIGH)
+                < self.min_severity
+            ):
+                setattr(self, name, None)
+
+    def _setup_cache(self):
+        """Look the results of the checks up in the cache option's file.
+
+        The cache option is the path of a :class:`cache.ResultCache` and the
+        cache_size option its size in bytes. On a hit every check method is
+        replaced by one returning its cached results and true is returned.
+        On a miss the checks are wrapped to store their results once all of
+        them have returned, see :meth:`_storing_check`.
+        """
+        self.result_cache = cache.from_options(self.options)
+        if self.result_cache is None:
+            return False
+        self._cache_key = cache.cache_key(
+            self,
+            self.context.dataset,
+            self.options,
+        )
+        self._cached_results = {}
+        checks = {
+            name: method
+            for name, method in inspect.getmembers(self, inspect.ismethod)
+            if name.startswith("check_")
+        }
+        self._cache_checks = set(checks)
+        packed = self.result_cache.get(self._cache_key)
+        if packed is None or set(packed) != self._cache_checks:
+            return False
+        results = cache.unpack_results(packed)
+        for name, method in checks.items():
+            setattr(self, name, self._cached_check(method, results[name]))
+        return True
+
+    def _cached_check(self, method, results):
+        """Return ``method`` replaced by its cached ``results``."""
+
+        @functools.wraps(method)
+        def check(self, dataset):  # noqa: ARG001
+            return results
+
+        return types.MethodType(check, self)
+
+    def _storing_check(self, method):
+        """Return ``method`` wrapped to store the results in the cache.
+
+        The results of every check of the dataset are stored together, when
+        the last one returns. Nothing is stored if a check raises.
+        """
+
+        @functools.wraps(method)
+        def check(self, dataset):
+            results = method(dataset)
+            self._cached_results[method.__name__] = (
+                results if isinstance(results, list) else [results]
+            )
+            if self._cached_results.keys() == self._cache_checks:
+                self.result_cache.put(
+                    self._cache_key,
+                    cache.pack_results(self._cached_results),
+                )
+            return results
+
+        return types.MethodType(check, self)
+
+    def _wrap_checks(self, wrapper, names=None):
+        """Replace the check methods, or those in ``names``, by ``wrapper(method)``."""
+        for name, method in inspect.getmembers(self, inspect.ismethod):
+            if name.startswith("check_") and (names is None or name in names):
+                setattr(self, name, wrapper(method))
+
+    def _shared_check(self, method):
+        """Return ``method`` wrapped to share its results for the combined option.
+
+        The results are kept on the dataset context, keyed by the function
+        defining the check and the options changing its results, and each
+        checker gets its own copies since the suite sets the checker on
+        every result. The function is the one the other wrappers, such as
+        :meth:`_memoized_check`, wrap for this checker.
+        """
+        function = inspect.unwrap(method)
+        function = getattr(function, "__func__", function)
+
+        @functools.wraps(method)
+        def check(self, dataset):
+            shared = self.context.check_results
+            key = (
+                function,
+                self.min_severity,
+                self.aggregate,
+                self.score_only,
+            )
+            if key not in shared:
+                shared[key] = method(dataset)
+            return _copy_results(shared[key])
+
+        return types.MethodType(check, self)
+
+    def _memoized_check(self, method):
+        """Return ``method`` wrapped to reuse its results for the memoize option.
+
+        The results are kept in a table shared by every checker of the
+        process, keyed by the checker class, the check, the options changing
+        its results and the metadata it declares with :func:`depends_on`.
+        Datasets whose headers differ elsewhere still reuse them. Checks
+        that do not declare their inputs are returned unchanged.
+        """
+        inputs = getattr(method, "inputs", None)
+        if inputs is None:
+            return method
+
+        @functools.wraps(method)
+        def check(self, dataset):
+            key = (
+                type(self),
+                method.__name__,
+                self.min_severity,
+                self.aggregate,
+                self.score_only,
+                self._inputs_key(inputs),
+            )
+            with _memo_lock:
+                results = _memo.pop(key, _MISSING)
+            if results is _MISSING:
+                results = method(dataset)
+            with _memo_lock:
+                _memo[key] = results
+                while len(_memo) > MEMO_SIZE:
+                    del _memo[next(iter(_memo))]
+            return _copy_results(results)
+
+        return types.MethodType(check, self)
+
+    def _inputs_key(self, inputs):
+        """Return the util.metadata_key of the metadata declared by a check."""
+        target = inputs.target
+        if target is None:
+            names = ()
+        elif callable(target):
+            names = target(self.context)
+        else:
+            names = getattr(self.context, target)
+        if names is None or isinstance(names, str):
+            names = (names,)
+        global_attributes = inputs.global_attributes
+        if isinstance(global_attributes, str):
+            global_attributes = getattr(self, global_attributes)
+        return util.metadata_key(
+            self.context.dataset,
+            names,
+            inputs.attrs,
+            global_attributes,
+        )
+
+    def _setup_fail_fast(self, ds):
+        """Stop evaluating the dataset at its first required failure.
+
+        The triage checks are run in order until one of them reports a failed
+        BaseCheck.HIGH result. Every check method is then wrapped so that the
+        triage results are handed back to the suite, and once a required
+        failure has been found the remaining checks return nothing. The check
+        that failed also returns a "Fail-fast triage" result marking the
+        report as partial.
+        """
+        self.required_failure = None
+        self._triage_results = {}
+        checks = dict(inspect.getmembers(self, inspect.ismethod))
+        for name in self.triage_checks:
+            if name not in checks:
+                continue
+            try:
+                results = checks[name](ds)
+            except Exception:  # noqa: BLE001, S112
+                # left for the suite to run again and report
+                continue
+            self._triage_results[name] = self._note_required_failure(
+                name,
+                results,
+            )
+            if self.required_failure:
+                break
+
+        for name, method in checks.items():
+            if name.startswith("check_"):
+                setattr(self, name, self._fail_fast_check(method))
+
+    def _fail_fast_check(self, method):
+        """Return ``method`` wrapped for the fail_fast option."""
+
+        @functools.wraps(method)
+        def check(self, dataset):
+            name = method.__name__
+            if name in self._triage_results:
+                return self._triage_results.pop(name)
+            if self.required_failure:
+                return []
+            return self._note_required_failure(name, method(dataset))
+
+        return types.MethodType(check, self)
+
+    def _note_required_failure(self, name, results):
+        """Record the first failed required result among a check's results."""
+        if not isinstance(results, list):
+            results = [results]
+        if self.required_failure or not any(
+            result.weight == BaseCheck.HIGH
+            and (
+                result.value is False
+                or (
+                    isinstance(result.value, tuple)
+                    and result.value[0] < result.value[1]
+                )
+            )
+            for result in results
+        ):
+            return results
+        self.required_failure = name
+        return [
+            *results,
+            Result(
+                weight=BaseCheck.HIGH,
+                value=False,
+                name="Fail-fast triage",
+                msgs=[]
+                if self.score_only
+                else [
+                    Message(
+                        "{name} has a required failure, the remaining checks were not run",
+                        name=name,
+                    ),
+                ],
+            ),
         ]
-        cls.sug_atts = []
 
-    def setup(self, ds):  # noqa: D102
-        pass
+    def _parse_min_severity(self):
+        """Return the weight given by the min_severity option, or BaseCheck.LOW."""
+        value = self.options.get("min_severity") if self.options else None
+        if value is None:
+            return BaseCheck.LOW
+        value = str(value).lower()
+        if value.isdigit() and int(value) in SEVERITIES.values():
+            return int(value)
+        if value not in SEVERITIES:
+            msg = f"min_severity must be one of high, medium or low, not {value!r}"
+            raise ValueError(msg)
+        return SEVERITIES[value]
+
+    def _parse_vectorized(self):
+        """Return the vectorized option, None lets the rule engine decide."""
+        if not self.options or "vectorized" not in self.options:
+            return None
+        value = self.options["vectorized"]
+        return value is None or str(value).lower() in ("true", "yes", "1")
+
+    def _evaluates(self, weight):
+        """Return true if results of ``weight`` are reported in this run."""
+        return weight >= self.min_severity
 
     def _check_min_max_range(self, var, test_ctx):
         """Check that either both valid_min and valid_max exist, or valid_range exists."""
@@ -106,24 +638,43 @@ class BaseNCEICheck(BaseNCCheck):
                 var.valid_range.dtype == var.dtype
                 and len(var.valid_range) == 2
                 and var.valid_range[0] <= var.valid_range[1],
-                f"valid_range must be a two element vector of min followed by max with the same data type as {var.name}",
+                "valid_range must be a two element vector of min followed by max with the same data type as {}",
+                var.name,
             )
         else:
             for bound in ("valid_min", "valid_max"):
                 v_bound = getattr(var, bound, "")
-                warn_msg = f"{bound} attribute should exist, have the same type as {var.name}, and not be empty or valid_range should be defined"
+                warn_msg = "{} attribute should exist, have the same type as {}, and not be empty or valid_range should be defined"
                 # need to special case str attributes since they aren't directly
                 # comparable to numpy dtypes
                 if isinstance(v_bound, str):
                     test_ctx.assert_true(
                         v_bound != "" and var.dtype.char == "S",
                         warn_msg,
+                        bound,
+                        var.name,
                     )
                 # otherwise compare the numpy types directly
                 else:
-                    test_ctx.assert_true(v_bound.dtype == var.dtype, warn_msg)
+                    test_ctx.assert_true(
+                        v_bound.dtype == var.dtype,
+                        warn_msg,
+                        bound,
+                        var.name,
+                    )
         return test_ctx
 
+    @depends_on(
+        "lat",
+        (
+            "standard_name",
+            "units",
+            "axis",
+            "long_name",
+            "comment",
+            *RANGE_ATTRIBUTES,
+        ),
+    )
     def check_lat(self, dataset):
         """Check lat.
 
@@ -138,14 +689,15 @@ class BaseNCEICheck(BaseNCCheck):
         lat:ancillary_variables = "" ; //... RECOMMENDED - List other variables providing information about this variable.
         lat:comment = "" ; //............... RECOMMENDED - Add useful, additional information here.
         """
+        dataset = util.get_snapshot(dataset)
         results = []
-        lat = util.get_lat_variable(dataset)
+        lat = self.context.lat
         if not lat:
             return Result(
                 weight=BaseCheck.HIGH,
                 value=False,
                 name="latitude",
-                msgs=["a variable for latitude doesn't exist"],
+                msgs=[Message("a variable for latitude doesn't exist")],
             )
         lat_var = dataset.variables[lat]
         test_ctx = TestCtx(
@@ -158,16 +710,20 @@ class BaseNCEICheck(BaseNCCheck):
         )
         units = getattr(lat_var, "units", "")
         test_ctx.assert_true(
-            units and units_convertible(units, "degrees_north"),
+            units and is_convertible(units, "degrees_north"),
             "units are valid UDUNITS for latitude",
         )
         test_ctx.assert_true(
             getattr(lat_var, "axis", "") == "Y",
-            f"{lat} axis attribute must be Y",
+            "{lat} axis attribute must be Y",
+            lat=lat,
         )
 
         results.append(test_ctx.to_result())
 
+        if not self._evaluates(BaseCheck.MEDIUM):
+            return results
+
         test_ctx = TestCtx(
             BaseCheck.MEDIUM,
             f"Recommended attributes for variable {lat}",
@@ -188,11 +744,23 @@ class BaseNCEICheck(BaseNCCheck):
         )
         test_ctx.assert_true(
             units == "degrees_north",
-            f"{lat} should have units degrees_north",
+            "{lat} should have units degrees_north",
+            lat=lat,
         )
         results.append(test_ctx.to_result())
         return results
 
+    @depends_on(
+        "lon",
+        (
+            "standard_name",
+            "units",
+            "axis",
+            "long_name",
+            "comment",
+            *RANGE_ATTRIBUTES,
+        ),
+    )
     def check_lon(self, dataset):
         """Check lon.
 
@@ -207,14 +775,15 @@ class BaseNCEICheck(BaseNCCheck):
         lon:ancillary_variables = "" ; //.... RECOMMENDED - List other variables providing information about this variable.
         lon:comment = "" ; //................ RECOMMENDED - Add useful, additional information here.
         """
+        dataset = util.get_snapshot(dataset)
         results = []
-        lon = util.get_lon_variable(dataset)
+        lon = self.context.lon
         if not lon:
             return Result(
                 weight=BaseCheck.HIGH,
                 value=False,
                 name="longitude",
-                msgs=["a variable for longitude doesn't exist"],
+                msgs=[Message("a variable for longitude doesn't exist")],
             )
         lon_var = dataset.variables[lon]
         test_ctx = TestCtx(
@@ -227,16 +796,20 @@ class BaseNCEICheck(BaseNCCheck):
         )
         units = getattr(lon_var, "units", "")
         test_ctx.assert_true(
-            units and units_convertible(units, "degrees_east"),
+            units and is_convertible(units, "degrees_east"),
             "units are valid UDUNITS for longitude",
         )
         test_ctx.assert_true(
             getattr(lon_var, "axis", "") == "X",
-            f"{lon} axis attribute must be X",
+            "{lon} axis attribute must be X",
+            lon=lon,
         )
 
         results.append(test_ctx.to_result())
 
+        if not self._evaluates(BaseCheck.MEDIUM):
+            return results
+
         test_ctx = TestCtx(
             BaseCheck.MEDIUM,
             f"Recommended attributes for variable {lon}",
@@ -254,11 +827,22 @@ class BaseNCEICheck(BaseNCCheck):
             )
         test_ctx.assert_true(
             units == "degrees_east",
-            f"{lon} should have units degrees_east",
+            "{lon} should have units degrees_east",
+            lon=lon,
         )
         results.append(test_ctx.to_result())
         return results
 
+    @depends_on(
+        "time",
+        (
+            "standard_name",
+            "units",
+            "calendar",
+            "long_name",
+            "comment",
+        ),
+    )
     def check_time(self, dataset):
         """Check time.
 
@@ -272,14 +856,15 @@ class BaseNCEICheck(BaseNCCheck):
         time:ancillary_variables = "" ; //........................... RECOMMENDED - List other variables providing information about this variable.
         time:comment = "" ; //....................................... RECOMMENDED - Add useful, additional information here.
         """
+        dataset = util.get_snapshot(dataset)
         results = []
-        time_var = util.get_time_variable(dataset)
+        time_var = self.context.time
         if not time_var:
             return Result(
                 weight=BaseCheck.HIGH,
                 value=False,
                 name="Coordinate variable time",
-                msgs=["Time coordinate variable was not found"],
+                msgs=[Message("Time coordinate variable was not found")],
             )
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -312,12 +897,14 @@ class BaseNCEICheck(BaseNCCheck):
         if calendar:
             required_ctx.assert_true(
                 calendar.lower() in valid_calendars,
-                "calendar attribute should be a valid calendar in ({})".format(
-                    ", ".join(valid_calendars),
-                ),
+                "calendar attribute should be a valid calendar in ({})",
+                ", ".join(valid_calendars),
             )
 
         results.append(required_ctx.to_result())
+        if not self._evaluates(BaseCheck.MEDIUM):
+            return results
+
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
             "Recommended attributes for variable time",
@@ -335,6 +922,17 @@ class BaseNCEICheck(BaseNCCheck):
 
         return results
 
+    @depends_on(
+        "z",
+        (
+            "standard_name",
+            "axis",
+            "units",
+            "positive",
+            "comment",
+            *RANGE_ATTRIBUTES,
+        ),
+    )
     def check_height(self, dataset):
         """Check height.
 
@@ -350,10 +948,11 @@ class BaseNCEICheck(BaseNCCheck):
         z:ancillary_variables = "" ; //. RECOMMENDED - List other variables providing information about this variable.
         z:comment = "" ; //............. RECOMMENDED - Add useful, additional information here.
         """
+        dataset = util.get_snapshot(dataset)
         results = []
 
         exists_ctx = TestCtx(BaseCheck.HIGH, "Variable for height must exist")
-        var = util.get_z_variable(dataset)
+        var = self.context.z
         exists_ctx.assert_true(
             var is not None,
             "A variable for height must exist",
@@ -371,26 +970,23 @@ class BaseNCEICheck(BaseNCCheck):
         standard_name = getattr(dataset.variables[var], "standard_name", "")
         required_ctx.assert_true(
             standard_name in ("depth", "height", "altitude"),
-            f"{standard_name} is not a valid standard_name for height",
+            "{standard_name} is not a valid standard_name for height",
+            standard_name=standard_name,
         )
 
         axis = getattr(dataset.variables[var], "axis", "")
         required_ctx.assert_true(
             axis == "Z",
-            f"{var} must have an axis of Z",
+            "{var} must have an axis of Z",
+            var=var,
         )
 
         # Check Units
         units = getattr(dataset.variables[var], "units", "1")
-        try:
-            # If Units fails to read the units, then it's not a valid unit
-            Unit(units)
-            valid_units = True
-        except ValueError:
-            valid_units = False
         required_ctx.assert_true(
-            valid_units,
-            f"{units} are not valid units for height",
+            is_valid_unit(units),
+            "{units} are not valid units for height",
+            units=units,
         )
 
         positive = getattr(dataset.variables[var], "positive", "")
@@ -400,6 +996,9 @@ class BaseNCEICheck(BaseNCCheck):
         )
         results.append(required_ctx.to_result())
 
+        if not self._evaluates(BaseCheck.MEDIUM):
+            return results
+
         # Check has these attributes
         # We omit checking ancillary_variables because that only applies if this variable HAS ancillary variables
         recommended_ctx = TestCtx(
@@ -417,7 +1016,7 @@ class BaseNCEICheck(BaseNCCheck):
         results.append(recommended_ctx.to_result())
         return results
 
-    def check_qaqc(self, dataset):
+    def check_qaqc(self, dataset):  # noqa: ARG002
         """Check QA/QC.
 
         Byte boolean_flag_variable(timeSeries,time); //............................. A boolean flag variable, in which each bit of the flag can be a 1 or 0.
@@ -435,52 +1034,15 @@ class BaseNCEICheck(BaseNCCheck):
                 enumerated_flag_variable:references = "" ; //................ RECOMMENDED - Published or web-based references that describe the data or methods used to produce it.
                 enumerated_flag_variable:comment = "" ; //................... RECOMMENDED - Add useful, additional information here.
         """
-        # Check the qaqc variables to ensure they are good
-        results = []
-
-        flag_variables = dataset.get_variables_by_attributes(
-            flag_meanings=lambda x: x is not None,
+        return rules.compile_rules(self.qaqc_rules).evaluate(
+            self.context,
+            self.min_severity,
+            self.vectorized,
+            aggregate=self.aggregate,
         )
-        for flag_variable in flag_variables:
-            required_ctx = TestCtx(
-                BaseCheck.HIGH,
-                f"Required attributes for flag variable {flag_variable.name}",
-            )
-            flag_values = getattr(flag_variable, "flag_values", None)
-            flag_masks = getattr(flag_variable, "flag_masks", None)
-            required_ctx.assert_true(
-                flag_values is not None or flag_masks is not None,
-                "flag variable must define either flag_values or flag_masks",
-            )
-            results.append(required_ctx.to_result())
-
-            recommended_ctx = TestCtx(
-                BaseCheck.MEDIUM,
-                f"Recommended attributes for flag variable {flag_variable.name}",
-            )
-            standard_name = getattr(flag_variable, "standard_name", "")
-            recommended_ctx.assert_true(
-                standard_name.endswith(" status_flag"),
-                "The standard_name attribute should end with status_flag",
-            )
-
-            varattr = getattr(flag_variable, "long_name", "")
-            recommended_ctx.assert_true(
-                varattr != "",
-                "The {} attribute should exist and not be empty".format(
-                    "long_name",
-                ),
-            )
-
-            if hasattr(flag_variable, "comment"):
-                recommended_ctx.assert_true(
-                    getattr(flag_variable, "comment", "") != "",
-                    "comment attribute should not be empty if specified",
-                )
-
-            results.append(recommended_ctx.to_result())
-        return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on("instrument_variables", ("long_name", "comment"))
     def check_instrument(self, dataset):
         """Check instrument.
 
@@ -488,14 +1050,15 @@ class BaseNCEICheck(BaseNCCheck):
         instrument_parameter_variable:long_name = "" ; // RECOMMENDED - Provide a descriptive, long name for this variable.
         instrument_parameter_variable:comment = "" ; //.. RECOMMENDED - Add useful, additional information here.
         """
+        dataset = util.get_snapshot(dataset)
         # Check for the instrument variable
-        instruments = util.get_instrument_variables(dataset)
+        instruments = self.context.instrument_variables
         if not instruments:
             return Result(
                 weight=BaseCheck.MEDIUM,
                 value=False,
                 name="Recommended variable for instrument should exist",
-                msgs=["No instrument variables found"],
+                msgs=[Message("No instrument variables found")],
             )
         results = []
         for instrument in instruments:
@@ -517,8 +1080,16 @@ class BaseNCEICheck(BaseNCCheck):
 
             results.append(test_ctx.to_result())
 
+        if self.aggregate:
+            return rules.aggregate_results(
+                results,
+                instruments,
+                "Recommended attributes for instrument variable {name}",
+            )
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on("crs", ("epsg_code", "semi_major_axis", "inverse_flattening"))
     def check_crs(self, dataset):
         """Check crs.
 
@@ -528,13 +1099,18 @@ class BaseNCEICheck(BaseNCCheck):
         crs:semi_major_axis = 6378137.0 ; //............. RECOMMENDED
         crs:inverse_flattening = 298.257223563 ; //...... RECOMMENDED.
         """  # noqa: E501
-        grid_mapping = util.get_crs_variable(dataset)
+        dataset = util.get_snapshot(dataset)
+        grid_mapping = self.context.crs
         if grid_mapping is None:
             return Result(
                 weight=BaseCheck.MEDIUM,
                 value=False,
                 name="Recommended variable for grid mapping should exist",
-                msgs=["A variable to describe the grid mapping should exist"],
+                msgs=[
+                    Message(
+                        "A variable to describe the grid mapping should exist",
+                    ),
+                ],
             )
         crs_variable = dataset.variables[grid_mapping]
         test_ctx = TestCtx(
@@ -552,20 +1128,25 @@ class BaseNCEICheck(BaseNCCheck):
 
         test_ctx.assert_true(
             epsg_code != "",
-            f"Attribute epsg_code should exist and not be empty: {epsg_code}",
+            "Attribute epsg_code should exist and not be empty: {epsg_code}",
+            epsg_code=epsg_code,
         )
         test_ctx.assert_true(
             semi_major_axis is not None,
-            f"Attribute semi_major_axis should exist and not be empty: {epsg_code}",
+            "Attribute semi_major_axis should exist and not be empty: {epsg_code}",
+            epsg_code=epsg_code,
         )
         test_ctx.assert_true(
             inverse_flattening is not None,
-            f"Attribute inverse_flattening should exist and not be empty: {epsg_code}",
+            "Attribute inverse_flattening should exist and not be empty: {epsg_code}",
+            epsg_code=epsg_code,
         )
         return test_ctx.to_result()
 
+    @depends_on(global_attributes="high_rec_atts")
     def check_high(self, ds):
         """Check high."""
+        ds = util.get_snapshot(ds)
         highly_recommended = TestCtx(
             BaseCheck.HIGH,
             "Highly Recommended global attributes",
@@ -573,12 +1154,16 @@ class BaseNCEICheck(BaseNCCheck):
         for attr in self.high_rec_atts:
             highly_recommended.assert_true(
                 getattr(ds, attr, "") != "",
-                f"{attr} should exist and not be empty.",
+                "{} should exist and not be empty.",
+                attr,
             )
         return highly_recommended.to_result()
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(global_attributes="rec_atts")
     def check_recommended(self, ds):
         """Check recommended."""
+        ds = util.get_snapshot(ds)
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
             "Recommended global attributes",
@@ -586,26 +1171,158 @@ class BaseNCEICheck(BaseNCCheck):
         for attr in self.rec_atts:
             recommended_ctx.assert_true(
                 getattr(ds, attr, "") != "",
-                f"{attr} should exist and not be empty.",
+                "{} should exist and not be empty.",
+                attr,
             )
         return recommended_ctx.to_result()
 
+    @max_severity(BaseCheck.LOW)
+    @depends_on(global_attributes="sug_atts")
     def check_suggested(self, ds):
         """Check suggested."""
+        ds = util.get_snapshot(ds)
         suggested_ctx = TestCtx(BaseCheck.LOW, "Suggested global attributes")
         for attr in self.sug_atts:
             suggested_ctx.assert_true(
                 getattr(ds, attr, "") != "",
-                f"{attr} should exist and not be empty.",
+                "{} should exist and not be empty.",
+                attr,
             )
         return suggested_ctx.to_result()
 
 
+# Attributes of geophysical variables common to the 1.1 and 2.0 templates.
+_GEOPHYSICAL_REQUIRED = (
+    rules.Rule(
+        "geophysical",
+        "standard_name",
+        rules.not_empty,
+        BaseCheck.HIGH,
+        "standard_name attribute must exist and not be empty",
+    ),
+    rules.Rule(
+        "geophysical",
+        "units",
+        rules.not_empty,
+        BaseCheck.HIGH,
+        "units attribute must exist and not be empty",
+    ),
+    rules.Rule(
+        "geophysical",
+        "coordinates",
+        rules.not_empty,
+        BaseCheck.HIGH,
+        "coordinates must exist and not be empty",
+    ),
+)
+
+_GEOPHYSICAL_RECOMMENDED = (
+    rules.Rule(
+        "geophysical",
+        "grid_mapping",
+        rules.not_empty,
+        BaseCheck.MEDIUM,
+        "grid_mapping should exist and not be empty",
+    ),
+    rules.Rule(
+        "geophysical",
+        "grid_mapping",
+        rules.is_variable,
+        BaseCheck.MEDIUM,
+        "grid_mapping attribute is a variable",
+        rules.truthy,
+    ),
+    rules.Rule(
+        "geophysical",
+        "source",
+        rules.not_empty,
+        BaseCheck.MEDIUM,
+        "source should exist and not be empty",
+    ),
+    rules.Rule(
+        "geophysical",
+        "references",
+        rules.not_empty,
+        BaseCheck.MEDIUM,
+        "references should exist and not be empty",
+    ),
+    rules.Rule(
+        "geophysical",
+        "cell_methods",
+        rules.not_empty,
+        BaseCheck.MEDIUM,
+        "cell_methods should exist and not be empty",
+    ),
+    rules.Rule(
+        "geophysical",
+        "ancillary_variables",
+        rules.are_variables,
+        BaseCheck.MEDIUM,
+        "ancillary_variables point to variables",
+        rules.truthy,
+    ),
+    rules.Rule(
+        "geophysical",
+        "platform",
+        rules.is_variable,
+        BaseCheck.MEDIUM,
+        "platform attribute points to variable",
+        rules.truthy,
+    ),
+    rules.Rule(
+        "geophysical",
+        "instrument",
+        rules.is_variable,
+        BaseCheck.MEDIUM,
+        "instrument attribute points to variable",
+        rules.truthy,
+    ),
+)
+
+
+def _long_name_rules(name_attr):
+    """Return the long_name rule and the nodc_name/ncei_name fallback rule."""
+    return (
+        rules.Rule(
+            "geophysical",
+            "long_name",
+            rules.not_empty,
+            BaseCheck.MEDIUM,
+            "long_name should exist and not be empty",
+        ),
+        rules.Rule(
+            "geophysical",
+            name_attr,
+            rules.not_empty,
+            BaseCheck.MEDIUM,
+            f"{name_attr} should exist and not be empty",
+            rules.undefined("standard_name"),
+        ),
+        *rules.min_max_range_rules("geophysical", BaseCheck.MEDIUM),
+    )
+
+
+def _global_comment_not_empty(value, variable, dataset):  # noqa: ARG001
+    # The 2.0 check has always looked at the global comment attribute here.
+    return getattr(dataset, "comment", "") != ""
+
+
 class NCEI1_1Check(BaseNCEICheck):
     """NCEI1_1Check."""
 
-    def __init__(self):
-        super().__init__()
+    geophysical_rules = (
+        *_GEOPHYSICAL_REQUIRED,
+        *_long_name_rules("nodc_name"),
+        *_GEOPHYSICAL_RECOMMENDED,
+        rules.Rule(
+            "geophysical",
+            "comment",
+            rules.not_empty,
+            BaseCheck.MEDIUM,
+            "comment attribute should not be empty if specified",
+            rules.defined("comment"),
+        ),
+    )
 
     def check_base_required_attributes(self, dataset):
         """Check the global required and highly recommended attributes for 1.1 templates.
@@ -622,6 +1339,7 @@ class NCEI1_1Check(BaseNCEICheck):
         :nodc_template_version = "NODC_NetCDF_TimeSeries_Orthogonal_Template_v1.1" ; //....... REQUIRED (NODC)
         :standard_name_vocabulary = "NetCDF Climate and Forecast (CF) Metadata Convention Standard Name Table "X"" ; //........ REQUIRED    - If using CF standard name attribute for variables. "X" denotes the table number  (ACDD)
         """
+        dataset = util.get_snapshot(dataset)
         test_ctx = TestCtx(BaseCheck.HIGH, "Required global attributes")
 
         conventions = getattr(dataset, "Conventions", "")
@@ -634,11 +1352,13 @@ class NCEI1_1Check(BaseNCEICheck):
 
         test_ctx.assert_true(
             conventions == accepted_conventions,
-            f"Conventions attribute is missing or is not equal to CF-1.6: {conventions}",
+            "Conventions attribute is missing or is not equal to CF-1.6: {conventions}",
+            conventions=conventions,
         )
         test_ctx.assert_true(
             metadata_conventions == "Unidata Dataset Discovery v1.0",
-            f"Metadata_Conventions attribute is required to be 'Unidata Dataset Discovery v1.0': {metadata_conventions}",
+            "Metadata_Conventions attribute is required to be 'Unidata Dataset Discovery v1.0': {metadata_conventions}",
+            metadata_conventions=metadata_conventions,
         )
         test_ctx.assert_true(
             feature_type
@@ -650,7 +1370,8 @@ class NCEI1_1Check(BaseNCEICheck):
                 "timeSeriesProfile",
                 "trajectoryProfile",
             ],
-            f"Feature type must be one of point, timeSeries, trajectory, profile, timeSeriesProfile, trajectoryProfile: {feature_type}",
+            "Feature type must be one of point, timeSeries, trajectory, profile, timeSeriesProfile, trajectoryProfile: {feature_type}",
+            feature_type=feature_type,
         )
         test_ctx.assert_true(
             cdm_data_type.lower()
@@ -663,17 +1384,20 @@ class NCEI1_1Check(BaseNCEICheck):
                 "swath",
                 "trajectory",
             ],
-            f"cdm_data_type must be one of Grid, Image, Point, Radial, Station, Swath, Trajectory: {cdm_data_type}",
+            "cdm_data_type must be one of Grid, Image, Point, Radial, Station, Swath, Trajectory: {cdm_data_type}",
+            cdm_data_type=cdm_data_type,
         )
 
         regex = re.compile(r"[sS]tandard [nN]ame [tT]able")
         test_ctx.assert_true(
             regex.search(standard_name_vocab),
-            f"standard_name_vocabulary doesn't contain 'Standard Name Table': {standard_name_vocab}",
+            "standard_name_vocabulary doesn't contain 'Standard Name Table': {standard_name_vocab}",
+            standard_name_vocab=standard_name_vocab,
         )
 
         return test_ctx.to_result()
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_global_attributes(self, dataset):
         """Check the global recommended attributes for 1.1 templates.
 
@@ -729,6 +1453,9 @@ class NCEI1_1Check(BaseNCEICheck):
         :license = "" ; //................................................... RECOMMENDED - Describe the restrictions to data access and distribution. (ACDD)
         :metadata_link = "" ; //............................................. RECOMMENDED - This attribute provides a link to a complete metadata record for this data set or the collection that contains this data set. (ACDD)
         """
+        from isodate import ISO8601Error, parse_datetime  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
             "Recommended global attributes",
@@ -745,14 +1472,14 @@ class NCEI1_1Check(BaseNCEICheck):
                 "platform should exist and point to a variable.",
             )
 
-        sea_names = [sn.lower() for sn in util.get_sea_names()]
         sea_name = getattr(dataset, "sea_name", "")
         sea_name = sea_name.replace(", ", ",")
         sea_name = sea_name.split(",") if sea_name else []
         for sea in sea_name:
             recommended_ctx.assert_true(
-                sea.lower() in sea_names,
-                f"sea_name attribute should exist and should be from the NODC sea names list: {sea} is not a valid sea name",
+                util.is_valid_sea_name(sea),
+                "sea_name attribute should exist and should be from the NODC sea names list: {sea} is not a valid sea name",
+                sea=sea,
             )
 
         # Parse dates, check for ISO 8601
@@ -772,25 +1499,30 @@ class NCEI1_1Check(BaseNCEICheck):
             except ISO8601Error:
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
 
         units = getattr(dataset, "geospatial_lat_units", "").lower()
         recommended_ctx.assert_true(
             units == "degrees_north",
-            f"geospatial_lat_units attribute should be degrees_north: {units}",
+            "geospatial_lat_units attribute should be degrees_north: {units}",
+            units=units,
         )
 
         units = getattr(dataset, "geospatial_lon_units", "").lower()
         recommended_ctx.assert_true(
             units == "degrees_east",
-            f"geospatial_lon_units attribute should be degrees_east: {units}",
+            "geospatial_lon_units attribute should be degrees_east: {units}",
+            units=units,
         )
 
         value = getattr(dataset, "geospatial_vertical_positive", "")
         recommended_ctx.assert_true(
             value.lower() in ["up", "down"],
-            f"geospatial_vertical_positive attribute should be up or down: {value}",
+            "geospatial_vertical_positive attribute should be up or down: {value}",
+            value=value,
         )
 
         # I hate english.
@@ -832,7 +1564,7 @@ class NCEI1_1Check(BaseNCEICheck):
 
         return recommended_ctx.to_result()
 
-    def check_geophysical(self, dataset):
+    def check_geophysical(self, dataset):  # noqa: ARG002
         """Check the geophysical variable attributes for 1.1 templates.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
@@ -857,100 +1589,14 @@ class NCEI1_1Check(BaseNCEICheck):
             geophysical_variable_1:instrument = "instrument_variable";//..RECOMMENDED - Refers to name of variable containing information on the instrument from which this variable was collected.
             geophysical_variable_1:comment = "" ; //..................... RECOMMENDED - Add useful, additional information here.
         """  # noqa: E501
-        # Check the science variables to ensure they are good
-
-        results = []
-        for var in util.get_geophysical_variables(dataset):
-            ncvar = dataset.variables[var]
-            test_ctx = TestCtx(
-                BaseCheck.HIGH,
-                f"Required attributes for variable {var}",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "standard_name", "") != "",
-                "standard_name attribute must exist and not be empty",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "units", "") != "",
-                "units attribute must exist and not be empty",
-            )
-            coordinates = getattr(ncvar, "coordinates", "")
-            test_ctx.assert_true(
-                coordinates != "",
-                "coordinates must exist and not be empty",
-            )
-            results.append(test_ctx.to_result())
-
-            test_ctx = TestCtx(
-                BaseCheck.MEDIUM,
-                f"Recommended attributes for variable {var}",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "long_name", "") != "",
-                "long_name should exist and not be empty",
-            )
-            if not hasattr(ncvar, "standard_name"):
-                test_ctx.assert_true(
-                    getattr(ncvar, "nodc_name", "") != "",
-                    "nodc_name should exist and not be empty",
-                )
-            self._check_min_max_range(ncvar, test_ctx)
-            grid_mapping = getattr(ncvar, "grid_mapping", "")
-            test_ctx.assert_true(
-                grid_mapping != "",
-                "grid_mapping should exist and not be empty",
-            )
-            if grid_mapping:
-                test_ctx.assert_true(
-                    grid_mapping in dataset.variables,
-                    "grid_mapping attribute is a variable",
-                )
-            test_ctx.assert_true(
-                getattr(ncvar, "source", "") != "",
-                "source should exist and not be empty",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "references", "") != "",
-                "references should exist and not be empty",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "cell_methods", "") != "",
-                "cell_methods should exist and not be empty",
-            )
-            ancillary_variables = getattr(ncvar, "ancillary_variables", "")
-            if ancillary_variables:
-                ancillary_variables = ancillary_variables.split(" ")
-            all_variables = all(
-                v in dataset.variables for v in ancillary_variables
-            )
-            if ancillary_variables:
-                test_ctx.assert_true(
-                    all_variables,
-                    "ancillary_variables point to variables",
-                )
-            platform = getattr(ncvar, "platform", "")
-            if platform:
-                test_ctx.assert_true(
-                    platform in dataset.variables,
-                    "platform attribute points to variable",
-                )
-            instrument = getattr(ncvar, "instrument", "")
-            if instrument:
-                test_ctx.assert_true(
-                    instrument in dataset.variables,
-                    "instrument attribute points to variable",
-                )
-
-            if hasattr(ncvar, "comment"):
-                test_ctx.assert_true(
-                    getattr(ncvar, "comment", "") != "",
-                    "comment attribute should not be empty if specified",
-                )
-
-            results.append(test_ctx.to_result())
-
-        return results
+        return rules.compile_rules(self.geophysical_rules).evaluate(
+            self.context,
+            self.min_severity,
+            self.vectorized,
+            aggregate=self.aggregate,
+        )
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_platform(self, dataset):
         """Check platform.
 
@@ -962,14 +1608,19 @@ class NCEI1_1Check(BaseNCEICheck):
         platform_variable:wmo_code = "";//.... RECOMMENDED - This attribute identifies the wmo code of the platform. Information on getting WMO codes is available at http://www.wmo.int/pages/prog/amp/mmop/wmo-number-rules.html
         platform_variable:imo_code  = "";//... RECOMMENDED - This attribute identifies the International Maritime Organization (IMO) number assigned by Lloyd's register.
         """
+        dataset = util.get_snapshot(dataset)
         # Check for the platform variable
-        platforms = util.get_platform_variables(dataset)
+        platforms = self.context.platform_variables
         if not platforms:
             return Result(
                 weight=BaseCheck.MEDIUM,
                 value=False,
                 name="A container variable storing information about the platform exists",
-                msgs=["Create a variable to store the platform information"],
+                msgs=[
+                    Message(
+                        "Create a variable to store the platform information",
+                    ),
+                ],
             )
 
         results = []
@@ -1020,64 +1671,104 @@ class NCEI1_1Check(BaseNCEICheck):
             )
             results.append(test_ctx.to_result())
 
+        if self.aggregate:
+            return rules.aggregate_results(
+                results,
+                platforms,
+                "Recommended attributes for platform variable {name}",
+            )
         return results
 
 
 class NCEI2_0Check(BaseNCEICheck):
     """NCEI2_0Check."""
 
-    def __init__(self):
-        super().__init__()
-        self.high_rec_atts = [
-            "title",
-            "summary",
-            "keywords",
-        ]
-        self.rec_atts = [
-            "source",
-            "uuid",
-            "id",
-            "naming_authority",
-            "geospatial_lat_min",
-            "geospatial_lat_max",
-            "geospatial_lon_min",
-            "geospatial_lon_max",
-            "geospatial_vertical_max",
-            "geospatial_vertical_min",
-            "institution",
-            "creator_name",
-            "creator_url",
-            "creator_email",
-            "project",
-            "processing_level",
-            "publisher_name",
-            "publisher_email",
-            "publisher_url",
-            "history",
-            "license",
-            "geospatial_bounds",
-            "geospatial_bounds_crs",
-            "geospatial_bounds_vertical_crs",
-        ]
-        self.sug_atts = [
-            "creator_type",
-            "creator_institution",
-            "publisher_type",
-            "publisher_institution",
-            "program",
-            "contributor_name",
-            "contributor_role",
-            "geospatial_lat_units",
-            "geospatial_lon_units",
-            "geospatial_vertical_units",
-            "product_version",
-            "keywords_vocabulary",
-            "platform_vocabulary",
-            "instrument",
-            "instrument_vocabulary",
-            "metadata_link",
-            "references",
-        ]
+    geophysical_rules = (
+        *_GEOPHYSICAL_REQUIRED,
+        *_long_name_rules("ncei_name"),
+        rules.Rule(
+            "geophysical",
+            "coverage_content_type",
+            rules.one_of(
+                (
+                    "image",
+                    "thematicClassification",
+                    "physicalMeasurement",
+                    "auxiliaryInformation",
+                    "qualityInformation",
+                    "referenceInformation",
+                    "modelResult",
+                    "coordinate",
+                ),
+            ),
+            BaseCheck.MEDIUM,
+            (
+                "coverage_content_type should exist and be one of the following:"
+                "image, thematicClassification, physicalMeasurement, auxiliaryInformation, "
+                "qualityInformation, referenceInformation, modelResult, or coordinate"
+            ),
+        ),
+        *_GEOPHYSICAL_RECOMMENDED,
+        rules.Rule(
+            "geophysical",
+            "comment",
+            _global_comment_not_empty,
+            BaseCheck.MEDIUM,
+            "comment attribute should not be empty if specified",
+            rules.defined("comment"),
+        ),
+    )
+
+    high_rec_atts: typing.ClassVar[tuple] = (
+        "title",
+        "summary",
+        "keywords",
+    )
+    rec_atts: typing.ClassVar[tuple] = (
+        "source",
+        "uuid",
+        "id",
+        "naming_authority",
+        "geospatial_lat_min",
+        "geospatial_lat_max",
+        "geospatial_lon_min",
+        "geospatial_lon_max",
+        "geospatial_vertical_max",
+        "geospatial_vertical_min",
+        "institution",
+        "creator_name",
+        "creator_url",
+        "creator_email",
+        "project",
+        "processing_level",
+        "publisher_name",
+        "publisher_email",
+        "publisher_url",
+        "history",
+        "license",
+        "geospatial_bounds",
+        "geospatial_bounds_crs",
+        "geospatial_bounds_vertical_crs",
+    )
+    sug_atts: typing.ClassVar[tuple] = (
+        "creator_type",
+        "creator_institution",
+        "publisher_type",
+        "publisher_institution",
+        "program",
+        "contributor_name",
+        "contributor_role",
+        "geospatial_lat_units",
+        "geospatial_lon_units",
+        "geospatial_vertical_units",
+        "product_version",
+        "keywords_vocabulary",
+        "platform_vocabulary",
+        "instrument",
+        "instrument_vocabulary",
+        "metadata_link",
+        "references",
+    )
 
     def check_base_required_attributes(self, dataset):
         """Check the global required and highly recommended attributes for 2.0 templates.
@@ -1095,6 +1786,7 @@ class NCEI2_0Check(BaseNCEICheck):
         :keywords = "" ; //............................................ HIGHLY RECOMMENDED - A comma separated list of keywords coming from the keywords_vocabulary. (ACDD)
         :Conventions = "CF-1.6, ACDD-1.3" ; //......................... HIGHLY RECOMMENDED    - A comma separated list of the conventions being followed. Always try to use latest version. (CF/ACDD)
         """
+        dataset = util.get_snapshot(dataset)
         test_ctx = TestCtx(BaseCheck.HIGH, "Required global attributes")
 
         conventions = getattr(dataset, "Conventions", "")
@@ -1107,7 +1799,8 @@ class NCEI2_0Check(BaseNCEICheck):
             if accepted_convention not in dataset_conventions:
                 test_ctx.assert_true(
                     test=False,
-                    message=f'Conventions attribute is missing or is not equal to "CF-1.6, ACDD-1.3": {conventions}',
+                    message='Conventions attribute is missing or is not equal to "CF-1.6, ACDD-1.3": {conventions}',
+                    conventions=conventions,
                 )
                 break
         else:
@@ -1124,11 +1817,13 @@ class NCEI2_0Check(BaseNCEICheck):
                 "timeSeriesProfile",
                 "trajectoryProfile",
             ],
-            f"Feature type must be one of point, timeSeries, trajectory, profile, timeSeriesProfile, trajectoryProfile: {feature_type}",
+            "Feature type must be one of point, timeSeries, trajectory, profile, timeSeriesProfile, trajectoryProfile: {feature_type}",
+            feature_type=feature_type,
         )
 
         return test_ctx.to_result()
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_global_attributes(self, dataset):
         """Check the global recommended attributes for 2.0 templates.
 
@@ -1171,19 +1866,22 @@ class NCEI2_0Check(BaseNCEICheck):
         :uuid = "" ; //................................................ RECOMMENDED - Machine readable unique identifier for each file. A new uuid is created whenever the file is changed. (NCEI)
         :sea_name = "" ; //............................................ RECOMMENDED - The names of the sea in which the data were collected. Use NCEI sea names table. (NCEI)
         """
+        from isodate import ISO8601Error, parse_datetime  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
             "Recommended global attributes",
         )
 
-        sea_names = [sn.lower() for sn in util.get_sea_names()]
         sea_name = getattr(dataset, "sea_name", "")
         sea_name = sea_name.replace(", ", ",")
         sea_name = sea_name.split(",") if sea_name else []
         for sea in sea_name:
             recommended_ctx.assert_true(
-                sea.lower() in sea_names,
-                f"sea_name attribute should exist and should be from the NODC sea names list: {sea} is not a valid sea name",
+                util.is_valid_sea_name(sea),
+                "sea_name attribute should exist and should be from the NODC sea names list: {sea} is not a valid sea name",
+                sea=sea,
             )
 
         # Parse dates, check for ISO 8601
@@ -1203,13 +1901,16 @@ class NCEI2_0Check(BaseNCEICheck):
             except ISO8601Error:
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
 
         value = getattr(dataset, "geospatial_vertical_positive", "")
         recommended_ctx.assert_true(
             value.lower() in ["up", "down"],
-            f"geospatial_vertical_positive attribute should be up or down: {value}",
+            "geospatial_vertical_positive attribute should be up or down: {value}",
+            value=value,
         )
 
         # I hate english.
@@ -1226,7 +1927,8 @@ class NCEI2_0Check(BaseNCEICheck):
         regex = re.compile(r"[sS]tandard [nN]ame [tT]able")
         recommended_ctx.assert_true(
             regex.search(standard_name_vocab),
-            f"standard_name_vocabulary doesn't contain 'Standard Name Table': {standard_name_vocab}",
+            "standard_name_vocabulary doesn't contain 'Standard Name Table': {standard_name_vocab}",
+            standard_name_vocab=standard_name_vocab,
         )
 
         if hasattr(dataset, "comment"):
@@ -1236,6 +1938,7 @@ class NCEI2_0Check(BaseNCEICheck):
             )
         return recommended_ctx.to_result()
 
+    @max_severity(BaseCheck.LOW)
     def check_base_suggested_attributes(self, dataset):
         """Check the global suggested attributes for 2.0 templates.
 
@@ -1266,6 +1969,9 @@ class NCEI2_0Check(BaseNCEICheck):
         :metadata_link = "" ; //....................................... SUGGESTED - A URL that gives the location of more complete metadata. A persistent URL is recommended for this attribute. (ACDD)
         :references = "" ; //.......................................... SUGGESTED - Published or web-based references that describe the data or methods used to produce it. Recommend URIs (such as a URL or DOI) for papers or other references. (CF)
         """
+        from isodate import ISO8601Error, parse_datetime  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         suggested_ctx = TestCtx(BaseCheck.LOW, "Suggested global attributes")
 
         # Do any of the variables define platform ?
@@ -1287,7 +1993,8 @@ class NCEI2_0Check(BaseNCEICheck):
                 "swath",
                 "trajectory",
             ],
-            f"cdm_data_type must be one of Grid, Image, Point, Radial, Station, Swath, Trajectory: {cdm_data_type}",
+            "cdm_data_type must be one of Grid, Image, Point, Radial, Station, Swath, Trajectory: {cdm_data_type}",
+            cdm_data_type=cdm_data_type,
         )
 
         # Parse dates, check for ISO 8601
@@ -1302,19 +2009,23 @@ class NCEI2_0Check(BaseNCEICheck):
             except ISO8601Error:
                 suggested_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
 
         units = getattr(dataset, "geospatial_lat_units", "").lower()
         suggested_ctx.assert_true(
             units == "degrees_north",
-            f"geospatial_lat_units attribute should be degrees_north: {units}",
+            "geospatial_lat_units attribute should be degrees_north: {units}",
+            units=units,
         )
 
         units = getattr(dataset, "geospatial_lon_units", "").lower()
         suggested_ctx.assert_true(
             units == "degrees_east",
-            f"geospatial_lon_units attribute should be degrees_east: {units}",
+            "geospatial_lon_units attribute should be degrees_east: {units}",
+            units=units,
         )
 
         contributor_name = getattr(dataset, "contributor_name", "")
@@ -1340,7 +2051,7 @@ class NCEI2_0Check(BaseNCEICheck):
 
         return suggested_ctx.to_result()
 
-    def check_geophysical(self, dataset):
+    def check_geophysical(self, dataset):  # noqa: ARG002
         """Check the geophysical variable attributes for 2.0 templates.
 
         Attributes missing_value and coverage_content_type have been added in NCEI 2.0.
@@ -1369,119 +2080,14 @@ class NCEI2_0Check(BaseNCEICheck):
             geophysical_variable_1:instrument = "instrument_variable";//..RECOMMENDED - Refers to name of variable containing information on the instrument from which this variable was collected.
             geophysical_variable_1:comment = "" ; //..................... RECOMMENDED - Add useful, additional information here.
         """  # noqa: E501
-        results = []
-        for var in util.get_geophysical_variables(dataset):
-            ncvar = dataset.variables[var]
-
-            test_ctx = TestCtx(
-                BaseCheck.HIGH,
-                f"Required attributes for variable {var}",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "standard_name", "") != "",
-                "standard_name attribute must exist and not be empty",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "units", "") != "",
-                "units attribute must exist and not be empty",
-            )
-            coordinates = getattr(ncvar, "coordinates", "")
-            test_ctx.assert_true(
-                coordinates != "",
-                "coordinates must exist and not be empty",
-            )
-            results.append(test_ctx.to_result())
-
-            test_ctx = TestCtx(
-                BaseCheck.MEDIUM,
-                f"Recommended attributes for variable {var}",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "long_name", "") != "",
-                "long_name should exist and not be empty",
-            )
-            if not hasattr(ncvar, "standard_name"):
-                test_ctx.assert_true(
-                    getattr(ncvar, "ncei_name", "") != "",
-                    "ncei_name should exist and not be empty",
-                )
-            self._check_min_max_range(ncvar, test_ctx)
-
-            coverage_content_type_options = [
-                "image",
-                "thematicClassification",
-                "physicalMeasurement",
-                "auxiliaryInformation",
-                "qualityInformation",
-                "referenceInformation",
-                "modelResult",
-                "coordinate",
-            ]
-            test_ctx.assert_true(
-                getattr(ncvar, "coverage_content_type", "")
-                in coverage_content_type_options,
-                (
-                    "coverage_content_type should exist and be one of the following:"
-                    "image, thematicClassification, physicalMeasurement, auxiliaryInformation, "
-                    "qualityInformation, referenceInformation, modelResult, or coordinate"
-                ),
-            )
-
-            grid_mapping = getattr(ncvar, "grid_mapping", "")
-            test_ctx.assert_true(
-                grid_mapping != "",
-                "grid_mapping should exist and not be empty",
-            )
-            if grid_mapping:
-                test_ctx.assert_true(
-                    grid_mapping in dataset.variables,
-                    "grid_mapping attribute is a variable",
-                )
-            test_ctx.assert_true(
-                getattr(ncvar, "source", "") != "",
-                "source should exist and not be empty",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "references", "") != "",
-                "references should exist and not be empty",
-            )
-            test_ctx.assert_true(
-                getattr(ncvar, "cell_methods", "") != "",
-                "cell_methods should exist and not be empty",
-            )
-            ancillary_variables = getattr(ncvar, "ancillary_variables", "")
-            if ancillary_variables:
-                ancillary_variables = ancillary_variables.split(" ")
-            all_variables = all(
-                v in dataset.variables for v in ancillary_variables
-            )
-            if ancillary_variables:
-                test_ctx.assert_true(
-                    all_variables,
-                    "ancillary_variables point to variables",
-                )
-            platform = getattr(ncvar, "platform", "")
-            if platform:
-                test_ctx.assert_true(
-                    platform in dataset.variables,
-                    "platform attribute points to variable",
-                )
-            instrument = getattr(ncvar, "instrument", "")
-            if instrument:
-                test_ctx.assert_true(
-                    instrument in dataset.variables,
-                    "instrument attribute points to variable",
-                )
-
-            if hasattr(ncvar, "comment"):
-                test_ctx.assert_true(
-                    getattr(dataset, "comment", "") != "",
-                    "comment attribute should not be empty if specified",
-                )
-            results.append(test_ctx.to_result())
-
-        return results
+        return rules.compile_rules(self.geophysical_rules).evaluate(
+            self.context,
+            self.min_severity,
+            self.vectorized,
+            aggregate=self.aggregate,
+        )
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_platform(self, dataset):
         """Check platform.
 
@@ -1493,14 +2099,19 @@ class NCEI2_0Check(BaseNCEICheck):
         platform_variable:wmo_code = "";//.... RECOMMENDED - This attribute identifies the wmo code of the platform. Information on getting WMO codes is available at http://www.wmo.int/pages/prog/amp/mmop/wmo-number-rules.html
         platform_variable:imo_code  = "";//... RECOMMENDED - This attribute identifies the International Maritime Organization (IMO) number assigned by Lloyd's register.
         """
+        dataset = util.get_snapshot(dataset)
         # Check for the platform variable
-        platforms = util.get_platform_variables(dataset)
+        platforms = self.context.platform_variables
         if not platforms:
             return Result(
                 weight=BaseCheck.MEDIUM,
                 value=False,
                 name="A container variable storing information about the platform exists",
-                msgs=["Create a variable to store the platform information"],
+                msgs=[
+                    Message(
+                        "Create a variable to store the platform information",
+                    ),
+                ],
             )
 
         results = []
@@ -1551,4 +2162,10 @@ class NCEI2_0Check(BaseNCEICheck):
             )
             results.append(test_ctx.to_result())
 
+        if self.aggregate:
+            return rules.aggregate_results(
+                results,
+                platforms,
+                "Recommended attributes for platform variable {name}",
+            )
         return results
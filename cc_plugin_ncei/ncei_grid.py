@@ -1,10 +1,14 @@
 """cc_plugin_ncei/ncei_grid.py."""
 
 from compliance_checker.base import BaseCheck
-from isodate import parse_duration
 
 from cc_plugin_ncei import util
-from cc_plugin_ncei.ncei_base import NCEI1_1Check, NCEI2_0Check, TestCtx
+from cc_plugin_ncei.ncei_base import (
+    NCEI1_1Check,
+    NCEI2_0Check,
+    TestCtx,
+    max_severity,
+)
 
 
 class NCEIGridBase(BaseCheck):
@@ -18,6 +22,7 @@ class NCEIGridBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -28,21 +33,27 @@ class NCEIGridBase(BaseCheck):
         message += " and each dimension must be a coordinate variable with a dimension with the same name"
         message += " as the variable. z is optional."
 
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_2d_regular_grid(dataset, variable)
-            is_valid = is_valid or util.is_3d_regular_grid(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = (
+                "2d-regular-grid" in representations
+                or "3d-regular-grid" in representations
+            )
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_bounds_variables(self, dataset):
         """Check the grid boundary variables.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
             "Recommended variables to describe grid boundaries",
@@ -76,7 +87,8 @@ class NCEIGridBase(BaseCheck):
             ncvar = dataset.variables.get(variable, {})
             recommended_ctx.assert_true(
                 ncvar != {},
-                f"a variable {variable} should exist as indicated by a bounds attribute",
+                "a variable {variable} should exist as indicated by a bounds attribute",
+                variable=variable,
             )
             if ncvar == {}:
                 continue
@@ -85,15 +97,15 @@ class NCEIGridBase(BaseCheck):
             if variable in bounds_map and "units" in bounds_map[variable]:
                 recommended_ctx.assert_true(
                     units == bounds_map[variable]["units"],
-                    "variable {} should have units {}".format(
-                        variable,
-                        bounds_map[variable]["units"],
-                    ),
+                    "variable {} should have units {}",
+                    variable,
+                    bounds_map[variable]["units"],
                 )
             else:
                 recommended_ctx.assert_true(
                     units != "",
-                    f"variable {variable} should have a units attribute that is not empty",
+                    "variable {variable} should have a units attribute that is not empty",
+                    variable=variable,
                 )
 
             comment = getattr(ncvar, "comment", "")
@@ -130,6 +142,7 @@ class NCEIGrid1_1(NCEI1_1Check, NCEIGridBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -138,7 +151,8 @@ class NCEIGrid1_1(NCEI1_1Check, NCEIGridBase):
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Grid",
@@ -177,6 +191,7 @@ class NCEIGrid2_0(NCEI2_0Check, NCEIGridBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -185,7 +200,8 @@ class NCEIGrid2_0(NCEI2_0Check, NCEIGridBase):
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Grid",
@@ -198,11 +214,15 @@ class NCEIGrid2_0(NCEI2_0Check, NCEIGridBase):
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended and highly recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -220,7 +240,9 @@ class NCEIGrid2_0(NCEI2_0Check, NCEIGridBase):
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
@@ -17,11 +17,12 @@ class NCEIPointBase(BaseCheck):
 
     def check_dimensions(self, dataset):
         """Check that the feature types of this dataset are consistent with a point dataset."""
+        dataset = util.get_snapshot(dataset)
         required_ctx = TestCtx(
             BaseCheck.HIGH,
             "All geophysical variables are point feature types",
         )
-        t = util.get_time_variable(dataset)
+        t = self.context.time
 
         # Exit prematurely
         if not t:
@@ -34,11 +35,15 @@ class NCEIPointBase(BaseCheck):
         o = None or (t_dims and t_dims[0])
 
         message = "{} must be a valid timeseries feature type. It must have dimensions of ({}), and all coordinates must have dimensions of ({})"
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_point(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = "point" in representations
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable, o, o),
+                message,
+                variable,
+                o,
+                o,
             )
         return required_ctx.to_result()
 
@@ -71,6 +76,7 @@ class NCEIPoint1_1(NCEI1_1Check, NCEIPointBase):
 
     def check_required_attributes(self, dataset):
         """Verify that the dataset contains the NCEI required and highly recommended global attributes."""
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -79,7 +85,8 @@ class NCEIPoint1_1(NCEI1_1Check, NCEIPointBase):
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Point",
@@ -116,6 +123,7 @@ class NCEIPoint2_0(NCEI2_0Check, NCEIPointBase):
 
     def check_required_attributes(self, dataset):
         """Verify that the dataset contains the NCEI required and highly recommended global attributes."""
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -124,7 +132,8 @@ class NCEIPoint2_0(NCEI2_0Check, NCEIPointBase):
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Point",
@@ -3,7 +3,14 @@
 from compliance_checker.base import BaseCheck
 
 from cc_plugin_ncei import util
-from cc_plugin_ncei.ncei_base import NCEI1_1Check, NCEI2_0Check, TestCtx
+from cc_plugin_ncei.ncei_base import (
+    NCEI1_1Check,
+    NCEI2_0Check,
+    TestCtx,
+    cf_role,
+    depends_on,
+    max_severity,
+)
 
 
 class NCEIProfileOrthogonalBase(BaseCheck):
@@ -20,6 +27,7 @@ class NCEIProfileOrthogonalBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -28,20 +36,25 @@ class NCEIProfileOrthogonalBase(BaseCheck):
 
         message = "{} must be a valid profile-orthogonal feature type. It must have dimensions of (profile, depth)."
         message += " x and y should have dimensions of (profile), z should have dimension of (depth) and t should have dimension (profile)"
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_profile_orthogonal(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = "profile-orthogonal" in representations
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("profile_id"), ("long_name",))
     def check_profile_id(self, dataset):
         """Check that if a variable exists for the profile id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -99,6 +112,7 @@ class NCEIProfileOrthogonal1_1(NCEI1_1Check, NCEIProfileOrthogonalBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -107,7 +121,8 @@ class NCEIProfileOrthogonal1_1(NCEI1_1Check, NCEIProfileOrthogonalBase):
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -147,6 +162,7 @@ class NCEIProfileOrthogonal2_0(NCEI2_0Check, NCEIProfileOrthogonalBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -155,7 +171,8 @@ class NCEIProfileOrthogonal2_0(NCEI2_0Check, NCEIProfileOrthogonalBase):
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -183,6 +200,7 @@ class NCEIProfileIncomplete(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -191,20 +209,25 @@ class NCEIProfileIncomplete(BaseCheck):
 
         message = "{} must be a valid profile-incomplete feature type. It must have dimensions of (profile, depth)."
         message += " x and y should have dimensions of (profile), z should have dimension of (profile, depth) and t should have dimension (profile)"
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_profile_incomplete(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = "profile-incomplete" in representations
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("profile_id"), ("long_name",))
     def check_profile_id(self, dataset):
         """Check that if a variable exists for the profile id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -263,6 +286,7 @@ class NCEIProfileIncomplete1_1(NCEI1_1Check, NCEIProfileIncomplete):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -271,7 +295,8 @@ class NCEIProfileIncomplete1_1(NCEI1_1Check, NCEIProfileIncomplete):
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -312,6 +337,7 @@ class NCEIProfileIncomplete2_0(NCEI2_0Check, NCEIProfileIncomplete):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -320,7 +346,8 @@ class NCEIProfileIncomplete2_0(NCEI2_0Check, NCEIProfileIncomplete):
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -1,10 +1,16 @@
 """cc_plugin_ncei/ncei_timeseries.py."""
 
 from compliance_checker.base import BaseCheck
-from isodate import parse_duration
 
 from cc_plugin_ncei import util
-from cc_plugin_ncei.ncei_base import NCEI1_1Check, NCEI2_0Check, TestCtx
+from cc_plugin_ncei.ncei_base import (
+    NCEI1_1Check,
+    NCEI2_0Check,
+    TestCtx,
+    cf_role,
+    depends_on,
+    max_severity,
+)
 
 
 class NCEITimeSeriesOrthogonalBase(BaseCheck):
@@ -21,28 +27,34 @@ class NCEITimeSeriesOrthogonalBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         required_ctx = TestCtx(
             BaseCheck.HIGH,
             "All geophysical variables are time-series orthogonal feature types",
         )
         message = "{} must be a valid timeseries feature type. It must have dimensions of (timeSeries, time) or (time)."
         message += " And x, y and z coordinates must have dimensions (timeSeries) or be dimensionless"
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_timeseries(
-                dataset,
-                variable,
-            ) or util.is_multi_timeseries_orthogonal(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = (
+                "timeseries" in representations
+                or "multi-timeseries-orthogonal" in representations
+            )
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         return required_ctx.to_result()
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("timeseries_id"), ("long_name",))
     def check_timeseries_id(self, dataset):
         """Check that if a variable exists for the time series id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         timeseries_ids = dataset.get_variables_by_attributes(
             cf_role="timeseries_id",
         )
@@ -94,6 +106,7 @@ class NCEITimeSeriesOrthogonal1_1(NCEI1_1Check, NCEITimeSeriesOrthogonalBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -102,7 +115,8 @@ class NCEITimeSeriesOrthogonal1_1(NCEI1_1Check, NCEITimeSeriesOrthogonalBase):
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -144,6 +158,7 @@ class NCEITimeSeriesOrthogonal2_0(NCEI2_0Check, NCEITimeSeriesOrthogonalBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -152,7 +167,8 @@ class NCEITimeSeriesOrthogonal2_0(NCEI2_0Check, NCEITimeSeriesOrthogonalBase):
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -165,11 +181,15 @@ class NCEITimeSeriesOrthogonal2_0(NCEI2_0Check, NCEITimeSeriesOrthogonalBase):
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -187,7 +207,9 @@ class NCEITimeSeriesOrthogonal2_0(NCEI2_0Check, NCEITimeSeriesOrthogonalBase):
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
@@ -207,17 +229,20 @@ class NCEITimeSeriesIncompleteBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         required_ctx = TestCtx(
             BaseCheck.HIGH,
             "All geophysical variables are time-series incomplete feature types",
         )
         message = "{} must be a valid timeseries feature type. It must have dimensions of (timeSeries, time)."
         message += " And all coordinates must have dimensions of (timeSeries)"
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_multi_timeseries_incomplete(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = "multi-timeseries-incomplete" in representations
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         return required_ctx.to_result()
 
@@ -226,6 +251,7 @@ class NCEITimeSeriesIncompleteBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -247,7 +273,7 @@ class NCEITimeSeriesIncompleteBase(BaseCheck):
         if not timeseries_ids:
             return results
 
-        timevar = util.get_time_variable(dataset)
+        timevar = self.context.time
         nc_timevar = dataset.variables[timevar]
         time_dimensions = nc_timevar.dimensions
 
@@ -255,13 +281,15 @@ class NCEITimeSeriesIncompleteBase(BaseCheck):
         dims = timeseries_variable.dimensions
         required_ctx.assert_true(
             time_dimensions and time_dimensions[0] == dims[0],
-            f"{timeseries_variable.name} must have a dimension and that dimension must be shared by the time variable",
+            "{variable} must have a dimension and that dimension must be shared by the time variable",
+            variable=timeseries_variable.name,
         )
-        recommended_ctx.assert_true(
-            getattr(timeseries_variable, "long_name", "") != "",
-            "long_name attribute should exist and not be empty",
-        )
-        results.append(recommended_ctx.to_result())
+        if self._evaluates(BaseCheck.MEDIUM):
+            recommended_ctx.assert_true(
+                getattr(timeseries_variable, "long_name", "") != "",
+                "long_name attribute should exist and not be empty",
+            )
+            results.append(recommended_ctx.to_result())
         return results
 
 
@@ -298,6 +326,7 @@ class NCEITimeSeriesIncomplete1_1(NCEI1_1Check, NCEITimeSeriesIncompleteBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -306,7 +335,8 @@ class NCEITimeSeriesIncomplete1_1(NCEI1_1Check, NCEITimeSeriesIncompleteBase):
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f'nodc_template_version attribute must be "{self.valid_templates[0]}"',
+            'nodc_template_version attribute must be "{template}"',
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -348,6 +378,7 @@ class NCEITimeSeriesIncomplete2_0(NCEI2_0Check, NCEITimeSeriesIncompleteBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -356,7 +387,8 @@ class NCEITimeSeriesIncomplete2_0(NCEI2_0Check, NCEITimeSeriesIncompleteBase):
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f'ncei_template_version attribute must be "{self.valid_templates[0]}"',
+            'ncei_template_version attribute must be "{template}"',
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -369,11 +401,15 @@ class NCEITimeSeriesIncomplete2_0(NCEI2_0Check, NCEITimeSeriesIncompleteBase):
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -391,7 +427,9 @@ class NCEITimeSeriesIncomplete2_0(NCEI2_0Check, NCEITimeSeriesIncompleteBase):
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
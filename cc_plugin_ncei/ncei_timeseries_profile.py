@@ -1,10 +1,16 @@
 """cc_plugin_ncei/ncei_timeseries_profile.py."""
 
 from compliance_checker.base import BaseCheck
-from isodate import parse_duration
 
 from cc_plugin_ncei import util
-from cc_plugin_ncei.ncei_base import NCEI1_1Check, NCEI2_0Check, TestCtx
+from cc_plugin_ncei.ncei_base import (
+    NCEI1_1Check,
+    NCEI2_0Check,
+    TestCtx,
+    cf_role,
+    depends_on,
+    max_severity,
+)
 
 
 class NCEITimeSeriesProfileOrthogonalBase(BaseCheck):
@@ -22,6 +28,7 @@ class NCEITimeSeriesProfileOrthogonalBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -33,27 +40,28 @@ class NCEITimeSeriesProfileOrthogonalBase(BaseCheck):
         message += " dimensions (station). time must be a coordinate variable with dimension (time) and z must be a"
         message += " coordinate variable with dimension (z)."
 
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_timeseries_profile_single_station(
-                dataset,
-                variable,
-            )
-            is_valid = is_valid or util.is_timeseries_profile_multi_station(
-                dataset,
-                variable,
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = (
+                "timeseries-profile-single-station" in representations
+                or "timeseries-profile-multi-station" in representations
             )
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("timeseries_id"), ("long_name",))
     def check_timeseries_id(self, dataset):
         """Check that if a variable exists for the timeseries id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -120,6 +128,7 @@ class NCEITimeSeriesProfileOrthogonal1_1(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -128,7 +137,8 @@ class NCEITimeSeriesProfileOrthogonal1_1(
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -175,6 +185,7 @@ class NCEITimeSeriesProfileOrthogonal2_0(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -183,7 +194,8 @@ class NCEITimeSeriesProfileOrthogonal2_0(
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -196,11 +208,15 @@ class NCEITimeSeriesProfileOrthogonal2_0(
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -218,7 +234,9 @@ class NCEITimeSeriesProfileOrthogonal2_0(
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
@@ -240,6 +258,7 @@ class NCEITimeSeriesProfileOrthTimeIncompleteDepthBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -252,27 +271,28 @@ class NCEITimeSeriesProfileOrthTimeIncompleteDepthBase(BaseCheck):
         message += " dimensions (station). time must be a coordinate variable with dimension (time) and z must"
         message += " have dimensions (time, z) or (station, time, z) if it's a multi-station dataset."
 
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_timeseries_profile_single_ortho_time(
-                dataset,
-                variable,
-            )
-            is_valid = is_valid or util.is_timeseries_profile_multi_ortho_time(
-                dataset,
-                variable,
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = (
+                "timeseries-profile-single-ortho-time" in representations
+                or "timeseries-profile-multi-ortho-time" in representations
             )
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("timeseries_id"), ("long_name",))
     def check_timeseries_id(self, dataset):
         """Check that if a variable exists for the timeseries id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -340,6 +360,7 @@ class NCEITimeSeriesProfileOrthTimeIncompleteDepth1_1(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -348,7 +369,8 @@ class NCEITimeSeriesProfileOrthTimeIncompleteDepth1_1(
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -396,6 +418,7 @@ class NCEITimeSeriesProfileOrthTimeIncompleteDepth2_0(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -404,7 +427,8 @@ class NCEITimeSeriesProfileOrthTimeIncompleteDepth2_0(
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -417,11 +441,15 @@ class NCEITimeSeriesProfileOrthTimeIncompleteDepth2_0(
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -439,7 +467,9 @@ class NCEITimeSeriesProfileOrthTimeIncompleteDepth2_0(
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
@@ -461,6 +491,7 @@ class NCEITimeSeriesProfileIncompleteBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -473,20 +504,25 @@ class NCEITimeSeriesProfileIncompleteBase(BaseCheck):
         message += " it must have dimensions (station, nTimeMax, zMax). x and y must have dimensions (station)."
         message += " time must have dimensions (station, nTimeMax). And z must have dimensions (station, nTimeMax, zMax)."
 
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_timeseries_profile_incomplete(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = "timeseries-profile-incomplete" in representations
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("timeseries_id"), ("long_name",))
     def check_timeseries_id(self, dataset):
         """Check that if a variable exists for the timeseries id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -551,6 +587,7 @@ class NCEITimeSeriesProfileIncomplete1_1(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -559,7 +596,8 @@ class NCEITimeSeriesProfileIncomplete1_1(
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -604,6 +642,7 @@ class NCEITimeSeriesProfileIncomplete2_0(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -612,7 +651,8 @@ class NCEITimeSeriesProfileIncomplete2_0(
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -625,11 +665,15 @@ class NCEITimeSeriesProfileIncomplete2_0(
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -647,7 +691,9 @@ class NCEITimeSeriesProfileIncomplete2_0(
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
@@ -669,6 +715,7 @@ class NCEITimeSeriesProfileIncompleteTimeOrthDepthBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -680,23 +727,25 @@ class NCEITimeSeriesProfileIncompleteTimeOrthDepthBase(BaseCheck):
         message += " time must have dimensions (station, time). And z must be a coordinate variable with"
         message += " dimension (z)."
 
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_timeseries_profile_ortho_depth(
-                dataset,
-                variable,
-            )
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = "timeseries-profile-ortho-depth" in representations
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("timeseries_id"), ("long_name",))
     def check_timeseries_id(self, dataset):
         """Check that if a variable exists for the timeseries id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -761,6 +810,7 @@ class NCEITimeSeriesProfileIncompleteTimeOrthDepth1_1(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -769,7 +819,8 @@ class NCEITimeSeriesProfileIncompleteTimeOrthDepth1_1(
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "")
             == self.valid_templates[0],
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -814,6 +865,7 @@ class NCEITimeSeriesProfileIncompleteTimeOrthDepth2_0(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -822,7 +874,8 @@ class NCEITimeSeriesProfileIncompleteTimeOrthDepth2_0(
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "")
             == self.valid_templates[0],
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Station",
@@ -835,11 +888,15 @@ class NCEITimeSeriesProfileIncompleteTimeOrthDepth2_0(
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -857,7 +914,9 @@ class NCEITimeSeriesProfileIncompleteTimeOrthDepth2_0(
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
@@ -1,10 +1,16 @@
 """cc_plugin_ncei/ncei_trajectory.py."""
 
 from compliance_checker.base import BaseCheck
-from isodate import parse_duration
 
 from cc_plugin_ncei import util
-from cc_plugin_ncei.ncei_base import NCEI1_1Check, NCEI2_0Check, TestCtx
+from cc_plugin_ncei.ncei_base import (
+    NCEI1_1Check,
+    NCEI2_0Check,
+    TestCtx,
+    cf_role,
+    depends_on,
+    max_severity,
+)
 
 
 class NCEITrajectoryBase(BaseCheck):
@@ -21,6 +27,7 @@ class NCEITrajectoryBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -28,21 +35,28 @@ class NCEITrajectoryBase(BaseCheck):
         )
 
         message = "{} must be a valid trajectory feature type. It must have dimensions of (trajectoryID, time). And all coordinates must have dimensions (trajectoryID, time)"
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_cf_trajectory(dataset, variable)
-            is_valid = is_valid or util.is_single_trajectory(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = (
+                "trajectory" in representations
+                or "trajectory-single" in representations
+            )
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("trajectory_id"), ("long_name",))
     def check_trajectory_id(self, dataset):
         """Check that if a variable exists for the trajectory id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -103,6 +117,7 @@ class NCEITrajectory1_1(NCEI1_1Check, NCEITrajectoryBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -111,7 +126,8 @@ class NCEITrajectory1_1(NCEI1_1Check, NCEITrajectoryBase):
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Trajectory",
@@ -152,6 +168,7 @@ class NCEITrajectory2_0(NCEI2_0Check, NCEITrajectoryBase):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -160,7 +177,8 @@ class NCEITrajectory2_0(NCEI2_0Check, NCEITrajectoryBase):
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Trajectory",
@@ -173,11 +191,15 @@ class NCEITrajectory2_0(NCEI2_0Check, NCEITrajectoryBase):
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -191,7 +213,11 @@ class NCEITrajectory2_0(NCEI2_0Check, NCEITrajectoryBase):
                 # Score it True!
                 recommended_ctx.assert_true(test=True, message="")
             except Exception:  # noqa: BLE001
-                msg = f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}"
-                recommended_ctx.assert_true(test=False, message=msg)
+                recommended_ctx.assert_true(
+                    test=False,
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
+                )
         results.append(recommended_ctx.to_result())
         return results
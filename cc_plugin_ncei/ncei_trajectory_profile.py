@@ -1,10 +1,16 @@
 """cc_plugin_ncei/ncei_trajectory_profile.py."""
 
 from compliance_checker.base import BaseCheck
-from isodate import parse_duration
 
 from cc_plugin_ncei import util
-from cc_plugin_ncei.ncei_base import NCEI1_1Check, NCEI2_0Check, TestCtx
+from cc_plugin_ncei.ncei_base import (
+    NCEI1_1Check,
+    NCEI2_0Check,
+    TestCtx,
+    cf_role,
+    depends_on,
+    max_severity,
+)
 
 
 class NCEITrajectoryProfileOrthogonalBase(BaseCheck):
@@ -21,6 +27,7 @@ class NCEITrajectoryProfileOrthogonalBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -30,20 +37,25 @@ class NCEITrajectoryProfileOrthogonalBase(BaseCheck):
         message = "{} must be a valid trajectory profile orthogonal feature type. It must have dimensions of (trajectory, obs, z)."
         message += " Also, x, y, and t must have dimensions (trajectory, obs). z must be a coordinate variable with dimensions (z)."
 
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_trajectory_profile_orthogonal(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = "trajectory-profile-orthogonal" in representations
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("trajectory_id"), ("long_name",))
     def check_trajectory_id(self, dataset):
         """Check that if a variable exists for the trajectory id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -109,6 +121,7 @@ class NCEITrajectoryProfileOrthogonal1_1(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -117,7 +130,8 @@ class NCEITrajectoryProfileOrthogonal1_1(
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Trajectory",
@@ -163,6 +177,7 @@ class NCEITrajectoryProfileOrthogonal2_0(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -171,7 +186,8 @@ class NCEITrajectoryProfileOrthogonal2_0(
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Trajectory",
@@ -184,11 +200,15 @@ class NCEITrajectoryProfileOrthogonal2_0(
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -206,7 +226,9 @@ class NCEITrajectoryProfileOrthogonal2_0(
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
@@ -226,6 +248,7 @@ class NCEITrajectoryProfileIncompleteBase(BaseCheck):
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -235,20 +258,25 @@ class NCEITrajectoryProfileIncompleteBase(BaseCheck):
         message = "{} must be a valid trajectory profile incomplete feature type. It and z must have dimensions of (trajectory, obs, nzMax)."
         message += " Also, x, y, and t must have dimensions (trajectory, obs)."
 
-        for variable in util.get_geophysical_variables(dataset):
-            is_valid = util.is_trajectory_profile_incomplete(dataset, variable)
+        feature_types = self.context.feature_types
+        for variable, representations in feature_types.items():
+            is_valid = "trajectory-profile-incomplete" in representations
             required_ctx.assert_true(
                 is_valid,
-                message.format(variable),
+                message,
+                variable,
             )
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
+    @depends_on(cf_role("trajectory_id"), ("long_name",))
     def check_trajectory_id(self, dataset):
         """Check that if a variable exists for the trajectory id it has the appropriate attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         exists_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -309,6 +337,7 @@ class NCEITrajectoryProfileIncomplete1_1(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -317,7 +346,8 @@ class NCEITrajectoryProfileIncomplete1_1(
         required_ctx.assert_true(
             getattr(dataset, "nodc_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"nodc_template_version attribute must be {self.valid_templates[0]}",
+            "nodc_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Trajectory",
@@ -363,6 +393,7 @@ class NCEITrajectoryProfileIncomplete2_0(
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        dataset = util.get_snapshot(dataset)
         results = []
         required_ctx = TestCtx(
             BaseCheck.HIGH,
@@ -371,7 +402,8 @@ class NCEITrajectoryProfileIncomplete2_0(
         required_ctx.assert_true(
             getattr(dataset, "ncei_template_version", "").lower()
             == self.valid_templates[0].lower(),
-            f"ncei_template_version attribute must be {self.valid_templates[0]}",
+            "ncei_template_version attribute must be {template}",
+            template=self.valid_templates[0],
         )
         required_ctx.assert_true(
             getattr(dataset, "cdm_data_type", "") == "Trajectory",
@@ -384,11 +416,15 @@ class NCEITrajectoryProfileIncomplete2_0(
         results.append(required_ctx.to_result())
         return results
 
+    @max_severity(BaseCheck.MEDIUM)
     def check_recommended_attributes(self, dataset):
         """Feature type specific check of global recommended attributes.
 
         :param netCDF4.Dataset dataset: An open netCDF dataset
         """
+        from isodate import parse_duration  # noqa: PLC0415
+
+        dataset = util.get_snapshot(dataset)
         results = []
         recommended_ctx = TestCtx(
             BaseCheck.MEDIUM,
@@ -406,7 +442,9 @@ class NCEITrajectoryProfileIncomplete2_0(
             except Exception:  # noqa: BLE001
                 recommended_ctx.assert_true(
                     test=False,
-                    message=f"{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    message="{attr} should exist and be ISO-8601 format (example: PT1M30S), currently: {attr_value}",
+                    attr=attr,
+                    attr_value=attr_value,
                 )
         results.append(recommended_ctx.to_result())
         return results
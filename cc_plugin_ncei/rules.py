@@ -0,0 +1,483 @@
+"""cc_plugin_ncei/rules.py."""
+
+import functools
+import operator
+import typing
+
+import numpy as np
+from compliance_checker.base import BaseCheck, Result
+
+from cc_plugin_ncei.messages import Message, collecting
+
+
+class Rule(typing.NamedTuple):
+    """A declarative check of one variable attribute.
+
+    :param target: name of a selector in :data:`TARGETS` or a callable
+                   taking a util.DatasetContext and returning the names of
+                   the variables to check
+    :param str attr: attribute name, its value is "" when it is missing
+    :param predicate: ``predicate(value, variable, dataset)`` returning true
+                      if the attribute passes
+    :param int severity: BaseCheck.HIGH, BaseCheck.MEDIUM or BaseCheck.LOW
+    :param str message: failure message, ``{name}`` is the variable name
+    :param when: optional ``when(value, variable, dataset)``, the rule is only
+                 asserted if it returns true
+    """
+
+    target: typing.Any
+    attr: str
+    predicate: typing.Callable
+    severity: int
+    message: str
+    when: typing.Callable = None
+
+
+# Engine used for a group of at least this many variables, unless the
+# vectorized option of the checker says otherwise.
+VECTORIZE_MIN_VARIABLES = 256
+
+DESCRIPTIONS = {
+    BaseCheck.HIGH: "Required attributes for variable {name}",
+    BaseCheck.MEDIUM: "Recommended attributes for variable {name}",
+    BaseCheck.LOW: "Suggested attributes for variable {name}",
+}
+
+
+class Target(typing.NamedTuple):
+    """The variables a group of rules is evaluated against.
+
+    :param select: ``select(context)`` returning the variable names
+    :param dict descriptions: TestCtx description per severity, ``{name}`` is
+                              the variable name
+    """
+
+    select: typing.Callable
+    descriptions: dict = DESCRIPTIONS
+
+
+def _flag_variables(context):
+    return context.dataset.attribute_index.find("flag_meanings")
+
+
+TARGETS = {
+    "geophysical": Target(operator.attrgetter("geophysical_variables")),
+    "flag": Target(
+        _flag_variables,
+        {
+            BaseCheck.HIGH: "Required attributes for flag variable {name}",
+            BaseCheck.MEDIUM: "Recommended attributes for flag variable {name}",
+        },
+    ),
+}
+
+
+def value_only(func):
+    """Mark a predicate or condition that only depends on the attribute value.
+
+    The vectorized engine calls these once per distinct attribute value
+    instead of once per variable.
+    """
+    func.value_only = True
+    return func
+
+
+@value_only
+def not_empty(value, variable, dataset):  # noqa: ARG001
+    """Pass if the attribute exists and is not empty."""
+    return value != ""
+
+
+@value_only
+def is_variable(value, variable, dataset):  # noqa: ARG001
+    """Pass if the attribute names a variable of the dataset."""
+    return value in dataset.variables
+
+
+@value_only
+def are_variables(value, variable, dataset):  # noqa: ARG001
+    """Pass if every name in the space separated attribute is a variable."""
+    return all(name in dataset.variables for name in value.split(" "))
+
+
+def one_of(options):
+    """Return a predicate passing if the attribute is one of ``options``."""
+    options = frozenset(options)
+
+    @value_only
+    def predicate(value, variable, dataset):  # noqa: ARG001
+        return value in options
+
+    return predicate
+
+
+def ends_with(suffix):
+    """Return a predicate passing if the attribute ends with ``suffix``."""
+
+    @value_only
+    def predicate(value, variable, dataset):  # noqa: ARG001
+        return value.endswith(suffix)
+
+    return predicate
+
+
+def defines_flags(value, variable, dataset):  # noqa: ARG001
+    """Pass if the variable defines flag_values or flag_masks."""
+    return "flag_values" in variable.attrs or "flag_masks" in variable.attrs
+
+
+def valid_range(value, variable, dataset):  # noqa: ARG001
+    """Pass if valid_range is an ordered pair with the variable's data type."""
+    return (
+        value.dtype == variable.dtype
+        and len(value) == 2
+        and value[0] <= value[1]
+    )
+
+
+def valid_bound(value, variable, dataset):  # noqa: ARG001
+    """Pass if valid_min or valid_max has the variable's data type."""
+    # str attributes aren't directly comparable to numpy dtypes
+    if isinstance(value, str):
+        return value != "" and variable.dtype.char == "S"
+    return value.dtype == variable.dtype
+
+
+@value_only
+def truthy(value, variable, dataset):  # noqa: ARG001
+    """Apply the rule only if the attribute is set and not empty."""
+    return bool(value)
+
+
+class Defined(typing.NamedTuple):
+    """Condition applying a rule if the variable defines, or lacks, ``attr``."""
+
+    attr: str
+    present: bool = True
+
+    def __call__(self, value, variable, dataset):  # noqa: ARG002
+        """Return true if the variable's definition of ``attr`` is as expected."""
+        return (self.attr in variable.attrs) is self.present
+
+
+def defined(attr):
+    """Return a condition applying the rule if the variable defines ``attr``."""
+    return Defined(attr)
+
+
+def undefined(attr):
+    """Return a condition applying the rule if the variable lacks ``attr``."""
+    return Defined(attr, present=False)
+
+
+def min_max_range_rules(target, severity):
+    """Return the rules for valid_range, or valid_min and valid_max.
+
+    Same assertions as BaseNCEICheck._check_min_max_range.
+    """
+    bound_message = "{bound} attribute should exist, have the same type as {{name}}, and not be empty or valid_range should be defined"
+    return (
+        Rule(
+            target,
+            "valid_range",
+            valid_range,
+            severity,
+            "valid_range must be a two element vector of min followed by max with the same data type as {name}",
+            defined("valid_range"),
+        ),
+        *(
+            Rule(
+                target,
+                bound,
+                valid_bound,
+                severity,
+                bound_message.format(bound=bound),
+                undefined("valid_range"),
+            )
+            for bound in ("valid_min", "valid_max")
+        ),
+    )
+
+
+class RulePlan:
+    """Rules compiled into the order they are evaluated in.
+
+    Rules are grouped by target and then by severity, keeping the order they
+    are declared in. Every target variable gets one TestCtx per severity.
+
+    There are two engines giving the same results. The scalar one reads the
+    attribute dictionary of each variable once and evaluates its rules in
+    turn. The vectorized one builds (variables x rules) boolean matrices from
+    the attribute index of the snapshot, calling value only predicates once
+    per distinct attribute value, and sums them per variable. It is used for
+    large groups of variables, see VECTORIZE_MIN_VARIABLES.
+    """
+
+    def __init__(self, rules):
+        self.groups = []
+        targets = {}
+        for rule in rules:
+            if rule.target not in targets:
+                targets[rule.target] = {}
+                target = TARGETS.get(rule.target)
+                if target is None:
+                    target = Target(rule.target)
+                self.groups.append((target, targets[rule.target]))
+            targets[rule.target].setdefault(rule.severity, []).append(
+                (rule.attr, rule.predicate, rule.when, rule.message),
+            )
+
+    def evaluate(
+        self,
+        context,
+        min_severity=BaseCheck.LOW,
+        vectorized=None,
+        *,
+        aggregate=False,
+    ):
+        """Return the results of the rules for a dataset.
+
+        :param util.DatasetContext context: the variables of the dataset
+        :param int min_severity: rules of a lower severity are not evaluated
+        :param bool vectorized: force the vectorized engine on or off, by
+                                default it is used for large groups
+        :param bool aggregate: return one result per distinct outcome instead
+                               of one per variable, see :func:`aggregate_results`.
+                               Aggregated results are always built by the
+                               vectorized engine.
+        """
+        results = []
+        for target, severities in self.groups:
+            names = target.select(context)
+            evaluated = {
+                severity: rules
+                for severity, rules in severities.items()
+                if severity >= min_severity
+            }
+            if aggregate:
+                results.extend(
+                    self._evaluate_matrix(
+                        context.dataset,
+                        names,
+                        target.descriptions,
+                        evaluated,
+                        aggregate=True,
+                    ),
+                )
+                continue
+            use_matrix = (
+                len(names) >= VECTORIZE_MIN_VARIABLES
+                if vectorized is None
+                else vectorized
+            )
+            evaluate = self._evaluate_matrix if use_matrix else self._evaluate
+            results.extend(
+                evaluate(
+                    context.dataset,
+                    names,
+                    target.descriptions,
+                    evaluated,
+                ),
+            )
+        return results
+
+    @staticmethod
+    def _evaluate(dataset, names, descriptions, severities):
+        from cc_plugin_ncei.ncei_base import TestCtx  # noqa: PLC0415
+
+        results = []
+        for name in names:
+            variable = dataset.variables[name]
+            attrs = variable.attrs
+            for severity, rules in severities.items():
+                test_ctx = TestCtx(
+                    severity,
+                    descriptions[severity].format(name=name),
+                )
+                for attr, predicate, when, message in rules:
+                    value = attrs.get(attr, "")
+                    if when is not None and not when(value, variable, dataset):
+                        continue
+                    test_ctx.assert_true(
+                        predicate(value, variable, dataset),
+                        message,
+                        name=name,
+                    )
+                results.append(test_ctx.to_result())
+        return results
+
+    @staticmethod
+    def _evaluate_matrix(
+        dataset,
+        names,
+        descriptions,
+        severities,
+        *,
+        aggregate=False,
+    ):
+        rows = {name: row for row, name in enumerate(names)}
+        results = {}
+        aggregated = []
+        # in scoring-only mode no row is looked at for its failed rules
+        messages = collecting()
+        for severity, rules in severities.items():
+            applies = np.ones((len(names), len(rules)), dtype=bool)
+            passes = np.zeros((len(names), len(rules)), dtype=bool)
+            for i, (attr, predicate, when, _) in enumerate(rules):
+                if when is not None:
+                    applies[:, i] = _column(
+                        dataset,
+                        rows,
+                        attr,
+                        when,
+                        applies[:, i],
+                    )
+                passes[:, i] = _column(
+                    dataset,
+                    rows,
+                    attr,
+                    predicate,
+                    applies[:, i],
+                )
+            failures = applies & ~passes
+            failing = (
+                failures.any(axis=1).tolist()
+                if messages
+                else [False] * len(names)
+            )
+            scores = (applies & passes).sum(axis=1).tolist()
+            out_of = applies.sum(axis=1).tolist()
+            description = descriptions[severity]
+            if aggregate:
+                outcomes = {}
+                for row, name in enumerate(names):
+                    failed = (
+                        tuple(np.flatnonzero(failures[row]).tolist())
+                        if failing[row]
+                        else ()
+                    )
+                    key = (failed, scores[row], out_of[row])
+                    outcomes.setdefault(key, []).append(name)
+                aggregated.extend(
+                    _aggregated_result(
+                        severity,
+                        (score, total),
+                        description,
+                        group,
+                        [
+                            Message(rules[i][3], name=_label(group))
+                            for i in failed
+                        ],
+                    )
+                    for (failed, score, total), group in outcomes.items()
+                )
+                continue
+            for row, name in enumerate(names):
+                msgs = []
+                if failing[row]:
+                    msgs = [
+                        Message(rules[i][3], name=name)
+                        for i in np.flatnonzero(failures[row])
+                    ]
+                results.setdefault(name, []).append(
+                    Result(
+                        severity,
+                        (scores[row], out_of[row]),
+                        description.format(name=name),
+                        msgs,
+                    ),
+                )
+        if aggregate:
+            return aggregated
+        return [result for name in names for result in results.get(name, [])]
+
+
+def _column(dataset, rows, attr, func, selected):
+    """Return ``func`` evaluated for the ``selected`` variables in ``rows``.
+
+    Defined conditions and value only functions are looked up in the
+    attribute index, anything else is called for each of the selected
+    variables. Like the scalar engine, ``func`` is never called for a value
+    that only variables not selected define, e.g. those a rule's condition
+    excludes. The other rows of the column are meaningless.
+    """
+    index = dataset.attribute_index
+    if isinstance(func, Defined):
+        values = index.column(func.attr, rows, lambda _: True)
+        return values if func.present else ~values
+    if getattr(func, "value_only", False):
+        defined = index.column(attr, rows, lambda _: True)
+        return index.column(
+            attr,
+            rows,
+            lambda value: func(value, None, dataset),
+            missing=bool((selected & ~defined).any())
+            and func("", None, dataset),
+            selected=selected,
+        )
+    names = list(rows)
+    values = np.zeros(len(rows), dtype=bool)
+    for row in np.flatnonzero(selected).tolist():
+        variable = dataset.variables[names[row]]
+        values[row] = bool(
+            func(variable.attrs.get(attr, ""), variable, dataset),
+        )
+    return values
+
+
+def _label(names):
+    """Return how rule messages refer to an aggregated group of variables.
+
+    The Result name lists the variables, the messages only count them.
+    """
+    return (
+        names[0] if len(names) == 1 else f"each of the {len(names)} variables"
+    )
+
+
+def _aggregated_result(weight, value, description, names, messages):
+    """Return the Result standing for the same outcome on all of ``names``."""
+    score, out_of = value
+    return Result(
+        weight,
+        (score * len(names), out_of * len(names)),
+        description.format(name=", ".join(names)),
+        messages,
+    )
+
+
+def aggregate_results(results, names, description):
+    """Collapse the per-variable results of a check by outcome.
+
+    Results of the same weight, value and messages are replaced by one
+    Result naming all of their variables, whose value is the sum of theirs.
+    The number of results then grows with the number of distinct outcomes
+    rather than with the number of variables.
+
+    :param list results: Results, one per variable of ``names``
+    :param list names: variable names
+    :param str description: Result name, ``{name}`` is the variable names
+    """
+    outcomes = {}
+    for name, result in zip(names, results, strict=True):
+        key = (result.weight, result.value, tuple(result.msgs))
+        outcomes.setdefault(key, []).append(name)
+    return [
+        _aggregated_result(
+            weight,
+            value,
+            description,
+            group,
+            list(msgs),
+        )
+        for (weight, value, msgs), group in outcomes.items()
+    ]
+
+
+@functools.cache
+def compile_rules(rules):
+    """Return the RulePlan of a tuple of rules, compiled once per process.
+
+    :param tuple rules: the Rule table of a checker
+    """
+    return RulePlan(rules)
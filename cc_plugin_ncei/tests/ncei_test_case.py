@@ -39,8 +39,8 @@ class NCEITestCase(unittest.TestCase):
             messages.extend(result.msgs)
         return messages
 
-    def run_checker(self, checker, dataset_location):
-        cs = CheckSuite()
+    def run_checker(self, checker, dataset_location, options=None):
+        cs = CheckSuite(options=options)
         cs.load_all_available_checkers()
         ds = cs.load_dataset(dataset_location)
         score_groups = cs.run(ds, [], checker)
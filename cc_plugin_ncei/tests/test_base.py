@@ -4,12 +4,18 @@ Tests the base functionality of the checker that should remain the same
 across all of the discrete sampling geometries.
 """
 
+import functools
+
 import numpy as np
 import pytest
 from compliance_checker.base import BaseCheck
 from compliance_checker.tests.helpers import MockNetCDF
+from netCDF4 import Dataset
 
 from cc_plugin_ncei import ncei_base
+from cc_plugin_ncei.ncei_grid import NCEIGrid2_0
+from cc_plugin_ncei.ncei_timeseries import NCEITimeSeriesOrthogonal2_0
+from cc_plugin_ncei.tests.resources import STATIC_FILES
 
 
 @pytest.fixture
@@ -71,3 +77,92 @@ def test_valid_min_max(nc):
         for v in ["valid_min", "valid_max"]
     ]
     assert expected == tc2.messages
+
+
+def test_lazy_messages():
+    """Messages given as templates or callables are built only on failure."""
+    tc = ncei_base.TestCtx(BaseCheck.MEDIUM, "Test context")
+
+    def fail():
+        raise AssertionError
+
+    passed, failed = True, False
+    tc.assert_true(passed, fail)
+    tc.assert_true(passed, "{missing}", 0)
+    tc.assert_true(failed, "{} should be {}", "units", "m")
+    tc.assert_true(failed, "{name} is not valid", name="pressure")
+    tc.assert_true(failed, lambda: "called")
+    tc.assert_true(failed, "{literal}")
+    assert tc.to_result().value == (2, 6)
+    assert tc.messages == [
+        "units should be m",
+        "pressure is not valid",
+        "called",
+        "{literal}",
+    ]
+    assert not hasattr(tc, "__dict__")
+
+
+def test_shared_standard_name_table():
+    """The standard name table and attribute lists are shared, not rebuilt
+    every time a checker is constructed.
+    """
+    first, second = ncei_base.NCEI1_1Check(), ncei_base.NCEI2_0Check()
+    assert first._std_names is second._std_names
+    assert first.rec_atts is ncei_base.NCEI1_1Check().rec_atts
+    assert isinstance(second.sug_atts, tuple)
+    assert "keywords" in second.high_rec_atts
+    assert not first.high_rec_atts
+
+
+def test_memoize(nc, monkeypatch):
+    """Checks declaring their inputs reuse the results of other datasets
+    giving them the same inputs.
+    """
+    monkeypatch.setattr(ncei_base, "_memo", {})
+    checker = NCEITimeSeriesOrthogonal2_0(options={"memoize": None})
+    checker.setup(nc)
+    first = checker.check_time(nc)
+    assert len(ncei_base._memo) == 1
+
+    # the rest of the header is not read by check_time
+    nc.variables["pressure"].long_name = "Pressure"
+    checker.setup(nc)
+    assert checker.check_time(nc) == first
+    assert len(ncei_base._memo) == 1
+
+    nc.variables["time"].long_name = "Time"
+    checker.setup(nc)
+    assert checker.check_time(nc) != first
+    assert len(ncei_base._memo) == 2
+
+    # the least recently used results are dropped
+    monkeypatch.setattr(ncei_base, "MEMO_SIZE", 2)
+    checker.check_high(nc)
+    assert len(ncei_base._memo) == 2
+    assert checker.check_time(nc) != first
+    assert len(ncei_base._memo) == 2
+
+
+def test_memoize_across_files(monkeypatch):
+    """A per-variable check is not run again on another file whose variable
+    has the same attributes.
+    """
+    monkeypatch.setattr(ncei_base, "_memo", {})
+    calls = []
+    check_lat = ncei_base.BaseNCEICheck.check_lat
+
+    @functools.wraps(check_lat)
+    def spy(self, dataset):
+        calls.append(dataset.filepath())
+        return check_lat(self, dataset)
+
+    monkeypatch.setattr(ncei_base.BaseNCEICheck, "check_lat", spy)
+    checker = NCEIGrid2_0(options={"memoize": None})
+    results = []
+    for name in ("2d-regular-grid", "3d-regular-grid"):
+        with Dataset(STATIC_FILES[name]) as ds:
+            checker.setup(ds)
+            results.append(checker.check_lat(ds))
+    assert calls == [str(STATIC_FILES["2d-regular-grid"])]
+    assert results[0] == results[1]
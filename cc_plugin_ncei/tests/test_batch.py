@@ -0,0 +1,229 @@
+"""tests/test_batch.py."""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+
+import pytest
+from compliance_checker.suite import CheckSuite
+from netCDF4 import Dataset
+
+from cc_plugin_ncei import batch, messages
+from cc_plugin_ncei.tests.resources import STATIC_FILES
+
+
+class TestBatch(TestCase):
+    """Tests validating many files in parallel."""
+
+    def setUp(self):
+        self.paths = [
+            str(STATIC_FILES["nodc-timeseries"]),
+            str(STATIC_FILES["ncei-timeseries-orthogonal:2.0"]),
+            str(STATIC_FILES["nodc-point"]),
+        ]
+
+    def test_iter_paths(self):
+        """Ensures files, directories, glob patterns and manifests are expanded."""
+        data = Path(self.paths[0]).parent
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = Path(tmpdir) / "manifest.txt"
+            manifest.write_text(
+                "# campaign\n\n" + "\n".join(self.paths[:2]) + "\n",
+                encoding="utf-8",
+            )
+            found = list(
+                batch.iter_paths(
+                    [self.paths[2], str(data), str(data / "*timeseries*.nc")],
+                    [manifest],
+                ),
+            )
+        assert found[:3] == self.paths
+        in_directory = sorted(str(path) for path in data.rglob("*.nc"))
+        assert found[3 : 3 + len(in_directory)] == in_directory
+        assert found[3 + len(in_directory) :] == sorted(
+            str(path) for path in data.glob("*timeseries*.nc")
+        )
+
+    def test_parse_options(self):
+        """Ensures checker options have the syntax of compliance-checker."""
+        assert batch.parse_options(
+            ["ncei-auto:min_severity:high", "ncei-auto:fail_fast"],
+        ) == {"ncei-auto": {"min_severity": "high", "fail_fast": None}}
+        with pytest.raises(ValueError, match="checker:option"):
+            batch.parse_options(["ncei-auto"])
+
+    def test_same_scores(self):
+        """Ensures reused checkers give the scores of compliance-checker."""
+        cs = CheckSuite()
+        cs.load_all_available_checkers()
+        expected = {}
+        for path in self.paths:
+            groups, _ = cs.run_all(cs.load_dataset(path), ["ncei-auto"], [])[
+                "ncei-auto"
+            ]
+            report = cs.build_structure("ncei-auto", groups, path)
+            expected[path] = (
+                report["scored_points"],
+                report["possible_points"],
+            )
+
+        for jobs in (1, 2):
+            summaries = list(batch.validate_files(self.paths * 2, jobs=jobs))
+            assert len(summaries) == 6
+            for summary in summaries:
+                scores = summary["checkers"]["ncei-auto"]
+                assert not scores["errors"]
+                assert (
+                    scores["scored_points"],
+                    scores["possible_points"],
+                ) == expected[summary["path"]]
+
+    def test_main(self):
+        """Ensures the command writes one JSON line per file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "results.jsonl"
+            missing = str(Path(tmpdir) / "missing.nc")
+            status = batch.main(
+                [
+                    *self.paths,
+                    missing,
+                    "-j",
+                    "1",
+                    "--failures",
+                    "-o",
+                    str(output),
+                ],
+            )
+            lines = [
+                json.loads(line)
+                for line in output.read_text(encoding="utf-8").splitlines()
+            ]
+        assert status == 1
+        assert [line["path"] for line in lines] == [*self.paths, missing]
+        assert "error" in lines[-1]
+        failures = lines[0]["checkers"]["ncei-auto"]["failures"]
+        assert all(failure["msgs"] for failure in failures)
+        msgs = [msg for failure in failures for msg in failure["msgs"]]
+        assert all(isinstance(msg[0], int) for msg in msgs)
+        assert all(messages.unpack(msg) for msg in msgs)
+
+    def test_reused_checkers(self):
+        """Ensures only the checkers of the plugin are reused across files."""
+        suite = batch.BatchSuite()
+        for path in self.paths:
+            summary = suite.validate(path, ["cf", "ncei-auto"])
+            assert "cf" in summary["checkers"]
+        assert list(suite._instances) == ["ncei-auto"]
+
+    def test_memory_footprint(self):
+        """Ensures the resident memory of each worker process is reported."""
+        # A child process of the parent that is not a worker
+        other = multiprocessing.Process(target=time.sleep, args=(30,))
+        other.start()
+        self.addCleanup(other.join)
+        self.addCleanup(other.terminate)
+        with batch.WorkerPool(jobs=2) as pool:
+            summaries = list(pool.validate(self.paths))
+            report = pool.check_memory_footprint()
+        assert len(summaries) == 3
+        assert len(report["workers"]) == 2
+        pids = {worker["pid"] for worker in report["workers"]}
+        assert report["parent"]["pid"] not in pids
+        assert other.pid not in pids
+        if Path("/proc/self/smaps_rollup").exists():
+            for footprint in [report["parent"], *report["workers"]]:
+                assert (
+                    0
+                    < footprint["uss"]
+                    <= footprint["pss"]
+                    <= footprint["rss"]
+                )
+
+    def test_dedup(self):
+        """Ensures files with the same header reuse the representative's results."""
+        source = Path(self.paths[0])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for day, created in enumerate(
+                ["2021-02-03T00:00:00Z", "not a date", None],
+            ):
+                path = Path(tmpdir) / f"day{day}.nc"
+                path.write_bytes(source.read_bytes())
+                with Dataset(path, "a") as nc:
+                    if created is None:
+                        nc.delncattr("date_created")
+                    else:
+                        nc.date_created = created
+                paths.append(str(path))
+
+            expected = list(batch.validate_files(paths, jobs=1, failures=True))
+            summaries = list(
+                batch.validate_files(paths, jobs=1, failures=True, dedup=True),
+            )
+        assert len({summary.pop("fingerprint") for summary in summaries}) == 1
+        assert "representative" not in summaries[0]
+        assert [
+            summary.pop("representative") for summary in summaries[1:]
+        ] == [
+            paths[0],
+            paths[0],
+        ]
+        assert summaries == expected
+        # the dynamic checks were run on every file
+        scores = [
+            summary["checkers"]["ncei-auto"]["scored_points"]
+            for summary in summaries
+        ]
+        assert scores[0] > scores[1]
+
+    def test_cache(self):
+        """Ensures unchanged files take their summaries from the cache."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for path in self.paths:
+                copy = Path(tmpdir) / Path(path).name
+                copy.write_bytes(Path(path).read_bytes())
+                paths.append(str(copy))
+            cache_path = str(Path(tmpdir) / "results.sqlite")
+            runs = []
+            for run in range(3):
+                if run == 2:
+                    # a touched file is opened again but not checked again
+                    os.utime(paths[0], ns=(0, 0))
+                output = Path(tmpdir) / "results.jsonl"
+                status = batch.main(
+                    [
+                        *paths,
+                        "-j",
+                        "1",
+                        "--cache",
+                        cache_path,
+                        "--cache-stats",
+                        "-o",
+                        str(output),
+                    ],
+                )
+                assert status == 0
+                runs.append(
+                    [
+                        json.loads(line)
+                        for line in output.read_text(
+                            encoding="utf-8",
+                        ).splitlines()
+                    ],
+                )
+        first, second, third = runs
+        assert not any("cached" in line for line in first)
+        assert all(line.pop("cached") for line in second[:-1])
+        assert all(line.pop("cached") for line in third[:-1])
+        assert second[:-1] == third[:-1] == first[:-1]
+        assert second[-1]["cache"]["hits"] == len(paths)
+        stats = third[-1]["cache"]
+        assert stats["entries"] > 2 * len(paths)
+        # the touched file missed on its path and hit on its header
+        assert stats["hits"] == 2 * len(paths)
+        assert stats["misses"] == second[-1]["cache"]["misses"] + 1
@@ -0,0 +1,147 @@
+"""tests/test_cache.py."""
+
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+from compliance_checker.base import BaseCheck, Result
+
+from cc_plugin_ncei import cache
+from cc_plugin_ncei.messages import Message
+from cc_plugin_ncei.tests.ncei_test_case import NCEITestCase
+from cc_plugin_ncei.tests.resources import STATIC_FILES
+
+
+class TestResultCache(NCEITestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = Path(tmpdir.name) / "cache" / "results.sqlite"
+
+    def test_lru_eviction(self):
+        result_cache = cache.ResultCache(self.path, max_size=2000)
+        self.addCleanup(result_cache.close)
+        result_cache.touch_interval = 0
+        for key in "abc":
+            result_cache.put(key, key * 500)
+        # reading a refreshes it, b is the least recently used
+        assert result_cache.get("a") == "a" * 500
+        result_cache.put("d", "d" * 500)
+        assert result_cache.get("b") is None
+        assert result_cache.get("c") == "c" * 500
+
+        stats = result_cache.stats()
+        assert stats["entries"] == 3
+        assert 0 < stats["size"] <= stats["max_size"] == 2000
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert (stats["stores"], stats["evictions"]) == (4, 1)
+
+        # replacing an entry keeps the running total of the sizes exact
+        result_cache.put("c", "c")
+        (total,) = result_cache._db.execute(
+            "SELECT TOTAL(size) FROM results",
+        ).fetchone()
+        assert result_cache.stats()["size"] == total
+
+        result_cache.clear()
+        assert (
+            result_cache.stats()["entries"]
+            == result_cache.stats()["hits"]
+            == 0
+        )
+
+    def test_reads_do_not_lock(self):
+        """Ensures reads are served while another process writes."""
+        result_cache = cache.ResultCache(self.path)
+        self.addCleanup(result_cache.close)
+        result_cache.put("a", "a")
+        writer = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(writer.close)
+        writer.execute("BEGIN IMMEDIATE")
+        result_cache._db.execute("PRAGMA busy_timeout = 0")
+        assert result_cache.get("a") == "a"
+        assert result_cache.get("b") is None
+        writer.execute("COMMIT")
+
+        # the reads are counted once written
+        stats = result_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        for _ in range(cache.READ_BATCH):
+            result_cache.get("a")
+        (hits,) = result_cache._db.execute(
+            "SELECT value FROM stats WHERE name = 'hits'",
+        ).fetchone()
+        assert hits == 1 + cache.READ_BATCH
+
+    def test_pack_results(self):
+        message = Message("variable {} should have units {}", "temp", "K")
+        # missing from the catalog, kept as text
+        other = Message(
+            "{name} should have units {units}",
+            name="temp",
+            units="K",
+        )
+        results = {
+            "check_units": [
+                Result(
+                    BaseCheck.HIGH,
+                    (1, 2),
+                    "units",
+                    [message, other],
+                    variable_name="temp",
+                ),
+            ],
+            "check_other": [True],
+        }
+        result_cache = cache.ResultCache(self.path)
+        self.addCleanup(result_cache.close)
+        packed = cache.pack_results(results)
+        assert packed["check_units"][0][4] == [message.record, str(other)]
+        result_cache.put("key", packed)
+        unpacked = cache.unpack_results(result_cache.get("key"))
+        assert unpacked == results
+        assert unpacked["check_units"][0].variable_name == "temp"
+        assert unpacked["check_units"][0].msgs[0].record == message.record
+
+    def test_invalid_options(self):
+        assert cache.from_options({"min_severity": "high"}) is None
+        with pytest.raises(ValueError, match="cache must be"):
+            cache.from_options({"cache": None})
+        with pytest.raises(ValueError, match="cache_size"):
+            cache.from_options({"cache": str(self.path), "cache_size": "1GB"})
+
+    def test_checker_results(self):
+        options = {
+            "ncei-timeseries-orthogonal": {
+                "cache": str(self.path),
+                "cache_size": "1000000",
+            },
+        }
+        for _ in range(2):
+            self.run_checker(
+                "ncei-timeseries-orthogonal:1.1",
+                STATIC_FILES["nodc-timeseries"],
+                options=options,
+            )
+            assert not self.errors
+            # Same report as without the cache
+            assert self.results["scored_points"] == 121
+            assert self.results["possible_points"] == 125
+            assert (
+                len(self.get_failed_messages(self.results["all_priorities"]))
+                == 4
+            )
+
+        stats = cache.get_cache(self.path, 1000000).stats()
+        assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+        # other options are cached apart
+        options["ncei-timeseries-orthogonal"]["min_severity"] = "high"
+        self.run_checker(
+            "ncei-timeseries-orthogonal:1.1",
+            STATIC_FILES["nodc-timeseries"],
+            options=options,
+        )
+        assert self.results["scored_points"] == 28
+        assert cache.get_cache(self.path, 1000000).stats()["misses"] == 2
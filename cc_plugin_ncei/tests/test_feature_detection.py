@@ -189,3 +189,25 @@ class TestFeatureDetection(TestCase):
                     nc,
                     variable,
                 ), f"{variable} is 3d regular grid"
+
+    def test_classify_feature_types(self):
+        """Ensures each representation is detected once per dimension signature."""
+        for feature_type in util.FEATURE_TYPES:
+            with Dataset(resources.STATIC_FILES[feature_type]) as nc:
+                feature_types = util.classify_feature_types(nc)
+                assert list(feature_types) == util.get_geophysical_variables(
+                    nc,
+                )
+                for variable, representations in feature_types.items():
+                    assert representations == {feature_type}, variable
+
+        with Dataset(
+            resources.STATIC_FILES["timeseries-profile-incomplete"],
+        ) as nc:
+            snapshot = util.get_snapshot(nc)
+            util.classify_feature_types(nc)
+            signatures = {
+                snapshot.variables[variable].dimensions
+                for variable in util.get_geophysical_variables(nc)
+            }
+            assert signatures == set(snapshot.axes._signatures)
@@ -0,0 +1,43 @@
+"""tests/test_import_time.py."""
+
+import json
+import subprocess
+import sys
+from unittest import TestCase
+
+# Measured in a fresh interpreter after compliance_checker.base, which every
+# suite needs anyway, so only the cost of the plugin itself is counted.
+SCRIPT = """
+import json, sys, time
+import compliance_checker.base
+start = time.perf_counter()
+import cc_plugin_ncei.ncei_auto
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+# Generous, the plugin modules import in a few tens of milliseconds.
+IMPORT_BUDGET = 1.0
+
+LAZY_MODULES = (
+    "cf_units",
+    "compliance_checker.cf.util",
+    "compliance_checker.cfunits",
+)
+
+
+class TestImportTime(TestCase):
+    """Tests that importing the checkers stays cheap."""
+
+    def test_import_budget(self):
+        """Ensures heavy dependencies are not imported with the entry points."""
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", SCRIPT],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        report = json.loads(output.splitlines()[-1])
+        for module in LAZY_MODULES:
+            assert module not in report["modules"], module
+        assert report["elapsed"] < IMPORT_BUDGET, report["elapsed"]
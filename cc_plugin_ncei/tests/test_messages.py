@@ -0,0 +1,118 @@
+"""tests/test_messages.py."""
+
+import json
+import pickle
+import subprocess
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+
+import pytest
+from compliance_checker.base import BaseCheck
+from compliance_checker.suite import CheckSuite
+
+from cc_plugin_ncei import messages, ncei_base, ncei_timeseries
+from cc_plugin_ncei.tests.resources import STATIC_FILES
+
+# Renders stored message records in a fresh interpreter, which has not
+# imported any checker.
+RENDER_SCRIPT = """
+import json, sys
+from cc_plugin_ncei.messages import render
+records = json.load(sys.stdin)
+print(json.dumps([render(msg_id, *args, **params) for msg_id, args, params in records]))
+"""
+
+
+def test_stable_ids():
+    """Message IDs depend on the template only, not on the parameters."""
+    template = "{lat} should have units {units}"
+    first = messages.Message(template, lat="lat", units="degrees_north")
+    second = messages.Message(template, lat="y", units="degrees")
+    assert first == "lat should have units degrees_north"
+    assert first.id == second.id == zlib.crc32(template.encode("utf-8"))
+    assert second.record == (second.id, (), {"lat": "y", "units": "degrees"})
+
+    # templates missing from the catalog are not added to it at run time
+    assert first.id not in messages.catalog()
+    assert messages.pack(second) == "y should have units degrees"
+
+    template = "{lat} should have units degrees_north"
+    message = messages.Message(template, lat="y")
+    assert messages.catalog()[message.id] == template
+    assert messages.pack(message) == message.record
+    assert messages.render(message.id, lat="y") == message
+    assert messages.unpack(message.record) == message
+
+
+def test_pickle():
+    """Messages keep their ID and parameters when they are pickled."""
+    for template in ("variable {} should have units {}", "{} should be {}"):
+        message = messages.Message(template, "temp", "K")
+        copied = pickle.loads(pickle.dumps(message))  # noqa: S301
+        assert copied == message
+        assert copied.record == message.record
+    # only the ID and parameters of catalog messages are pickled
+    message = messages.Message("variable {} should have units {}", "temp", "K")
+    assert message.__reduce__()[1] == message.record
+
+
+def test_assertions_have_ids():
+    """Failed assertions are recorded as messages of their template."""
+    tc = ncei_base.TestCtx(BaseCheck.HIGH, "Test context")
+    failed = False
+    tc.assert_true(failed, "{name} is not valid", name="pressure")
+    tc.assert_true(failed, "plain message")
+    first, second = tc.to_result().msgs
+    assert first.params == {"name": "pressure"}
+    assert first.id == messages.message_id("{name} is not valid")
+    assert second.id == messages.message_id("plain message")
+
+
+def test_catalog_up_to_date():
+    """Ensures data/messages.json lists the templates of the checkers."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(tmpdir) / "messages.json"
+        compiled = messages.compile_catalog(json_path=json_path)
+    shipped = Path(messages.__file__).parent / "data/messages.json"
+    assert compiled == json.loads(shipped.read_text(encoding="utf-8"))
+    assert "detected {template}" in compiled["templates"]
+    rule = ncei_timeseries.NCEITimeSeriesOrthogonal2_0.geophysical_rules[0]
+    assert rule.message in compiled["templates"]
+    ids = {zlib.crc32(t.encode("utf-8")) for t in compiled["templates"]}
+    assert len(ids) == len(compiled["templates"])
+
+
+def test_catalog_collisions(monkeypatch):
+    """Templates with the same ID are refused when compiling the catalog."""
+    monkeypatch.setattr(
+        messages,
+        "_literal_templates",
+        lambda _tree: iter(["plumless", "buckeroo"]),
+    )
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        pytest.raises(ValueError, match="have the same ID"),
+    ):
+        messages.compile_catalog(json_path=Path(tmpdir) / "messages.json")
+
+
+def test_render_in_new_process():
+    """Ensures stored messages render without running the checks again."""
+    cs = CheckSuite()
+    cs.load_all_available_checkers()
+    ds = cs.load_dataset(STATIC_FILES["nodc-timeseries"])
+    results, _ = cs.run_all(ds, ["ncei-timeseries-orthogonal:1.1"], [])[
+        "ncei-timeseries-orthogonal:1.1"
+    ]
+    msgs = [msg for result in results for msg in result.msgs]
+    assert msgs
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", RENDER_SCRIPT],
+        input=json.dumps([msg.record for msg in msgs]),
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    assert json.loads(output) == [str(msg) for msg in msgs]
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from netCDF4 import Dataset
+
+from cc_plugin_ncei import util
+from cc_plugin_ncei.ncei_auto import NCEIAuto, detect_templates
+from cc_plugin_ncei.ncei_grid import NCEIGrid1_1, NCEIGrid2_0
+from cc_plugin_ncei.ncei_point import NCEIPoint1_1
+from cc_plugin_ncei.ncei_timeseries import NCEITimeSeriesOrthogonal2_0
+from cc_plugin_ncei.tests.ncei_test_case import NCEITestCase
+from cc_plugin_ncei.tests.resources import STATIC_FILES
+
+
+class TestNCEIAuto(NCEITestCase):
+    def test_point_1_1(self):
+        self.run_checker("ncei-auto", STATIC_FILES["nodc-point"])
+        assert not self.errors
+
+        # ncei-point:1.1 scores 121/124, plus the detected template
+        assert self.results["scored_points"] == 122
+        assert self.results["possible_points"] == 125
+        known_messages = [
+            "geospatial_lat_resolution should exist and not be empty.",
+            "geospatial_lon_resolution should exist and not be empty.",
+            "geospatial_vertical_resolution should exist and not be empty.",
+        ]
+        failed_messages = self.get_failed_messages(
+            self.results["all_priorities"],
+        )
+        assert sorted(failed_messages) == sorted(known_messages)
+
+    def test_timeseries_2_0(self):
+        self.run_checker(
+            "ncei-auto",
+            STATIC_FILES["ncei-timeseries-orthogonal:2.0"],
+        )
+        assert not self.errors
+
+        # ncei-timeseries-orthogonal:2.0 scores 143/147
+        assert self.results["scored_points"] == 144
+        assert self.results["possible_points"] == 148
+
+    def test_detect_templates(self):
+        with Dataset(STATIC_FILES["nodc-point"]) as nc:
+            assert detect_templates(nc) == [NCEIPoint1_1]
+        with Dataset(STATIC_FILES["ncei-timeseries-orthogonal:2.0"]) as nc:
+            assert detect_templates(nc) == [NCEITimeSeriesOrthogonal2_0]
+        # No template version attribute, both versions are checked
+        with Dataset(STATIC_FILES["3d-regular-grid"]) as nc:
+            assert detect_templates(nc) == [NCEIGrid1_1, NCEIGrid2_0]
+
+    def test_context_shared(self):
+        """Ensures the detected checkers run on the context of the detection."""
+        with Dataset(STATIC_FILES["3d-regular-grid"]) as nc:
+            checker = NCEIAuto()
+            checker.setup(nc)
+            assert len(checker.checkers) == 2
+            context = checker.checkers[0].context
+            assert checker.checkers[1].context is context
+            assert context.dataset is util.get_snapshot(nc)
+
+    def test_session_context(self):
+        """Ensures the session option detects the template from the session's context."""
+        with Dataset(STATIC_FILES["3d-regular-grid"]) as nc:
+            context = util.DEFAULT_SESSION.context(nc)
+            checker = NCEIAuto(options={"session": None})
+            # The variables are not discovered again
+            with (
+                mock.patch.object(
+                    util,
+                    "get_geophysical_variables",
+                ) as discover,
+                mock.patch.object(util, "classify_feature_types") as classify,
+            ):
+                checker.setup(nc)
+            assert not discover.called
+            assert not classify.called
+            assert [type(c) for c in checker.checkers] == [
+                NCEIGrid1_1,
+                NCEIGrid2_0,
+            ]
+            assert all(c.context is context for c in checker.checkers)
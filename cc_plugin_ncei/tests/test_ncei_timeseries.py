@@ -1,3 +1,21 @@
+import functools
+import inspect
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from compliance_checker.base import BaseCheck
+from compliance_checker.suite import CheckSuite
+from netCDF4 import Dataset
+
+from cc_plugin_ncei import util
+from cc_plugin_ncei.ncei_base import BaseNCEICheck
+from cc_plugin_ncei.ncei_timeseries import (
+    NCEITimeSeriesOrthogonal1_1,
+    NCEITimeSeriesOrthogonal2_0,
+)
 from cc_plugin_ncei.tests.ncei_test_case import NCEITestCase
 from cc_plugin_ncei.tests.resources import STATIC_FILES
 
@@ -48,3 +66,179 @@ class TestNCEITimeSeries2_0(NCEITestCase):
             self.results["all_priorities"],
         )
         assert sorted(failed_messages) == sorted(known_messages)
+
+
+class TestNCEITimeSeriesMinSeverity(NCEITestCase):
+    def test_required_only(self):
+        self.run_checker(
+            "ncei-timeseries-orthogonal:1.1",
+            STATIC_FILES["nodc-timeseries"],
+            options={"ncei-timeseries-orthogonal": {"min_severity": "high"}},
+        )
+        assert not self.errors
+
+        # Only the required checks run, recommended and suggested are skipped
+        assert self.results["scored_points"] == 28
+        assert self.results["possible_points"] == 29
+        assert {r.weight for r in self.results["all_priorities"]} == {
+            BaseCheck.HIGH,
+        }
+        failed_messages = self.get_failed_messages(
+            self.results["all_priorities"],
+        )
+        assert failed_messages == [
+            "nodc_template_version attribute must be NODC_NetCDF_TimeSeries_Orthogonal_Template_v1.1",
+        ]
+
+    def test_invalid_severity(self):
+        with pytest.raises(ValueError, match="min_severity"):
+            self.run_checker(
+                "ncei-timeseries-orthogonal:2.0",
+                STATIC_FILES["ncei-timeseries-orthogonal:2.0"],
+                options={
+                    "ncei-timeseries-orthogonal": {"min_severity": "urgent"},
+                },
+            )
+
+
+class TestNCEITimeSeriesFailFast(NCEITestCase):
+    def test_stops_at_required_failure(self):
+        self.run_checker(
+            "ncei-timeseries-orthogonal:1.1",
+            STATIC_FILES["nodc-timeseries"],
+            options={"ncei-timeseries-orthogonal": {"fail_fast": None}},
+        )
+        assert not self.errors
+
+        # check_dimensions passes and check_required_attributes fails on
+        # the template version, nothing else is run
+        assert self.results["scored_points"] == 4
+        assert self.results["possible_points"] == 6
+        failed_messages = self.get_failed_messages(
+            self.results["all_priorities"],
+        )
+        assert sorted(failed_messages) == [
+            "check_required_attributes has a required failure, the remaining checks were not run",
+            "nodc_template_version attribute must be NODC_NetCDF_TimeSeries_Orthogonal_Template_v1.1",
+        ]
+
+    def test_full_report_without_failure(self):
+        self.run_checker(
+            "ncei-timeseries-orthogonal:2.0",
+            STATIC_FILES["ncei-timeseries-orthogonal:2.0"],
+            options={"ncei-timeseries-orthogonal": {"fail_fast": None}},
+        )
+        assert not self.errors
+
+        assert self.results["scored_points"] == 143
+        assert self.results["possible_points"] == 147
+
+
+class TestNCEITimeSeriesCombined(NCEITestCase):
+    def test_both_versions(self):
+        checkers = [
+            "ncei-timeseries-orthogonal:1.1",
+            "ncei-timeseries-orthogonal:2.0",
+        ]
+        cs = CheckSuite(
+            options={"ncei-timeseries-orthogonal": {"combined": None}},
+        )
+        cs.load_all_available_checkers()
+        ds = cs.load_dataset(STATIC_FILES["nodc-timeseries"])
+        score_groups = cs.run_all(ds, checkers, [])
+
+        # Same scores as running the checkers on their own
+        for checker, scores in zip(checkers, [(121, 125), (124, 143)]):
+            results, errors = score_groups[checker]
+            assert not errors
+            report = cs.build_structure(checker, results, "nodc-timeseries")
+            assert (
+                report["scored_points"],
+                report["possible_points"],
+            ) == scores
+
+        # check_lat was evaluated once for both versions
+        shared = util.get_snapshot(ds).context.check_results
+        check_lat = inspect.unwrap(BaseNCEICheck.check_lat)
+        keys = [key for key in shared if key[0] is check_lat]
+        assert len(keys) == 1
+        assert keys[0][1] == BaseCheck.LOW
+
+    def test_context_shared(self):
+        options = {"combined": None}
+        with Dataset(STATIC_FILES["nodc-timeseries"]) as nc:
+            first = NCEITimeSeriesOrthogonal1_1(options=options)
+            second = NCEITimeSeriesOrthogonal2_0(options=options)
+            first.setup(nc)
+            second.setup(nc)
+            assert second.context is first.context
+            assert first.context is util.get_snapshot(nc).context
+
+    def test_second_run_sees_changes(self):
+        """Ensures a combined run does not reuse the results of the last one."""
+        checkers = [
+            "ncei-timeseries-orthogonal:1.1",
+            "ncei-timeseries-orthogonal:2.0",
+        ]
+
+        def lat_scores(cs, nc):
+            groups = cs.run_all(nc, checkers, [])
+            return [
+                result.value
+                for checker in checkers
+                for result in groups[checker][0]
+                if str(result.name).endswith("attributes for variable lat")
+            ]
+
+        combined = CheckSuite(
+            options={"ncei-timeseries-orthogonal": {"combined": None}},
+        )
+        combined.load_all_available_checkers()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "timeseries.nc"
+            shutil.copy(STATIC_FILES["nodc-timeseries"], path)
+            with Dataset(path, "a") as nc:
+                before = lat_scores(combined, nc)
+                nc.variables["lat"].units = "furlongs"
+                after = lat_scores(combined, nc)
+                expected = lat_scores(CheckSuite(), nc)
+        assert sorted(before[:2]) == [(3, 3), (6, 6)]
+        assert sorted(after[:2]) == [(2, 3), (5, 6)]
+        assert after == expected
+
+    def test_shared_with_memoize(self):
+        """Ensures memoized checks are still shared between the versions."""
+        calls = []
+        check_lat = BaseNCEICheck.check_lat
+
+        @functools.wraps(check_lat)
+        def spy(self, dataset):
+            calls.append(type(self))
+            return check_lat(self, dataset)
+
+        options = {"combined": None, "memoize": None}
+        with (
+            mock.patch.object(BaseNCEICheck, "check_lat", spy),
+            Dataset(STATIC_FILES["nodc-timeseries"]) as nc,
+        ):
+            first = NCEITimeSeriesOrthogonal1_1(options=options)
+            second = NCEITimeSeriesOrthogonal2_0(options=options)
+            first.setup(nc)
+            second.setup(nc)
+            assert first.check_lat(nc) == second.check_lat(nc)
+        assert calls == [NCEITimeSeriesOrthogonal1_1]
+
+
+class TestNCEITimeSeriesScoreOnly(NCEITestCase):
+    def test_scores_without_messages(self):
+        self.run_checker(
+            "ncei-timeseries-orthogonal:1.1",
+            STATIC_FILES["nodc-timeseries"],
+            options={"ncei-timeseries-orthogonal": {"score_only": None}},
+        )
+        assert not self.errors
+
+        # Same scores as the full report, without any message
+        assert self.results["scored_points"] == 121
+        assert self.results["possible_points"] == 125
+        assert not self.get_failed_messages(self.results["all_priorities"])
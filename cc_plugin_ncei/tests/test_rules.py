@@ -0,0 +1,173 @@
+"""tests/test_rules.py."""
+
+from unittest import TestCase
+
+import numpy as np
+from compliance_checker.base import BaseCheck
+
+from cc_plugin_ncei import rules, util
+from cc_plugin_ncei.ncei_base import NCEI1_1Check, NCEI2_0Check
+from cc_plugin_ncei.tests.helpers import MockNetCDF
+
+
+class TestRules(TestCase):
+    """Tests the declarative attribute rule engine."""
+
+    def setUp(self):
+        self.nc = MockNetCDF()
+        self.nc.createDimension("time", 2)
+        self.nc.createVariable("time", "f8", ("time",))
+        self.nc.variables["time"].standard_name = "time"
+        self.nc.variables["time"].axis = "T"
+        temp = self.nc.createVariable("temperature", "f4", ("time",))
+        temp.standard_name = "sea_water_temperature"
+        temp.units = "degree_C"
+        temp.platform = "platform"
+        self.addCleanup(self.nc.close)
+
+    def test_evaluate(self):
+        """Ensures rules are grouped by severity and skipped by conditions."""
+        plan = rules.compile_rules(
+            (
+                rules.Rule(
+                    "geophysical",
+                    "units",
+                    rules.not_empty,
+                    BaseCheck.HIGH,
+                    "units of {name} must not be empty",
+                ),
+                rules.Rule(
+                    "geophysical",
+                    "platform",
+                    rules.is_variable,
+                    BaseCheck.MEDIUM,
+                    "platform of {name} is a variable",
+                    rules.truthy,
+                ),
+                rules.Rule(
+                    "geophysical",
+                    "comment",
+                    rules.not_empty,
+                    BaseCheck.MEDIUM,
+                    "comment of {name} is not empty",
+                    rules.defined("comment"),
+                ),
+            ),
+        )
+        required, recommended = plan.evaluate(
+            util.DatasetContext.from_dataset(self.nc),
+        )
+        assert required.weight == BaseCheck.HIGH
+        assert required.name == "Required attributes for variable temperature"
+        assert required.value == (1, 1)
+        assert recommended.weight == BaseCheck.MEDIUM
+        assert recommended.value == (0, 1)
+        assert recommended.msgs == ["platform of temperature is a variable"]
+
+    def test_compiled_once(self):
+        """Ensures a rule table is compiled once and shared by checkers."""
+        plan = rules.compile_rules(NCEI2_0Check.geophysical_rules)
+        assert rules.compile_rules(NCEI2_0Check.geophysical_rules) is plan
+        assert rules.compile_rules(NCEI1_1Check.geophysical_rules) is not plan
+
+    def test_vectorized(self):
+        """Ensures both engines give the same results."""
+        for i in range(3):
+            var = self.nc.createVariable(f"salinity{i}", "f4", ("time",))
+            var.standard_name = "sea_water_salinity"
+            var.units = "1e-3"
+            var.valid_min = np.float32(0)
+            if i:
+                var.comment = ""
+                var.valid_max = 40.0
+        flag = self.nc.createVariable("flag", "i1", ("time",))
+        flag.flag_meanings = "good bad"
+        flag.flag_values = np.array([0, 1], dtype="i1")
+        flag.standard_name = "sea_water_salinity status_flag"
+
+        self.assert_same_results()
+
+    def test_vectorized_falsy_values(self):
+        """Ensures predicates only see the values their conditions select."""
+        # Falsy non-string values fail the conditions of the rules reading
+        # them, the scalar engine never passes them to the predicate
+        temp = self.nc.variables["temperature"]
+        temp.ancillary_variables = np.int32(0)
+        temp.platform = np.int32(0)
+        temp.instrument = np.int32(0)
+        var = self.nc.createVariable("salinity", "f4", ("time",))
+        var.standard_name = "sea_water_salinity"
+        var.units = "1e-3"
+        var.ancillary_variables = "temperature"
+        flag = self.nc.createVariable("flag", "i1", ("time",))
+        flag.flag_meanings = "good bad"
+        flag.flag_values = np.array([0, 1], dtype="i1")
+        flag.standard_name = "sea_water_salinity status_flag"
+        flag.references = np.int8(0)
+        self.assert_same_results()
+
+    def assert_same_results(self):
+        context = util.DatasetContext.from_dataset(self.nc)
+        for table in (
+            NCEI1_1Check.geophysical_rules,
+            NCEI2_0Check.geophysical_rules,
+            NCEI2_0Check.qaqc_rules,
+        ):
+            plan = rules.compile_rules(table)
+            for min_severity in (BaseCheck.LOW, BaseCheck.HIGH):
+                scalar = plan.evaluate(context, min_severity, vectorized=False)
+                vectorized = plan.evaluate(
+                    context,
+                    min_severity,
+                    vectorized=True,
+                )
+                assert [
+                    (r.weight, r.name, r.value, r.msgs) for r in vectorized
+                ] == [(r.weight, r.name, r.value, r.msgs) for r in scalar]
+
+    def test_aggregate(self):
+        """Ensures identical outcomes are reported once for all their variables."""
+        for i in range(3):
+            var = self.nc.createVariable(f"salinity{i}", "f4", ("time",))
+            var.standard_name = "sea_water_salinity"
+            var.units = "1e-3"
+            if i:
+                var.long_name = "salinity"
+        context = util.DatasetContext.from_dataset(self.nc)
+        plan = rules.compile_rules(NCEI2_0Check.geophysical_rules)
+        results = plan.evaluate(context)
+        aggregated = plan.evaluate(context, aggregate=True)
+        assert len(results) == 8
+        assert [(r.weight, r.name) for r in aggregated] == [
+            (
+                BaseCheck.HIGH,
+                "Required attributes for variable temperature, salinity0, salinity1, salinity2",
+            ),
+            (
+                BaseCheck.MEDIUM,
+                "Recommended attributes for variable temperature",
+            ),
+            (
+                BaseCheck.MEDIUM,
+                "Recommended attributes for variable salinity0",
+            ),
+            (
+                BaseCheck.MEDIUM,
+                "Recommended attributes for variable salinity1, salinity2",
+            ),
+        ]
+        for weight in (BaseCheck.HIGH, BaseCheck.MEDIUM):
+            totals = [
+                tuple(
+                    map(
+                        sum,
+                        zip(*(r.value for r in found if r.weight == weight)),
+                    ),
+                )
+                for found in (results, aggregated)
+            ]
+            assert totals[0] == totals[1]
+        assert (
+            "valid_min attribute should exist, have the same type as each of the 2 variables, and not be empty or valid_range should be defined"
+            in aggregated[3].msgs
+        )
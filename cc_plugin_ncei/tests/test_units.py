@@ -0,0 +1,38 @@
+"""tests/test_units.py."""
+
+from unittest import TestCase
+
+import numpy as np
+
+from cc_plugin_ncei import units
+
+
+class TestUnits(TestCase):
+    """Tests the memoized units service."""
+
+    def setUp(self):
+        units.cache_clear()
+
+    def test_is_valid_unit(self):
+        """Ensures unit strings are validated and the results are cached."""
+        assert units.is_valid_unit("m")
+        assert units.is_valid_unit("dbar")
+        assert not units.is_valid_unit("not a unit")
+        assert units.is_valid_unit("m")
+        info = units.cache_info()["is_valid_unit"]
+        assert (info.hits, info.misses) == (1, 3)
+
+    def test_is_convertible(self):
+        """Ensures conversions match compliance-checker's units_convertible."""
+        assert units.is_convertible("degrees_north", "degrees_north")
+        assert units.is_convertible("degree_N", "degrees_north")
+        assert not units.is_convertible("m", "degrees_east")
+        assert not units.is_convertible("not a unit", "m")
+        assert units.is_convertible("degree_N", "degrees_north")
+        info = units.cache_info()["is_convertible"]
+        assert (info.hits, info.misses) == (1, 4)
+
+    def test_unhashable_units(self):
+        """Ensures non string attribute values are handled without caching."""
+        assert not units.is_valid_unit(np.array([1, 2]))
+        assert not units.is_convertible(np.array([1, 2]), "m")
@@ -0,0 +1,297 @@
+"""tests/test_util.py."""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+from compliance_checker.suite import CheckSuite
+from netCDF4 import Dataset
+
+from cc_plugin_ncei import util
+from cc_plugin_ncei.tests import resources
+from cc_plugin_ncei.tests.helpers import MockNetCDF
+
+
+class TestDatasetSnapshot(TestCase):
+    """Tests the single-pass metadata snapshot."""
+
+    def test_snapshot_matches_dataset(self):
+        """Ensures the snapshot holds the same metadata as the dataset."""
+        with Dataset(resources.STATIC_FILES["timeseries"]) as nc:
+            snapshot = util.DatasetSnapshot.from_dataset(nc)
+            assert snapshot.dimensions == {"time": 2}
+            assert snapshot.ncattrs() == nc.ncattrs()
+            for name, ncvar in nc.variables.items():
+                var = snapshot.variables[name]
+                assert var.dimensions == ncvar.dimensions
+                assert var.shape == ncvar.shape
+                assert var.dtype == ncvar.dtype
+                assert var.ncattrs() == ncvar.ncattrs()
+                for attr in ncvar.ncattrs():
+                    assert getattr(var, attr) == getattr(ncvar, attr)
+            assert not hasattr(snapshot.variables["time"], "missing")
+            assert getattr(snapshot, "missing", "") == ""
+
+    def test_util_accepts_snapshot(self):
+        """Ensures the util helpers give the same answers on a snapshot."""
+        with Dataset(resources.STATIC_FILES["timeseries"]) as nc:
+            snapshot = util.DatasetSnapshot.from_dataset(nc)
+            assert util.get_geophysical_variables(snapshot) == ["temperature"]
+            assert util.get_lat_variable(snapshot) == "lat"
+            assert util.get_lon_variable(snapshot) == "lon"
+            assert util.get_z_variable(snapshot) == "z"
+            assert util.get_time_variable(snapshot) == "time"
+            assert util.coordinate_dimension_matrix(
+                snapshot,
+            ) == util.coordinate_dimension_matrix(nc)
+            assert util.is_timeseries(snapshot, "temperature")
+
+    def test_get_variables_by_attributes(self):
+        """Ensures attribute filters behave like netCDF4's."""
+        with Dataset(resources.STATIC_FILES["timeseries"]) as nc:
+            snapshot = util.DatasetSnapshot.from_dataset(nc)
+            for kwargs in (
+                {"standard_name": "time"},
+                {"axis": lambda x: x is not None},
+                {"positive": lambda x: x is None},
+                {"standard_name": "depth", "units": "m"},
+            ):
+                expected = [
+                    v.name for v in nc.get_variables_by_attributes(**kwargs)
+                ]
+                found = [
+                    v.name
+                    for v in snapshot.get_variables_by_attributes(**kwargs)
+                ]
+                assert found == expected
+
+    def test_snapshot_cache_and_invalidation(self):
+        """Ensures snapshots are reused until invalidated."""
+        nc = MockNetCDF()
+        try:
+            nc.createDimension("time", 2)
+            nc.createVariable("time", "f8", ("time",))
+            snapshot = util.get_snapshot(nc)
+            assert util.get_snapshot(nc) is snapshot
+            assert util.get_snapshot(snapshot) is snapshot
+            assert util.get_time_variable(nc) is None
+
+            nc.variables["time"].axis = "T"
+            util.invalidate_snapshot(nc)
+            assert util.get_snapshot(nc) is not snapshot
+            assert util.get_time_variable(nc) == "time"
+        finally:
+            nc.close()
+
+    def test_axes_resolved_once(self):
+        """Ensures the coordinate axes are resolved once per snapshot."""
+        nc = MockNetCDF()
+        try:
+            nc.createDimension("time", 2)
+            nc.createVariable("time", "f8", ("time",))
+            nc.createVariable("lat", "f8", ())
+            nc.variables["lat"].standard_name = "latitude"
+            axes = util.get_snapshot(nc).axes
+            assert util.get_snapshot(nc).axes is axes
+            assert util.coordinate_dimension_matrix(nc) == {"y": ()}
+            assert (axes.x, axes.y, axes.z, axes.t) == (
+                None,
+                "lat",
+                None,
+                None,
+            )
+
+            nc.variables["time"].axis = "T"
+            assert util.get_time_variable(nc) is None
+            util.invalidate_snapshot(nc)
+            assert util.get_time_variable(nc) == "time"
+            assert util.coordinate_dimension_matrix(nc) == {
+                "y": (),
+                "t": ("time",),
+            }
+        finally:
+            nc.close()
+
+
+class TestAttributeIndex(TestCase):
+    """Tests the inverted attribute index of a snapshot."""
+
+    def test_find(self):
+        """Ensures lookups return variable names in dataset order."""
+        with Dataset(resources.STATIC_FILES["nodc-point"]) as nc:
+            index = util.get_snapshot(nc).attribute_index
+            assert index.find("standard_name", "time") == ["time"]
+            assert index.find("axis") == ["z", "time", "lat", "lon"]
+            assert index.find("platform", "platform1") == ["sal", "temp"]
+            assert index.find("cf_role", "timeseries_id") == []
+            assert index.find(
+                "standard_name",
+                lambda x: x in ("depth", "latitude"),
+            ) == ["z", "lat"]
+            assert index.find("grid_mapping_name", lambda x: x is None) == [
+                name for name in nc.variables if name != "crs"
+            ]
+            assert index.first("axis", "Y") == "lat"
+            assert index.first("axis", "W") is None
+            assert index.values("grid_mapping") == [
+                ("crs", "sal"),
+                ("crs", "temp"),
+            ]
+
+    def test_unhashable_values(self):
+        """Ensures array valued attributes can be indexed and found."""
+        with Dataset(resources.STATIC_FILES["nodc-point"]) as nc:
+            index = util.get_snapshot(nc).attribute_index
+            assert index.find("valid_min", 0.0) == ["z", "sal", "temp"]
+            assert util.get_platform_variables(nc) == ["platform1"]
+            assert util.get_instrument_variables(nc) == ["instrument1"]
+            assert util.get_crs_variable(nc) == "crs"
+
+
+class TestSeaNames(TestCase):
+    """Tests the precompiled sea names index."""
+
+    def test_index_matches_source(self):
+        """Ensures data/seanames.json is up to date with data/seanames.xml."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_path = Path(tmpdir) / "seanames.json"
+            util.compile_sea_names(json_path=json_path)
+            compiled = json.loads(json_path.read_text(encoding="utf-8"))
+        assert compiled["seanames"] == util.get_sea_names()
+        assert util.get_sea_names()["Great Australian Bight"] == "62"
+
+    def test_is_valid_sea_name(self):
+        """Ensures sea names are validated ignoring case."""
+        assert util.is_valid_sea_name("North Pacific Ocean")
+        assert util.is_valid_sea_name("north pacific ocean")
+        assert not util.is_valid_sea_name("Sea of Tranquility")
+        assert len(util.get_sea_name_index()) == len(util.get_sea_names())
+
+
+class TestDatasetContext(TestCase):
+    """Tests the per-run context of discovered variables."""
+
+    def test_from_dataset(self):
+        """Ensures the context holds the same variables as the util lookups."""
+        with Dataset(resources.STATIC_FILES["nodc-point"]) as nc:
+            context = util.DatasetContext.from_dataset(nc)
+            assert context.dataset is util.get_snapshot(nc)
+            assert (context.lat, context.lon, context.z, context.time) == (
+                "lat",
+                "lon",
+                "z",
+                "time",
+            )
+            assert context.geophysical_variables == ["sal", "temp"]
+            assert context.platform_variables == ["platform1"]
+            assert context.instrument_variables == ["instrument1"]
+            assert context.crs == "crs"
+            assert context.feature_types == util.classify_feature_types(nc)
+
+
+class TestSession(TestCase):
+    """Tests sharing the metadata scan of a dataset across checker runs."""
+
+    def test_context_shared(self):
+        """Ensures a session builds the context of a dataset once."""
+        with Dataset(resources.STATIC_FILES["nodc-point"]) as nc:
+            with util.Session() as session:
+                assert util.current_session() is session
+                context = util.get_context(nc)
+                assert util.get_context(nc) is context
+                assert util.get_snapshot(nc) is context.dataset
+            assert util.current_session() is None
+            assert util.get_context(nc) is not context
+            assert util.get_snapshot(nc) is not context.dataset
+
+    def test_suites_share_scan(self):
+        """Ensures suites run inside a session reuse one snapshot."""
+        check_suite = CheckSuite()
+        check_suite.load_all_available_checkers()
+        with (
+            Dataset(resources.STATIC_FILES["nodc-point"]) as nc,
+            util.Session(),
+        ):
+            snapshot = util.get_context(nc).dataset
+            for checker in ("ncei-point:1.1", "ncei-point:2.0"):
+                check_suite.run_all(nc, [checker], [])
+                assert util.get_snapshot(nc) is snapshot
+
+
+class TestHeaderFingerprint(TestCase):
+    """Tests the fingerprint of the metadata read by the checks."""
+
+    def test_dynamic_attributes_ignored(self):
+        """Ensures only the dynamic global attributes are left out."""
+        source = resources.STATIC_FILES["nodc-timeseries"]
+        with Dataset(source) as nc:
+            fingerprint = util.header_fingerprint(nc)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "copy.nc"
+            path.write_bytes(Path(source).read_bytes())
+            with Dataset(path, "a") as nc:
+                nc.date_created = "2021-02-03T00:00:00Z"
+                nc.uuid = "another file"
+                nc.delncattr("history")
+                assert util.header_fingerprint(nc) == fingerprint
+
+                nc.title = "another title"
+                util.invalidate_snapshot(nc)
+                changed = util.header_fingerprint(nc)
+                assert changed != fingerprint
+
+                nc.variables["time"].long_name = "another name"
+                util.invalidate_snapshot(nc)
+                renamed = util.header_fingerprint(nc)
+                assert renamed not in {fingerprint, changed}
+
+                # array attributes of different dtypes
+                nc.variables["time"].flag_values = np.array([1, 2], "f4")
+                util.invalidate_snapshot(nc)
+                single = util.header_fingerprint(nc)
+                nc.variables["time"].flag_values = np.array([1, 2], "f8")
+                util.invalidate_snapshot(nc)
+                assert util.header_fingerprint(nc) not in {renamed, single}
+
+    def test_metadata_key(self):
+        """Ensures the key only covers the given variables and attributes."""
+
+        def snapshot(var_attrs, attrs):
+            time = util.VariableSnapshot(
+                "time",
+                ("time",),
+                (2,),
+                np.dtype("f8"),
+                var_attrs,
+            )
+            return util.DatasetSnapshot({"time": 2}, [time], attrs)
+
+        def key(ds):
+            return util.metadata_key(
+                ds,
+                ["time", None],
+                ["units", "calendar"],
+                ["title"],
+            )
+
+        units = {"units": "seconds since 1970-01-01"}
+        first = key(snapshot(units, {}))
+        assert first == (
+            (
+                (
+                    "time",
+                    "float64",
+                    (("units", ("str", "seconds since 1970-01-01")),),
+                ),
+                None,
+            ),
+            (),
+        )
+        assert (
+            key(snapshot({**units, "long_name": "Time"}, {"summary": "other"}))
+            == first
+        )
+        assert key(snapshot(units, {"title": "title"})) != first
+        assert key(snapshot({**units, "calendar": "julian"}, {})) != first
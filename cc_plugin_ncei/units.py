@@ -0,0 +1,73 @@
+"""cc_plugin_ncei/units.py."""
+
+import functools
+
+# The same handful of unit strings is seen in nearly every file, so parsing
+# and conversion results are kept in bounded LRU caches for the life of the
+# process. cache_info() reports the hits and misses of each cache.
+UNITS_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=UNITS_CACHE_SIZE)
+def _parse(units):
+    """Return the cf_units Unit for ``units`` or None if it is not valid."""
+    from compliance_checker.cfunits import Unit  # noqa: PLC0415
+
+    try:
+        return Unit(units)
+    except (ValueError, NotImplementedError):
+        return None
+
+
+def _parse_any(units):
+    """Like :func:`_parse`, bypassing the cache for unhashable values."""
+    try:
+        return _parse(units)
+    except TypeError:
+        return _parse.__wrapped__(units)
+
+
+def is_valid_unit(units):
+    """Return true if ``units`` is a valid UDUNITS string.
+
+    :param str units: unit string
+    """
+    return _parse_any(units) is not None
+
+
+@functools.lru_cache(maxsize=UNITS_CACHE_SIZE)
+def _is_convertible(units1, units2):
+    """Return true if ``units1`` can be converted to ``units2``."""
+    unit1 = _parse_any(units1)
+    unit2 = _parse_any(units2)
+    if unit1 is None or unit2 is None:
+        return False
+    return unit1.is_convertible(unit2)
+
+
+def is_convertible(units1, units2):
+    """Return true if ``units1`` can be converted to ``units2``.
+
+    Same semantics as compliance_checker.cf.util.units_convertible.
+
+    :param str units1: unit string
+    :param str units2: unit string
+    """
+    try:
+        return _is_convertible(units1, units2)
+    except TypeError:
+        return _is_convertible.__wrapped__(units1, units2)
+
+
+def cache_info():
+    """Return the hits, misses and sizes of the units caches."""
+    return {
+        "is_valid_unit": _parse.cache_info(),
+        "is_convertible": _is_convertible.cache_info(),
+    }
+
+
+def cache_clear():
+    """Empty the units caches and reset their counters."""
+    _parse.cache_clear()
+    _is_convertible.cache_clear()
@@ -1,12 +1,15 @@
 """cc_plugin_ncei/util.py."""
 
+from __future__ import annotations
+
 import functools
+import hashlib
 import json
+import typing
+import weakref
 from pathlib import Path
 from pkgutil import get_data
 
-from lxml import etree
-
 
 @functools.lru_cache(maxsize=128)
 def get_unitless_standard_names():
@@ -16,29 +19,547 @@ def get_unitless_standard_names():
     return json.loads(f)
 
 
-@functools.lru_cache(maxsize=128)
-def get_sea_names():
-    """Return a list of NODC sea names.
+def compile_sea_names(
+    xml_path=Path(__file__).parent / "data/seanames.xml",
+    json_path=Path(__file__).parent / "data/seanames.json",
+):
+    """Regenerate data/seanames.json from the NODC sea names XML.
+
+    The XML is only kept as the source of the JSON index that is shipped and
+    loaded at run time; call this after updating it.
 
     source of list: http://www.nodc.noaa.gov/General/NODC-Archive/seanames.xml
     """
-    resource_text = get_data("cc_plugin_ncei", "data/seanames.xml")
+    from lxml import etree  # noqa: PLC0415
+
     parser = etree.XMLParser(remove_blank_text=True)
-    root = etree.fromstring(resource_text, parser)
-    _sea_names = {}
+    root = etree.fromstring(Path(xml_path).read_bytes(), parser)
+    sea_names = {}
     for seaname in root.findall("seaname"):
         name = seaname.find("seaname").text
-        _sea_names[name] = (
+        sea_names[name] = (
             seaname.find("seacode").text
             if seaname.find("seacode") is not None
             else "N/A"
         )
+    index = {
+        "title": root.get("title"),
+        "date": root.get("date"),
+        "seanames": sea_names,
+    }
+    Path(json_path).write_text(
+        json.dumps(index, indent=4, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    return index
+
+
+@functools.lru_cache(maxsize=128)
+def get_sea_names():
+    """Return a map of NODC sea names to sea codes.
+
+    Loaded from data/seanames.json, see :func:`compile_sea_names`.
+    """
+    resource_text = get_data("cc_plugin_ncei", "data/seanames.json")
+    return json.loads(resource_text)["seanames"]
 
-    return _sea_names
+
+@functools.lru_cache(maxsize=1)
+def get_sea_name_index():
+    """Return the lowercased NODC sea names as a frozenset."""
+    return frozenset(name.lower() for name in get_sea_names())
+
+
+def is_valid_sea_name(sea_name):
+    """Return true if ``sea_name`` is in the NODC sea names list, ignoring case.
+
+    :param str sea_name: a single sea name
+    """
+    return sea_name.lower() in get_sea_name_index()
+
+
+@functools.lru_cache(maxsize=1)
+def get_standard_name_table():
+    """Return the CF standard name table, parsed once per process."""
+    from compliance_checker.cf.util import StandardNameTable  # noqa: PLC0415
+
+    return StandardNameTable()
+
+
+_ANY = object()
+
+
+def _hashable(value):
+    """Return a hashable stand-in for an attribute value.
+
+    netCDF attributes are str, numpy scalars or numpy arrays; arrays are
+    turned into tuples so they can be used as dictionary keys.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        tolist = getattr(value, "tolist", None)
+        if tolist is None:
+            return repr(value)
+        value = tolist()
+        return tuple(value) if isinstance(value, list) else value
+    return value
+
+
+def _typed(value):
+    """Return a hashable stand-in for an attribute value that keeps its type.
+
+    Arrays of different dtypes have the same :func:`_hashable` value, but the
+    checks comparing an attribute's dtype to its variable's tell them apart.
+    """
+    return (
+        str(getattr(value, "dtype", type(value).__name__)),
+        _hashable(value),
+    )
+
+
+class AttributeIndex:
+    """Inverted index from attribute name to attribute value to variable names.
+
+    Built once per DatasetSnapshot so that looking up the variables defining
+    an attribute does not scan every variable of the dataset.
+    """
+
+    def __init__(self, snapshot):
+        self._order = {name: i for i, name in enumerate(snapshot.variables)}
+        # attribute name -> hashable value -> (raw value, [variable names])
+        self._index = {}
+        for name, var in snapshot.variables.items():
+            for attr, value in var.attrs.items():
+                values = self._index.setdefault(attr, {})
+                key = _hashable(value)
+                if key not in values:
+                    values[key] = (value, [])
+                values[key][1].append(name)
+
+    def _sorted(self, names):
+        return sorted(names, key=self._order.__getitem__)
+
+    def find(self, attr, value=_ANY):
+        """Return the names of the variables whose ``attr`` matches ``value``.
+
+        Names are returned in dataset order. With no ``value`` every variable
+        defining ``attr`` matches. A callable ``value`` is evaluated once per
+        distinct attribute value and, like
+        netCDF4.Dataset.get_variables_by_attributes, with None for the
+        variables that do not define ``attr``.
+
+        :param str attr: attribute name
+        :param value: attribute value, predicate or nothing
+        """
+        values = self._index.get(attr, {})
+        if value is _ANY:
+            names = [name for _, names in values.values() for name in names]
+            return self._sorted(names)
+        if not callable(value):
+            match = values.get(_hashable(value))
+            return list(match[1]) if match else []
+        names = [
+            name
+            for raw, names in values.values()
+            if value(raw)
+            for name in names
+        ]
+        if value(None):
+            defined = {name for _, names in values.values() for name in names}
+            names.extend(name for name in self._order if name not in defined)
+        return self._sorted(names)
+
+    def first(self, attr, value=_ANY):
+        """Return the name of the first variable matching, or None.
+
+        :param str attr: attribute name
+        :param value: attribute value, predicate or nothing
+        """
+        names = self.find(attr, value)
+        return names[0] if names else None
+
+    def column(self, attr, rows, func, *, missing=False, selected=None):
+        """Return a boolean array of ``func(value)`` over a set of variables.
+
+        ``func`` is called once per distinct value of ``attr`` defined by a
+        selected variable, variables not defining it get ``missing``.
+
+        :param str attr: attribute name
+        :param dict rows: variable name to its row in the array
+        :param func: called with an attribute value
+        :param bool missing: value for the variables not defining ``attr``
+        :param selected: boolean array of the rows ``func`` is evaluated
+                         for, by default all of them. The values of the
+                         other rows are meaningless.
+        """
+        import numpy as np  # noqa: PLC0415
+
+        column = np.full(len(rows), bool(missing))
+        for raw, names in self._index.get(attr, {}).values():
+            found = [rows[name] for name in names if name in rows]
+            if selected is not None:
+                found = [row for row in found if selected[row]]
+            if found:
+                column[found] = bool(func(raw))
+        return column
+
+    def values(self, attr):
+        """Return ``(value, variable name)`` pairs for ``attr`` in dataset order.
+
+        :param str attr: attribute name
+        """
+        pairs = [
+            (raw, name)
+            for raw, names in self._index.get(attr, {}).values()
+            for name in names
+        ]
+        return sorted(pairs, key=lambda pair: self._order[pair[1]])
+
+
+class AxisResolution:
+    """The x, y, z and t coordinate variables of a dataset and their dimensions.
+
+    Resolved once per DatasetSnapshot; the feature type predicates all start
+    from the same coordinate dimension matrix, so there is no need to look
+    the coordinates up again for every variable.
+    """
+
+    __slots__ = ("_signatures", "matrix", "t", "x", "y", "z")
+
+    def __init__(self, snapshot):
+        self.x = _find_lon_variable(snapshot)
+        self.y = _find_lat_variable(snapshot)
+        self.z = _find_z_variable(snapshot)
+        self.t = _find_time_variable(snapshot)
+        self.matrix = {
+            axis: snapshot.variables[name].dimensions
+            for axis, name in (
+                ("x", self.x),
+                ("y", self.y),
+                ("z", self.z),
+                ("t", self.t),
+            )
+            if name
+        }
+        self._signatures = {}
+
+    def classify(self, dims):
+        """Return the feature type representations matching a dimension tuple.
+
+        Evaluated once per distinct dimension tuple, see :data:`FEATURE_TYPES`.
+
+        :param tuple dims: dimensions of a variable
+        """
+        dims = tuple(dims)
+        representations = self._signatures.get(dims)
+        if representations is None:
+            representations = frozenset(
+                name
+                for name, predicate in FEATURE_TYPES.items()
+                if predicate(self, dims)
+            )
+            self._signatures[dims] = representations
+        return representations
+
+    def __repr__(self):
+        """Return a short representation of the resolved axes."""
+        return f"<AxisResolution x={self.x} y={self.y} z={self.z} t={self.t}>"
+
+
+class VariableSnapshot:
+    """Read-only copy of the metadata of a single netCDF variable.
+
+    Mirrors the parts of the netCDF4.Variable interface used by the checks
+    (name, dimensions, shape, dtype, ncattrs and attribute access) without
+    going back to the C library.
+    """
+
+    __slots__ = ("attrs", "dimensions", "dtype", "name", "shape")
+
+    def __init__(self, name, dimensions, shape, dtype, attrs):
+        self.name = name
+        self.dimensions = tuple(dimensions)
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.attrs = dict(attrs)
+
+    @classmethod
+    def from_variable(cls, ncvar):
+        """Return a snapshot of a netCDF4.Variable.
+
+        :param netCDF4.Variable ncvar: variable to copy
+        """
+        return cls(
+            ncvar.name,
+            ncvar.dimensions,
+            ncvar.shape,
+            ncvar.dtype,
+            ncvar.__dict__,
+        )
+
+    def ncattrs(self):
+        """Return the names of the variable's attributes."""
+        return list(self.attrs)
+
+    def getncattr(self, name):
+        """Return the value of the attribute ``name``."""
+        try:
+            return self.attrs[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getattr__(self, name):
+        """Look up netCDF attributes the same way netCDF4.Variable does."""
+        if name.startswith("__") or name in self.__slots__:
+            raise AttributeError(name)
+        return self.getncattr(name)
+
+    def __repr__(self):
+        """Return a short representation of the snapshot."""
+        return f"<VariableSnapshot {self.name}{self.dimensions}>"
+
+
+class DatasetSnapshot:
+    """Read-only copy of the metadata of a netCDF dataset, taken in one pass.
+
+    Holds every dimension, every variable's name, dimensions, shape, dtype
+    and attributes, and the global attributes. It can be passed to all of the
+    functions in this module and to the checkers in place of the
+    netCDF4.Dataset it was taken from.
+    """
+
+    def __init__(
+        self,
+        dimensions,
+        variables,
+        attrs,
+        unlimited_dimensions=(),
+        filepath=None,
+    ):
+        self.dimensions = dict(dimensions)
+        self.unlimited_dimensions = frozenset(unlimited_dimensions)
+        self.variables = {var.name: var for var in variables}
+        self.attrs = dict(attrs)
+        self._filepath = filepath
+        # DatasetContext shared by the checkers run on this snapshot
+        self.context = None
+
+    @classmethod
+    def from_dataset(cls, ds):
+        """Read the metadata of an open dataset in a single pass.
+
+        :param netCDF4.Dataset ds: An open netCDF dataset
+        """
+        try:
+            filepath = ds.filepath()
+        except (AttributeError, ValueError):
+            filepath = None
+        return cls(
+            dimensions={name: dim.size for name, dim in ds.dimensions.items()},
+            variables=[
+                VariableSnapshot.from_variable(ncvar)
+                for ncvar in ds.variables.values()
+            ],
+            attrs=ds.__dict__,
+            unlimited_dimensions=[
+                name
+                for name, dim in ds.dimensions.items()
+                if dim.isunlimited()
+            ],
+            filepath=filepath,
+        )
+
+    def filepath(self):
+        """Return the path of the dataset the snapshot was taken from."""
+        return self._filepath
+
+    def ncattrs(self):
+        """Return the names of the global attributes."""
+        return list(self.attrs)
+
+    def getncattr(self, name):
+        """Return the value of the global attribute ``name``."""
+        try:
+            return self.attrs[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def get_variables_by_attributes(self, **kwargs):
+        """Return the variables matching all of the given attribute filters.
+
+        Same semantics as netCDF4.Dataset.get_variables_by_attributes: a value
+        is either compared for equality or, if callable, called with the
+        attribute value (None when the attribute is missing).
+        """
+        names = None
+        for attr, value in kwargs.items():
+            found = self.attribute_index.find(attr, value)
+            if names is not None:
+                found = set(found)
+                found = [name for name in names if name in found]
+            names = found
+        return [self.variables[name] for name in names or ()]
+
+    @functools.cached_property
+    def attribute_index(self):
+        """Return the AttributeIndex of this snapshot, built on first use."""
+        return AttributeIndex(self)
+
+    @functools.cached_property
+    def axes(self):
+        """Return the AxisResolution of this snapshot, resolved on first use."""
+        return AxisResolution(self)
+
+    def __getattr__(self, name):
+        """Look up global attributes the same way netCDF4.Dataset does."""
+        if name.startswith("_") or name == "attrs":
+            raise AttributeError(name)
+        return self.getncattr(name)
+
+    def __repr__(self):
+        """Return a short representation of the snapshot."""
+        return f"<DatasetSnapshot {self._filepath or ''} ({len(self.variables)} variables)>"
+
+
+_snapshots = weakref.WeakKeyDictionary()
+
+
+def get_snapshot(ds):
+    """Return the DatasetSnapshot for ``ds``, taking it on first use.
+
+    Snapshots are cached for as long as the dataset object is alive. Call
+    :func:`invalidate_snapshot` after modifying a writable dataset.
+
+    :param netCDF4.Dataset ds: An open netCDF dataset or a DatasetSnapshot
+    """
+    if isinstance(ds, DatasetSnapshot):
+        return ds
+    snapshot = _snapshots.get(ds)
+    if snapshot is None:
+        snapshot = DatasetSnapshot.from_dataset(ds)
+        _snapshots[ds] = snapshot
+    return snapshot
+
+
+def invalidate_snapshot(ds):
+    """Drop the cached DatasetSnapshot of ``ds`` so that it is taken again.
+
+    The attribute index and resolved axes live on the snapshot and are
+    dropped with it.
+
+    :param netCDF4.Dataset ds: An open netCDF dataset
+    """
+    _snapshots.pop(ds, None)
+
+
+# Global attributes that change from one file of a collection to the next
+# when the rest of its header does not.
+DYNAMIC_ATTRIBUTES = frozenset(
+    (
+        "date_created",
+        "date_issued",
+        "date_metadata_modified",
+        "date_modified",
+        "geospatial_bounds",
+        "geospatial_lat_max",
+        "geospatial_lat_min",
+        "geospatial_lon_max",
+        "geospatial_lon_min",
+        "geospatial_vertical_max",
+        "geospatial_vertical_min",
+        "history",
+        "id",
+        "time_coverage_duration",
+        "time_coverage_end",
+        "time_coverage_start",
+        "uuid",
+    ),
+)
+
+
+def header_fingerprint(ds, dynamic=DYNAMIC_ATTRIBUTES):
+    """Return a digest of the metadata the checks read, as a hex string.
+
+    The digest covers the dimension names, the name, dimensions, dtype and
+    attributes of every variable and the global attributes, except those in
+    ``dynamic``. The lengths of the dimensions are left out since no check
+    reads them, so daily files of a collection share a fingerprint when only
+    their dates, identifiers and bounds differ. Datasets with the same
+    fingerprint get the same results from every check of the NCEI checkers
+    but their ``dynamic_checks``.
+
+    :param netCDF4.Dataset ds: An open netCDF dataset or a DatasetSnapshot
+    :param dynamic: names of the global attributes to leave out
+    """
+    ds = get_snapshot(ds)
+    header = (
+        [(name, name in ds.unlimited_dimensions) for name in ds.dimensions],
+        [
+            (
+                var.name,
+                var.dimensions,
+                str(var.dtype),
+                [(attr, _typed(value)) for attr, value in var.attrs.items()],
+            )
+            for var in ds.variables.values()
+        ],
+        [
+            (attr, _typed(value))
+            for attr, value in ds.attrs.items()
+            if attr not in dynamic
+        ],
+    )
+    return hashlib.blake2b(
+        repr(header).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+
+def metadata_key(ds, variables=(), attrs=(), global_attributes=()):
+    """Return a hashable key of part of the metadata of a dataset.
+
+    The key covers the name and dtype of each of ``variables`` with the
+    values of those of ``attrs`` it defines, and the values of the
+    ``global_attributes`` the dataset defines. A check reading only that
+    metadata gives the same results on datasets with the same key.
+
+    :param netCDF4.Dataset ds: An open netCDF dataset or a DatasetSnapshot
+    :param variables: variable names, None standing for a missing variable
+    :param attrs: names of the variable attributes
+    :param global_attributes: names of the global attributes
+    """
+    ds = get_snapshot(ds)
+    keys = []
+    for name in variables:
+        if name is None:
+            keys.append(None)
+            continue
+        var = ds.variables[name]
+        keys.append(
+            (
+                name,
+                str(var.dtype),
+                tuple(
+                    (attr, _typed(var.attrs[attr]))
+                    for attr in attrs
+                    if attr in var.attrs
+                ),
+            ),
+        )
+    return (
+        tuple(keys),
+        tuple(
+            (attr, _typed(ds.attrs[attr]))
+            for attr in global_attributes
+            if attr in ds.attrs
+        ),
+    )
 
 
 def is_geophysical(ds, variable):
     """Return true if the dataset's variable is likely a geophysical variable."""
+    ds = get_snapshot(ds)
     ncvar = ds.variables[variable]
     # Does it have a standard name and units?
     standard_name = getattr(ncvar, "standard_name", "")
@@ -75,52 +596,83 @@ def get_geophysical_variables(ds):
 
     :param netCDF4.Dataset nc: An open netCDF dataset
     """
+    ds = get_snapshot(ds)
     return [
         variable for variable in ds.variables if is_geophysical(ds, variable)
     ]
 
 
-def get_z_variable(nc):
+def _find_z_variable(nc):
     """Return the name of the variable that defines the Z axis or height/depth.
 
-    :param netCDF4.Dataset nc: netCDF dataset
+    :param DatasetSnapshot nc: snapshot of a netCDF dataset
     """
-    axis_z = nc.get_variables_by_attributes(axis="Z")
+    index = nc.attribute_index
+    axis_z = index.first("axis", "Z")
     if axis_z:
-        return axis_z[0].name
+        return axis_z
     valid_standard_names = ("depth", "height", "altitude")
-    z = nc.get_variables_by_attributes(
-        standard_name=lambda x: x in valid_standard_names,
+    return index.first(
+        "standard_name",
+        lambda x: x in valid_standard_names,
     )
-    if z:
-        return z[0].name
-    return None
 
 
-def get_lat_variable(nc):
+def _find_lat_variable(nc):
     """Return the variable for latitude.
 
-    :param netcdf4.dataset nc: an open netcdf dataset object
+    :param DatasetSnapshot nc: snapshot of a netCDF dataset
     """
     if "latitude" in nc.variables:
         return "latitude"
-    latitudes = nc.get_variables_by_attributes(standard_name="latitude")
-    if latitudes:
-        return latitudes[0].name
-    return None
+    return nc.attribute_index.first("standard_name", "latitude")
 
 
-def get_lon_variable(nc):
+def _find_lon_variable(nc):
     """Return the variable for longitude.
 
-    :param netCDF4.Dataset nc: netCDF dataset
+    :param DatasetSnapshot nc: snapshot of a netCDF dataset
     """
     if "longitude" in nc.variables:
         return "longitude"
-    longitudes = nc.get_variables_by_attributes(standard_name="longitude")
-    if longitudes:
-        return longitudes[0].name
-    return None
+    return nc.attribute_index.first("standard_name", "longitude")
+
+
+def get_z_variable(nc):
+    """Return the name of the variable that defines the Z axis or height/depth.
+
+    :param netCDF4.Dataset nc: netCDF dataset
+    """
+    return get_snapshot(nc).axes.z
+
+
+def get_lat_variable(nc):
+    """Return the variable for latitude.
+
+    :param netcdf4.dataset nc: an open netcdf dataset object
+    """
+    return get_snapshot(nc).axes.y
+
+
+def get_lon_variable(nc):
+    """Return the variable for longitude.
+
+    :param netCDF4.Dataset nc: netCDF dataset
+    """
+    return get_snapshot(nc).axes.x
+
+
+def _get_referenced_variables(ds, attr):
+    """Return the variables named by ``attr`` on any variable or globally."""
+    candidates = []
+    for value, _ in ds.attribute_index.values(attr):
+        if value and value in ds.variables and value not in candidates:
+            candidates.append(value)
+
+    value = getattr(ds, attr, "")
+    if value and value in ds.variables and value not in candidates:
+        candidates.append(value)
+    return candidates
 
 
 def get_platform_variables(ds):
@@ -128,20 +680,7 @@ def get_platform_variables(ds):
 
     :param netCDF4.Dataset ds: An open netCDF4 Dataset
     """
-    candidates = []
-    for variable in ds.variables:
-        platform = getattr(ds.variables[variable], "platform", "")
-        if (
-            platform
-            and platform in ds.variables
-            and platform not in candidates
-        ):
-            candidates.append(platform)
-
-    platform = getattr(ds, "platform", "")
-    if platform and platform in ds.variables and platform not in candidates:
-        candidates.append(platform)
-    return candidates
+    return _get_referenced_variables(get_snapshot(ds), "platform")
 
 
 def get_instrument_variables(ds):
@@ -149,52 +688,43 @@ def get_instrument_variables(ds):
 
     :param netCDF4.Dataset ds: An open netCDF4 Dataset
     """
-    candidates = []
-    for variable in ds.variables:
-        instrument = getattr(ds.variables[variable], "instrument", "")
-        if (
-            instrument
-            and instrument in ds.variables
-            and instrument not in candidates
-        ):
-            candidates.append(instrument)
-
-    instrument = getattr(ds, "instrument", "")
-    if (
-        instrument
-        and instrument in ds.variables
-        and instrument not in candidates
-    ):
-        candidates.append(instrument)
-    return candidates
+    return _get_referenced_variables(get_snapshot(ds), "instrument")
 
 
-def get_time_variable(ds):
+def _find_time_variable(ds):
     """Return the likeliest variable to be the time coordinate variable.
 
-    :param netCDF4.Dataset ds: An open netCDF4 Dataset
+    :param DatasetSnapshot ds: snapshot of a netCDF dataset
     """
-    for var in ds.variables:
-        if getattr(ds.variables[var], "axis", "") == "T":
-            return var
-    candidates = ds.get_variables_by_attributes(standard_name="time")
+    axis_t = ds.attribute_index.first("axis", "T")
+    if axis_t:
+        return axis_t
+    candidates = ds.attribute_index.find("standard_name", "time")
     if len(candidates) == 1:
-        return candidates[0].name
+        return candidates[0]
     # Look for a coordinate variable time
     for candidate in candidates:
-        if candidate.dimensions == (candidate.name,):
-            return candidate.name
+        if ds.variables[candidate].dimensions == (candidate,):
+            return candidate
 
     return None
 
 
+def get_time_variable(ds):
+    """Return the likeliest variable to be the time coordinate variable.
+
+    :param netCDF4.Dataset ds: An open netCDF4 Dataset
+    """
+    return get_snapshot(ds).axes.t
+
+
 def get_crs_variable(ds):
     """Return the name of the variable identified by a grid_mapping attribute.
 
     :param netCDF4.Dataset ds: An open netCDF4 Dataset
     """
-    for var in ds.variables:
-        grid_mapping = getattr(ds.variables[var], "grid_mapping", "")
+    ds = get_snapshot(ds)
+    for grid_mapping, _ in ds.attribute_index.values("grid_mapping"):
         if grid_mapping and grid_mapping in ds.variables:
             return grid_mapping
     return None
@@ -205,40 +735,23 @@ def coordinate_dimension_matrix(nc):
 
     :param netCDF4.Dataset nc: An open netCDF dataset
     """
-    retval = {}
-    x = get_lon_variable(nc)
-    if x:
-        retval["x"] = nc.variables[x].dimensions
-    y = get_lat_variable(nc)
-    if y:
-        retval["y"] = nc.variables[y].dimensions
-
-    z = get_z_variable(nc)
-    if z:
-        retval["z"] = nc.variables[z].dimensions
-
-    t = get_time_variable(nc)
-    if t:
-        retval["t"] = nc.variables[t].dimensions
-    return retval
+    return dict(get_snapshot(nc).axes.matrix)
 
 
-def is_point(nc, variable):
+def _is_point(axes, dims):
     """Return true if the variable is a point feature type.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(o), y(o), z(o), t(o)
     # X(o)
 
-    dims = nc.variables[variable].dimensions
-
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
     for req in ("x", "y", "t"):
         if req not in cmatrix:
             return False
-    t = get_time_variable(nc)
+    t = axes.t
     if cmatrix["x"] != cmatrix["y"] or cmatrix["x"] != cmatrix["t"]:
         return False
     # This is a trajectory
@@ -251,17 +764,15 @@ def is_point(nc, variable):
     return dims == cmatrix["x"]
 
 
-def is_timeseries(nc, variable):
+def _is_timeseries(axes, dims):
     """Return true if the variable is a time series feature type.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x, y, z, t(o)
     # X(o)
-    dims = nc.variables[variable].dimensions
-
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
     for req in ("x", "y", "t"):
         if req not in cmatrix:
             return False
@@ -271,7 +782,7 @@ def is_timeseries(nc, variable):
         return False
     if "z" in cmatrix and len(cmatrix["z"]) != 0:
         return False
-    timevar = get_time_variable(nc)
+    timevar = axes.t
 
     # time has to be a coordinate variable in this case
     if cmatrix["t"] != (timevar,):
@@ -279,21 +790,19 @@ def is_timeseries(nc, variable):
     return dims == cmatrix["t"]
 
 
-def is_multi_timeseries_orthogonal(nc, variable):
+def _is_multi_timeseries_orthogonal(axes, dims):
     """Return true if the variable is a orthogonal multidimensional array representation of time series.
 
     For more information on what this means see CF 1.6 §H.2.1.
 
     http://cfconventions.org/cf-conventions/v1.6.0/cf-conventions.html#_orthogonal_multidimensional_array_representation_of_time_series
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i), y(i), z(i), t(o)
     # X(i, o)
-    dims = nc.variables[variable].dimensions
-
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "t"):
         if req not in cmatrix:
@@ -303,7 +812,7 @@ def is_multi_timeseries_orthogonal(nc, variable):
     if "z" in cmatrix and cmatrix["x"] != cmatrix["z"]:
         return False
 
-    timevar = get_time_variable(nc)
+    timevar = axes.t
     if cmatrix["t"] != (timevar,):
         return False
 
@@ -312,20 +821,19 @@ def is_multi_timeseries_orthogonal(nc, variable):
     return dims == (i, o)
 
 
-def is_multi_timeseries_incomplete(nc, variable):
+def _is_multi_timeseries_incomplete(axes, dims):
     """Return true if the variable is an incomplete multidimensional array representation of time series.
 
     For more information on what this means see CF 1.6 §H.2.2.
 
     http://cfconventions.org/cf-conventions/v1.6.0/cf-conventions.html#_incomplete_multidimensional_array_representation_of_time_series
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i), y(i), z(i), t(i, o)
     # X(i, o)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "t"):
         if req not in cmatrix:
@@ -345,16 +853,15 @@ def is_multi_timeseries_incomplete(nc, variable):
     return dims == (i, o)
 
 
-def is_cf_trajectory(nc, variable):
+def _is_cf_trajectory(axes, dims):
     """Return true if the variable is a CF trajectory feature type.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i, o), y(i, o), z(i, o), t(i, o)
     # X(i, o)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "t"):
         if req not in cmatrix:
@@ -370,21 +877,20 @@ def is_cf_trajectory(nc, variable):
     return dims == cmatrix["x"]
 
 
-def is_single_trajectory(nc, variable):
+def _is_single_trajectory(axes, dims):
     """Return true if the variable is a single trajectory feature.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(t), y(t), z(t), t(t)
     # X(t)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "t"):
         if req not in cmatrix:
             return False
-    t = get_time_variable(nc)
+    t = axes.t
     if cmatrix["x"] != (t,):
         return False
     if cmatrix["x"] != cmatrix["y"]:
@@ -396,17 +902,16 @@ def is_single_trajectory(nc, variable):
     return dims == cmatrix["x"]
 
 
-def is_profile_orthogonal(nc, variable):
+def _is_profile_orthogonal(axes, dims):
     """Return true if the variable is a orthogonal profile feature type.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # Every profile has the exact same depths, think thermister or ADCP
     # x(i), y(i), z(j), t(i)
     # X(i, j)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -426,17 +931,16 @@ def is_profile_orthogonal(nc, variable):
     return dims == (i, j)
 
 
-def is_profile_incomplete(nc, variable):
+def _is_profile_incomplete(axes, dims):
     """Return true if the variable is a incomplete profile feature type.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # Every profile may have different depths
     # x(i), y(i), z(i, j), t(i)
     # X(i, j)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -456,16 +960,15 @@ def is_profile_incomplete(nc, variable):
     return dims == (i, j)
 
 
-def is_timeseries_profile_single_station(nc, variable):
+def _is_timeseries_profile_single_station(axes, dims):
     """Return true if the variable is a time-series profile that represents a single station and each profile is the same length.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x, y, z(z), t(t)
     # X(t, z)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -473,26 +976,25 @@ def is_timeseries_profile_single_station(nc, variable):
     if len(cmatrix["x"]) != 0 or cmatrix["x"] != cmatrix["y"]:
         return False
 
-    z = get_z_variable(nc)
+    z = axes.z
     if cmatrix["z"] != (z,):
         return False
-    t = get_time_variable(nc)
+    t = axes.t
     if cmatrix["t"] != (t,):
         return False
 
     return dims == (t, z)
 
 
-def is_timeseries_profile_multi_station(nc, variable):
+def _is_timeseries_profile_multi_station(axes, dims):
     """Return true if the variable is a time-series profile that represents multiple stations with orthogonal time and depth.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i), y(i), z(z), t(t)
     # X(i, t, z)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -503,26 +1005,25 @@ def is_timeseries_profile_multi_station(nc, variable):
         return False
     i = cmatrix["x"][0]
 
-    z = get_z_variable(nc)
+    z = axes.z
     if cmatrix["z"] != (z,):
         return False
-    t = get_time_variable(nc)
+    t = axes.t
     if cmatrix["t"] != (t,):
         return False
 
     return dims == (i, t, z)
 
 
-def is_timeseries_profile_single_ortho_time(nc, variable):
+def _is_timeseries_profile_single_ortho_time(axes, dims):
     """Return true if the variable is a time-series profile that represents a single station with orthogonal time only.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x, y, z(t, j), t(t)
     # X(t, j)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -533,7 +1034,7 @@ def is_timeseries_profile_single_ortho_time(nc, variable):
     if cmatrix["x"] != cmatrix["y"]:
         return False
 
-    t = get_time_variable(nc)
+    t = axes.t
     if cmatrix["t"] != (t,) or len(cmatrix["z"]) != 2 or cmatrix["z"][0] != t:
         return False
 
@@ -542,16 +1043,15 @@ def is_timeseries_profile_single_ortho_time(nc, variable):
     return dims == (t, j)
 
 
-def is_timeseries_profile_multi_ortho_time(nc, variable):
+def _is_timeseries_profile_multi_ortho_time(axes, dims):
     """Return true if the variable is a time-series profile that represents a multi station with orthogonal time only.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i), y(i), z(i, t, j), t(t)
     # X(i, t, j)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -562,7 +1062,7 @@ def is_timeseries_profile_multi_ortho_time(nc, variable):
     if cmatrix["x"] != cmatrix["y"]:
         return False
 
-    t = get_time_variable(nc)
+    t = axes.t
     if cmatrix["t"] != (t,):
         return False
 
@@ -579,16 +1079,15 @@ def is_timeseries_profile_multi_ortho_time(nc, variable):
     return dims == (i, t, j)
 
 
-def is_timeseries_profile_ortho_depth(nc, variable):
+def _is_timeseries_profile_ortho_depth(axes, dims):
     """Return true if the variable is a time-series profile with orthogonal depth only.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i), y(i), z(z), t(i, j)
     # X(i, j, z)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -597,7 +1096,7 @@ def is_timeseries_profile_ortho_depth(nc, variable):
     if len(cmatrix["x"]) != 1 or cmatrix["x"] != cmatrix["y"]:
         return False
 
-    z = get_z_variable(nc)
+    z = axes.z
     if cmatrix["z"] != (z,):
         return False
 
@@ -611,16 +1110,15 @@ def is_timeseries_profile_ortho_depth(nc, variable):
     return dims == (i, j, z)
 
 
-def is_timeseries_profile_incomplete(nc, variable):
+def _is_timeseries_profile_incomplete(axes, dims):
     """Return true if the variable is a time-series profile incomplete depth and incomplete time.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i), y(i), z(i, j, k), t(i, j)
     # X(i, j, k)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -641,16 +1139,15 @@ def is_timeseries_profile_incomplete(nc, variable):
     return dims == (i, j, k)
 
 
-def is_trajectory_profile_orthogonal(nc, variable):
+def _is_trajectory_profile_orthogonal(axes, dims):
     """Return true if the variable is a trajectory profile with orthogonal depths.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i, o), y(i, o), z(z), t(i, o)
     # X(i, o, z)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -665,23 +1162,22 @@ def is_trajectory_profile_orthogonal(nc, variable):
 
     i, o = cmatrix["x"]
 
-    z = get_z_variable(nc)
+    z = axes.z
     if cmatrix["z"] != (z,):
         return False
 
     return dims == (i, o, z)
 
 
-def is_trajectory_profile_incomplete(nc, variable):
+def _is_trajectory_profile_incomplete(axes, dims):
     """Return true if the variable is a trajectory profile with incomplete depths.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(i, o), y(i, o), z(i, o, j), t(i, o)
     # X(i, o, j)
-    dims = nc.variables[variable].dimensions
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
@@ -704,26 +1200,24 @@ def is_trajectory_profile_incomplete(nc, variable):
     return dims == (i, o, j)
 
 
-def is_2d_regular_grid(nc, variable):
+def _is_2d_regular_grid(axes, dims):
     """Return True if the variable is a 2D Regular grid.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(x), y(y), t(t)
     # X(t, y, x)
 
-    dims = nc.variables[variable].dimensions
-
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "t"):
         if req not in cmatrix:
             return False
 
-    x = get_lon_variable(nc)
-    y = get_lat_variable(nc)
-    t = get_time_variable(nc)
+    x = axes.x
+    y = axes.y
+    t = axes.t
 
     if cmatrix["x"] != (x,):
         return False
@@ -736,27 +1230,25 @@ def is_2d_regular_grid(nc, variable):
     return len(dims) == 3 and x in dims and y in dims and t in dims
 
 
-def is_3d_regular_grid(nc, variable):
+def _is_3d_regular_grid(axes, dims):
     """Return True if the variable is a 3D Regular grid.
 
-    :param netCDF4.Dataset nc: An open netCDF dataset
-    :param str variable: name of the variable to check
+    :param AxisResolution axes: coordinate axes of the dataset
+    :param tuple dims: dimensions of the variable to check
     """
     # x(x), y(y), z(z), t(t)
     # X(t, z, y, x)
 
-    dims = nc.variables[variable].dimensions
-
-    cmatrix = coordinate_dimension_matrix(nc)
+    cmatrix = axes.matrix
 
     for req in ("x", "y", "z", "t"):
         if req not in cmatrix:
             return False
 
-    x = get_lon_variable(nc)
-    y = get_lat_variable(nc)
-    z = get_z_variable(nc)
-    t = get_time_variable(nc)
+    x = axes.x
+    y = axes.y
+    z = axes.z
+    t = axes.t
 
     if cmatrix["x"] != (x,):
         return False
@@ -771,3 +1263,362 @@ def is_3d_regular_grid(nc, variable):
     return (
         len(dims) == 4 and x in dims and y in dims and t in dims and z in dims
     )
+
+
+FEATURE_TYPES = {
+    "point": _is_point,
+    "timeseries": _is_timeseries,
+    "multi-timeseries-orthogonal": _is_multi_timeseries_orthogonal,
+    "multi-timeseries-incomplete": _is_multi_timeseries_incomplete,
+    "trajectory": _is_cf_trajectory,
+    "trajectory-single": _is_single_trajectory,
+    "profile-orthogonal": _is_profile_orthogonal,
+    "profile-incomplete": _is_profile_incomplete,
+    "timeseries-profile-single-station": _is_timeseries_profile_single_station,
+    "timeseries-profile-multi-station": _is_timeseries_profile_multi_station,
+    "timeseries-profile-single-ortho-time": _is_timeseries_profile_single_ortho_time,
+    "timeseries-profile-multi-ortho-time": _is_timeseries_profile_multi_ortho_time,
+    "timeseries-profile-ortho-depth": _is_timeseries_profile_ortho_depth,
+    "timeseries-profile-incomplete": _is_timeseries_profile_incomplete,
+    "trajectory-profile-orthogonal": _is_trajectory_profile_orthogonal,
+    "trajectory-profile-incomplete": _is_trajectory_profile_incomplete,
+    "2d-regular-grid": _is_2d_regular_grid,
+    "3d-regular-grid": _is_3d_regular_grid,
+}
+
+
+def get_feature_types(nc, variable):
+    """Return the names of the feature type representations a variable matches.
+
+    The decision table only depends on the dimensions of the variable, so it
+    is evaluated once per distinct dimension tuple of a dataset and reused.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    nc = get_snapshot(nc)
+    return nc.axes.classify(nc.variables[variable].dimensions)
+
+
+def classify_feature_types(nc, variables=None):
+    """Return a map of variable name to the feature type representations it matches.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param list variables: names of the variables to classify, defaults to
+                           the geophysical variables
+    """
+    nc = get_snapshot(nc)
+    if variables is None:
+        variables = get_geophysical_variables(nc)
+    return {
+        variable: get_feature_types(nc, variable) for variable in variables
+    }
+
+
+def is_point(nc, variable):
+    """Return true if the variable is a point feature type.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "point" in get_feature_types(nc, variable)
+
+
+def is_timeseries(nc, variable):
+    """Return true if the variable is a time series feature type.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "timeseries" in get_feature_types(nc, variable)
+
+
+def is_multi_timeseries_orthogonal(nc, variable):
+    """Return true if the variable is a orthogonal multidimensional array representation of time series.
+
+    For more information on what this means see CF 1.6 §H.2.1.
+
+    http://cfconventions.org/cf-conventions/v1.6.0/cf-conventions.html#_orthogonal_multidimensional_array_representation_of_time_series
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "multi-timeseries-orthogonal" in get_feature_types(nc, variable)
+
+
+def is_multi_timeseries_incomplete(nc, variable):
+    """Return true if the variable is an incomplete multidimensional array representation of time series.
+
+    For more information on what this means see CF 1.6 §H.2.2.
+
+    http://cfconventions.org/cf-conventions/v1.6.0/cf-conventions.html#_incomplete_multidimensional_array_representation_of_time_series
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "multi-timeseries-incomplete" in get_feature_types(nc, variable)
+
+
+def is_cf_trajectory(nc, variable):
+    """Return true if the variable is a CF trajectory feature type.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "trajectory" in get_feature_types(nc, variable)
+
+
+def is_single_trajectory(nc, variable):
+    """Return true if the variable is a single trajectory feature.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "trajectory-single" in get_feature_types(nc, variable)
+
+
+def is_profile_orthogonal(nc, variable):
+    """Return true if the variable is a orthogonal profile feature type.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "profile-orthogonal" in get_feature_types(nc, variable)
+
+
+def is_profile_incomplete(nc, variable):
+    """Return true if the variable is a incomplete profile feature type.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "profile-incomplete" in get_feature_types(nc, variable)
+
+
+def is_timeseries_profile_single_station(nc, variable):
+    """Return true if the variable is a time-series profile that represents a single station and each profile is the same length.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "timeseries-profile-single-station" in get_feature_types(
+        nc,
+        variable,
+    )
+
+
+def is_timeseries_profile_multi_station(nc, variable):
+    """Return true if the variable is a time-series profile that represents multiple stations with orthogonal time and depth.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "timeseries-profile-multi-station" in get_feature_types(
+        nc,
+        variable,
+    )
+
+
+def is_timeseries_profile_single_ortho_time(nc, variable):
+    """Return true if the variable is a time-series profile that represents a single station with orthogonal time only.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "timeseries-profile-single-ortho-time" in get_feature_types(
+        nc,
+        variable,
+    )
+
+
+def is_timeseries_profile_multi_ortho_time(nc, variable):
+    """Return true if the variable is a time-series profile that represents a multi station with orthogonal time only.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "timeseries-profile-multi-ortho-time" in get_feature_types(
+        nc,
+        variable,
+    )
+
+
+def is_timeseries_profile_ortho_depth(nc, variable):
+    """Return true if the variable is a time-series profile with orthogonal depth only.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "timeseries-profile-ortho-depth" in get_feature_types(nc, variable)
+
+
+def is_timeseries_profile_incomplete(nc, variable):
+    """Return true if the variable is a time-series profile incomplete depth and incomplete time.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "timeseries-profile-incomplete" in get_feature_types(nc, variable)
+
+
+def is_trajectory_profile_orthogonal(nc, variable):
+    """Return true if the variable is a trajectory profile with orthogonal depths.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "trajectory-profile-orthogonal" in get_feature_types(nc, variable)
+
+
+def is_trajectory_profile_incomplete(nc, variable):
+    """Return true if the variable is a trajectory profile with incomplete depths.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "trajectory-profile-incomplete" in get_feature_types(nc, variable)
+
+
+def is_2d_regular_grid(nc, variable):
+    """Return True if the variable is a 2D Regular grid.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "2d-regular-grid" in get_feature_types(nc, variable)
+
+
+def is_3d_regular_grid(nc, variable):
+    """Return True if the variable is a 3D Regular grid.
+
+    :param netCDF4.Dataset nc: An open netCDF dataset
+    :param str variable: name of the variable to check
+    """
+    return "3d-regular-grid" in get_feature_types(nc, variable)
+
+
+class DatasetContext(typing.NamedTuple):
+    """The variables of a dataset the checks of one run look up.
+
+    Built once by BaseNCEICheck.setup so that the checks read the coordinate,
+    geophysical, platform, instrument and grid mapping variables from it
+    instead of discovering them again. The checkers run with the combined
+    option on the same context share the results of their common checks in
+    ``check_results``, ``checkers`` holds the classes of the checkers set up
+    on it.
+    """
+
+    dataset: DatasetSnapshot
+    lat: str | None
+    lon: str | None
+    z: str | None
+    time: str | None
+    geophysical_variables: list[str]
+    platform_variables: list[str]
+    instrument_variables: list[str]
+    crs: str | None
+    feature_types: dict[str, frozenset]
+    check_results: dict
+    checkers: set
+
+    @classmethod
+    def from_dataset(cls, ds):
+        """Discover the variables of a dataset.
+
+        :param netCDF4.Dataset ds: An open netCDF dataset
+        """
+        ds = get_snapshot(ds)
+        geophysical_variables = get_geophysical_variables(ds)
+        return cls(
+            dataset=ds,
+            lat=ds.axes.y,
+            lon=ds.axes.x,
+            z=ds.axes.z,
+            time=ds.axes.t,
+            geophysical_variables=geophysical_variables,
+            platform_variables=get_platform_variables(ds),
+            instrument_variables=get_instrument_variables(ds),
+            crs=get_crs_variable(ds),
+            feature_types=classify_feature_types(ds, geophysical_variables),
+            check_results={},
+            checkers=set(),
+        )
+
+
+_sessions = []
+
+
+class Session:
+    """Shares the metadata scan of datasets across checker runs.
+
+    Checkers normally take a fresh snapshot of the dataset in setup. While a
+    session is active the snapshot, its axes and attribute index and the
+    DatasetContext of each dataset are built once, the first time a checker
+    is set up on it, and reused by every later suite run on the same open
+    dataset::
+
+        with util.Session():
+            for checker in checkers:
+                check_suite.run_all(ds, [checker], [])
+
+    Datasets are held weakly, a context lives as long as both the session
+    and the dataset.
+    """
+
+    def __init__(self):
+        self._contexts = weakref.WeakKeyDictionary()
+
+    def __enter__(self):
+        """Make this the active session."""
+        _sessions.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        """Deactivate the session and drop its contexts."""
+        _sessions.remove(self)
+        self._contexts.clear()
+
+    def context(self, ds):
+        """Return the DatasetContext of ``ds``, built on first use.
+
+        :param netCDF4.Dataset ds: An open netCDF dataset
+        """
+        context = self._contexts.get(ds)
+        if context is None:
+            invalidate_snapshot(ds)
+            context = DatasetContext.from_dataset(ds)
+            self._contexts[ds] = context
+        return context
+
+
+# Session used by the checkers given the session option, it lasts as long
+# as the process.
+DEFAULT_SESSION = Session()
+
+
+def current_session():
+    """Return the innermost active Session, or None."""
+    return _sessions[-1] if _sessions else None
+
+
+def get_context(ds, *, refresh=True, session=None):
+    """Return the DatasetContext a checker run on ``ds`` should use.
+
+    Inside a Session it is the session's context of the dataset. Otherwise it
+    is the context of the snapshot of the dataset, built on first use, from
+    a fresh snapshot when ``refresh`` is true. Checkers run with the
+    combined option do not refresh, so they share one context.
+
+    :param netCDF4.Dataset ds: An open netCDF dataset
+    :param bool refresh: take a new snapshot of the dataset
+    :param Session session: session to use instead of the active one
+    """
+    session = session or current_session()
+    if session is not None:
+        return session.context(ds)
+    if refresh:
+        invalidate_snapshot(ds)
+    snapshot = get_snapshot(ds)
+    if snapshot.context is None:
+        snapshot.context = DatasetContext.from_dataset(snapshot)
+    return snapshot.context